@@ -1,21 +1,40 @@
+import os
+
 import reflex as rx
 import reflex_enterprise as rxe
-from reflex_enterprise import dnd
-from app.states.game_state import GameState, DialogueLine, StatConfig
-from app.states.editor_state import EditorState
+from app.states.game_state import (
+    GameState,
+    DialogueLine,
+    StatConfig,
+    DerivedStatConfig,
+)
 from app.states.map_state import MapState, MajorLocation, MinorLocation, RegionalMap
 from app.states.action_state import ActionState
-from reflex_monaco import monaco
+from app.components.head import head_components
+from app.components.service_worker import chapter_precache
+from app.components.memoized import item_details, sprite_figure
+from app.components.typewriter import typewriter_text
+from app.components.static_content import (
+    content_characters,
+    content_items,
+    content_stats_config,
+)
+from app.engine.catalog import serve_static_content
+from app.engine.metrics import instrument_app
+from app.engine.sessions import enable_hibernation
+
+# Set to 0 on player deployments to leave out the editor page and its state.
+EDITOR_ENV = "GAME_EDITOR"
 
 
 def character_sprite(char_sprite: rx.Var[dict]) -> rx.Component:
     char_id = char_sprite["id"]
     sprite_key = char_sprite["sprite"]
     sprite_src = rx.cond(
-        GameState.characters.contains(char_id),
+        content_characters.contains(char_id),
         rx.cond(
-            GameState.characters[char_id]["sprites"].contains(sprite_key),
-            GameState.characters[char_id]["sprites"][sprite_key],
+            content_characters[char_id]["sprites"].contains(sprite_key),
+            content_characters[char_id]["sprites"][sprite_key],
             "/placeholder.svg",
         ),
         "/placeholder.svg",
@@ -27,17 +46,10 @@ def character_sprite(char_sprite: rx.Var[dict]) -> rx.Component:
         ("center", "bottom-0 left-1/2 -translate-x-1/2"),
         "bottom-0 left-1/2 -translate-x-1/2",
     )
-    is_speaking = GameState.current_dialogue["character"] == char_id
-    return rx.el.div(
-        rx.image(
-            src=sprite_src,
-            class_name="h-[80vh] md:h-[95vh] object-contain transition-all duration-500 ease-in-out",
-            style={
-                "transform": rx.cond(is_speaking, "scale(1.05)", "scale(1)"),
-                "filter": rx.cond(is_speaking, "brightness(1)", "brightness(0.8)"),
-            },
-        ),
-        class_name=f"absolute transition-opacity duration-500 opacity-100 {position_class}",
+    return sprite_figure(
+        src=sprite_src,
+        position_class=position_class,
+        speaking=GameState.speaking_character == char_id,
     )
 
 
@@ -53,14 +65,19 @@ def dialogue_box() -> rx.Component:
                 ),
                 None,
             ),
-            rx.el.p(
-                rx.cond(
+            typewriter_text(
+                text=rx.cond(
                     GameState.current_dialogue,
                     GameState.current_dialogue["text"],
                     "...",
                 ),
+                speed=GameState.text_speed,
+                instant=GameState.is_skipping,
+                on_finish=GameState.finish_line,
                 class_name="text-lg text-gray-200 font-['Roboto']",
-                key=GameState.current_dialogue.to_string(),
+                key=GameState.current_scene_id
+                + GameState.dialogue_index.to_string()
+                + GameState.current_dialogue.to_string(),
             ),
             class_name="min-h-[120px]",
         ),
@@ -256,13 +273,13 @@ def info_screen_overlay() -> rx.Component:
 def history_overlay() -> rx.Component:
     def history_entry(dialogue: DialogueLine) -> rx.Component:
         char_name = rx.cond(
-            GameState.characters.contains(dialogue["character"]),
-            GameState.characters[dialogue["character"]]["name"],
+            content_characters.contains(dialogue["character"]),
+            content_characters[dialogue["character"]]["name"],
             "",
         )
         char_color = rx.cond(
-            GameState.characters.contains(dialogue["character"]),
-            GameState.characters[dialogue["character"]]["color"],
+            content_characters.contains(dialogue["character"]),
+            content_characters[dialogue["character"]]["color"],
             "#FFFFFF",
         )
         return rx.el.div(
@@ -280,8 +297,18 @@ def history_overlay() -> rx.Component:
         rx.el.div(
             rx.el.div(
                 rx.el.h2("Dialogue History", class_name="text-3xl font-bold mb-6"),
+                rx.el.input(
+                    placeholder="Search dialogue...",
+                    default_value=GameState.history_query,
+                    on_change=GameState.search_history.debounce(200),
+                    class_name="w-full mb-4 px-3 py-2 bg-black/40 border border-gray-600 rounded-lg text-sm focus:outline-none focus:border-sky-500",
+                ),
                 rx.el.div(
-                    rx.foreach(GameState.dialogue_history, history_entry),
+                    rx.cond(
+                        GameState.history_query.strip() != "",
+                        rx.foreach(GameState.history_results, history_entry),
+                        rx.foreach(GameState.dialogue_history, history_entry),
+                    ),
                     class_name="overflow-y-auto h-[60vh] p-4 bg-black/30 rounded-lg",
                 ),
                 rx.el.button(
@@ -438,12 +465,26 @@ def stats_overlay() -> rx.Component:
                 class_name="flex items-center",
             ),
             rx.el.p(
-                GameState.player_stats["stats"].get(stat_id, 0).to_string(),
+                GameState.effective_stats.get(stat_id, 0).to_string(),
                 class_name="text-2xl font-bold text-white",
             ),
             class_name="flex justify-between items-center p-4 bg-white/5 rounded-lg",
         )
 
+    def derived_stat_row(derived: DerivedStatConfig) -> rx.Component:
+        return rx.el.div(
+            rx.el.div(
+                rx.icon(derived["icon"], class_name="h-5 w-5 mr-2 text-amber-400"),
+                rx.el.p(derived["name"], class_name="font-semibold"),
+                class_name="flex items-center",
+            ),
+            rx.el.p(
+                GameState.derived_stats.get(derived["id"], 0).to_string(),
+                class_name="text-xl font-bold text-white",
+            ),
+            class_name="flex justify-between items-center p-3 bg-white/5 rounded-lg",
+        )
+
     return rx.cond(
         GameState.stats_open,
         rx.el.div(
@@ -484,9 +525,14 @@ def stats_overlay() -> rx.Component:
                 ),
                 rx.el.h3("Attributes", class_name="text-xl font-bold mb-3"),
                 rx.el.div(
-                    rx.foreach(GameState.stats_config, stat_row),
+                    rx.foreach(content_stats_config, stat_row),
                     class_name="grid grid-cols-1 md:grid-cols-2 gap-4 overflow-y-auto max-h-[40vh] pr-2",
                 ),
+                rx.el.h3("Derived Stats", class_name="text-xl font-bold mt-6 mb-3"),
+                rx.el.div(
+                    rx.foreach(GameState.derived_stats_config, derived_stat_row),
+                    class_name="grid grid-cols-2 md:grid-cols-3 gap-3",
+                ),
                 rx.el.h3("Skills", class_name="text-xl font-bold mt-6 mb-3"),
                 rx.el.div(
                     rx.el.p("Skills system coming soon.", class_name="text-gray-500"),
@@ -501,33 +547,27 @@ def stats_overlay() -> rx.Component:
 
 
 def inventory_overlay() -> rx.Component:
-    def item_details(slot: dict) -> rx.Component:
-        item = GameState.items.get(slot["item_id"], {})
-        return rx.fragment(
-            rx.image(
-                src=item.get("icon", "/placeholder.svg"),
-                class_name="w-16 h-16 object-contain p-2",
-            ),
-            rx.el.div(
-                rx.el.p(
-                    item.get("name", "Unknown Item"),
-                    class_name="font-bold text-xs truncate",
-                ),
-                class_name="absolute bottom-0 left-0 right-0 p-1 bg-black/50 text-center",
-            ),
-            rx.cond(
-                item.get("stackable", False),
-                rx.el.div(
-                    rx.el.span(slot["quantity"], class_name="text-xs font-bold"),
-                    class_name="absolute top-1 right-1 px-1.5 py-0.5 bg-sky-600 rounded-full text-white",
-                ),
-                None,
-            ),
+    def slot_details(slot: dict) -> rx.Component:
+        item = content_items.get(slot["item_id"], {})
+        return item_details(
+            icon=item.get("icon", "/placeholder.svg"),
+            name=item.get("name", "Unknown Item"),
+            quantity=slot["quantity"],
+            stackable=item.get("stackable", False),
+            equipped=GameState.equipped_item_ids.contains(slot["item_id"]),
         )
 
     def item_card(slot: dict | None) -> rx.Component:
         return rx.el.div(
-            rx.cond(slot, item_details(slot), rx.el.div()),
+            rx.cond(
+                slot,
+                rx.el.button(
+                    slot_details(slot),
+                    on_click=GameState.toggle_equip(slot["item_id"]),
+                    class_name="w-full h-full flex items-center justify-center",
+                ),
+                rx.el.div(),
+            ),
             class_name="relative w-full aspect-square bg-white/5 rounded-lg flex items-center justify-center border border-transparent hover:border-sky-500 hover:bg-white/10 transition-all",
         )
 
@@ -704,199 +744,12 @@ def index() -> rx.Component:
             ("context", context_menu_overlay()),
             rx.el.div("Loading..."),
         ),
+        chapter_precache(),
         on_mount=GameState.on_load,
         class_name="font-['Roboto'] text-white bg-gray-900",
     )
 
 
-def editor_preview_character_sprite(char_sprite: rx.Var[dict]) -> rx.Component:
-    char_id = char_sprite["id"]
-    sprite_key = char_sprite["sprite"]
-    sprite_src = rx.cond(
-        EditorState.preview_characters.contains(char_id),
-        rx.cond(
-            EditorState.preview_characters[char_id]["sprites"].contains(sprite_key),
-            EditorState.preview_characters[char_id]["sprites"][sprite_key],
-            "/placeholder.svg",
-        ),
-        "/placeholder.svg",
-    )
-    position_class = rx.match(
-        char_sprite["position"],
-        ("left", "bottom-0 left-[-5%] md:left-[5%]"),
-        ("right", "bottom-0 right-[-5%] md:right-[5%]"),
-        ("center", "bottom-0 left-1/2 -translate-x-1/2"),
-        "bottom-0 left-1/2 -translate-x-1/2",
-    )
-    is_speaking = EditorState.current_preview_dialogue.is_not_none() & (
-        EditorState.current_preview_dialogue["character"] == char_id
-    )
-    return rx.el.div(
-        rx.image(
-            src=sprite_src,
-            class_name="h-[80vh] md:h-[95vh] object-contain transition-all duration-300 ease-in-out",
-            style={
-                "transform": rx.cond(is_speaking, "scale(1.05)", "scale(1)"),
-                "filter": rx.cond(is_speaking, "brightness(1)", "brightness(0.8)"),
-            },
-            key=sprite_src,
-        ),
-        class_name=f"absolute transition-opacity duration-300 opacity-100 {position_class}",
-    )
-
-
-def editor() -> rx.Component:
-    file_browser = rx.el.div(
-        rx.el.h2(
-            "Game Files", class_name="text-lg font-bold p-4 border-b border-gray-700"
-        ),
-        rx.el.div(
-            rx.foreach(
-                EditorState.files,
-                lambda file: rx.el.button(
-                    rx.icon("file-json-2", class_name="h-4 w-4 mr-2"),
-                    file["name"],
-                    on_click=lambda: EditorState.load_file(file["path"]),
-                    class_name=rx.cond(
-                        EditorState.current_file_path == file["path"],
-                        "w-full text-left p-2 flex items-center bg-sky-500/20 text-sky-300 rounded-md",
-                        "w-full text-left p-2 flex items-center hover:bg-white/10 rounded-md",
-                    ),
-                ),
-            ),
-            class_name="p-2 flex flex-col gap-1 overflow-y-auto",
-        ),
-        class_name="h-full bg-gray-900/80 border-r border-gray-700 flex flex-col",
-    )
-    json_editor = rx.el.div(
-        rx.el.div(
-            rx.el.div(
-                rx.el.p(EditorState.current_file_path, class_name="font-mono text-sm"),
-                rx.el.button(
-                    rx.icon("save", class_name="h-4 w-4 mr-2"),
-                    "Save",
-                    on_click=EditorState.save_current_file,
-                    class_name="flex items-center px-3 py-1 bg-green-600 hover:bg-green-700 rounded-md text-sm font-semibold",
-                ),
-                class_name="flex justify-between items-center p-2 border-b border-gray-700 bg-gray-800",
-            ),
-            monaco(
-                value=EditorState.current_file_content,
-                language="json",
-                theme="vs-dark",
-                on_change=EditorState.on_editor_change.debounce(300),
-                options={"automaticLayout": True},
-                height="100%",
-            ),
-            rx.cond(
-                EditorState.editor_error != "",
-                rx.el.div(
-                    rx.el.p(
-                        EditorState.editor_error,
-                        class_name="font-mono text-sm text-red-400",
-                    ),
-                    class_name="absolute bottom-0 left-0 right-0 p-2 bg-red-900/80 backdrop-blur-sm",
-                ),
-                None,
-            ),
-            class_name="h-full relative",
-        ),
-        class_name="h-full bg-gray-800",
-    )
-    live_preview = rx.el.div(
-        rx.el.h2(
-            "Live Preview",
-            class_name="text-lg font-bold p-4 text-center border-b border-gray-700 bg-gray-900",
-        ),
-        rx.el.div(
-            rx.cond(
-                EditorState.preview_scene.is_not_none(),
-                rx.el.div(
-                    rx.image(
-                        src=EditorState.preview_scene["background"],
-                        class_name="absolute inset-0 w-full h-full object-cover transition-opacity duration-500 ease-in-out",
-                        key=EditorState.preview_scene["id"],
-                    ),
-                    rx.el.div(
-                        class_name="absolute inset-0 bg-gradient-to-t from-black/50 to-transparent"
-                    ),
-                    rx.foreach(
-                        EditorState.preview_scene["characters"],
-                        editor_preview_character_sprite,
-                    ),
-                    rx.el.div(
-                        rx.el.div(
-                            rx.cond(
-                                EditorState.preview_character_name != "Narrator",
-                                rx.el.h2(
-                                    EditorState.preview_character_name,
-                                    class_name="font-bold text-xl mb-1",
-                                    style={
-                                        "color": EditorState.preview_character_color
-                                    },
-                                ),
-                                None,
-                            ),
-                            rx.el.p(
-                                rx.cond(
-                                    EditorState.current_preview_dialogue.is_not_none(),
-                                    EditorState.current_preview_dialogue["text"],
-                                    "...",
-                                ),
-                                class_name="text-base text-gray-200 font-['Roboto']",
-                                key=EditorState.current_preview_dialogue.to_string(),
-                            ),
-                            class_name="min-h-[80px]",
-                        ),
-                        rx.el.div(
-                            rx.el.button(
-                                rx.icon("arrow-left", class_name="h-5 w-5"),
-                                on_click=EditorState.prev_preview_dialogue,
-                                disabled=EditorState.dialogue_index <= 0,
-                                class_name="p-2 bg-white/10 rounded-full hover:bg-white/20 transition-colors disabled:opacity-50",
-                            ),
-                            rx.el.button(
-                                rx.icon("arrow-right", class_name="h-5 w-5"),
-                                on_click=EditorState.next_preview_dialogue,
-                                class_name="p-2 bg-white/10 rounded-full hover:bg-white/20 transition-colors",
-                                disabled=EditorState.dialogue_index
-                                >= EditorState.current_dialogue_length - 1,
-                            ),
-                            class_name="flex justify-end gap-2 mt-2",
-                        ),
-                        class_name="absolute bottom-4 left-4 right-4 bg-black/70 backdrop-blur-md p-4 rounded-xl border border-gray-700/50 shadow-lg",
-                    ),
-                    class_name="relative w-full h-full overflow-hidden bg-gray-900",
-                    key=EditorState.preview_scene.to_string(),
-                ),
-                rx.el.div(
-                    rx.el.div(
-                        rx.icon("image-off", class_name="h-16 w-16 text-gray-500"),
-                        rx.el.p(
-                            "Edit a scene file to see a preview.",
-                            class_name="text-gray-400 mt-4",
-                        ),
-                        class_name="flex flex-col items-center justify-center",
-                    ),
-                    class_name="flex items-center justify-center h-full bg-gray-800",
-                ),
-            ),
-            class_name="flex-1 bg-gray-800",
-        ),
-        class_name="h-full bg-gray-900/50 flex flex-col",
-    )
-    return rx.el.main(
-        rx.el.div(
-            file_browser,
-            json_editor,
-            live_preview,
-            class_name="grid grid-cols-[300px_1fr_1fr] min-h-screen min-w-screen text-white bg-gray-800",
-        ),
-        class_name="font-['Roboto']",
-        on_mount=EditorState.on_load_editor,
-    )
-
-
 def context_menu_overlay() -> rx.Component:
     def action_button(action_id: str, angle: int) -> rx.Component:
         action = ActionState.actions[action_id]
@@ -951,6 +804,28 @@ def context_menu_overlay() -> rx.Component:
                     rx.el.p(ActionState.current_time_str),
                     class_name="flex gap-2",
                 ),
+                rx.el.div(
+                    rx.foreach(
+                        ActionState.batch_actions,
+                        lambda action_id: rx.el.button(
+                            f"{ActionState.actions[action_id]['name']} x10",
+                            on_click=lambda: ActionState.perform_action_batch(
+                                action_id, 10
+                            ),
+                            class_name="px-4 py-1 bg-white/10 hover:bg-white/20 rounded-lg text-sm font-semibold",
+                        ),
+                    ),
+                    rx.cond(
+                        ActionState.available_actions.contains("rest"),
+                        rx.el.button(
+                            "Rest until morning",
+                            on_click=ActionState.rest_until_morning,
+                            class_name="px-4 py-1 bg-white/10 hover:bg-white/20 rounded-lg text-sm font-semibold",
+                        ),
+                        None,
+                    ),
+                    class_name="flex flex-wrap justify-center gap-2 mt-4",
+                ),
                 rx.el.button(
                     "Return to Map",
                     on_click=lambda: GameState.set_game_mode("map"),
@@ -967,17 +842,17 @@ def context_menu_overlay() -> rx.Component:
 
 app = rxe.App(
     theme=rx.theme(appearance="light", accent_color="sky"),
-    head_components=[
-        rx.el.script(
-            src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"
-        ),
-        rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
-        rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", cross_origin=""),
-        rx.el.link(
-            href="https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap",
-            rel="stylesheet",
-        ),
-    ],
+    head_components=head_components(),
 )
+
+
 app.add_page(index)
-app.add_page(editor, route="/editor")
\ No newline at end of file
+instrument_app(app, [GameState, MapState, ActionState])
+if os.environ.get(EDITOR_ENV, "1") == "1":
+    # Importing the editor defines EditorState, which then becomes part of
+    # every session and of the initial state sent to every page.
+    from app.editor import add_editor
+
+    add_editor(app)
+enable_hibernation(app)
+serve_static_content(app)
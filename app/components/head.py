@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+
+import reflex as rx
+
+VENDOR_DIR = "assets/vendor"
+MANIFEST_PATH = os.path.join(VENDOR_DIR, "manifest.json")
+SERVICE_WORKER_PATH = "assets/sw.js"
+REGISTER_SERVICE_WORKER = """
+if ("serviceWorker" in navigator) {
+  window.addEventListener("load", () => navigator.serviceWorker.register("/sw.js"));
+}
+"""
+
+HTML2CANVAS_CDN = (
+    "https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"
+)
+ROBOTO_CDN = (
+    "https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap"
+)
+
+
+def load_vendor_manifest(path: str = MANIFEST_PATH) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Ignoring unreadable vendor manifest {path}: {e}")
+        return None
+
+
+def cdn_head_components() -> list[rx.Component]:
+    return [
+        rx.el.script(src=HTML2CANVAS_CDN),
+        rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
+        rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", cross_origin=""),
+        rx.el.link(href=ROBOTO_CDN, rel="stylesheet"),
+    ]
+
+
+def service_worker_components() -> list[rx.Component]:
+    """Registers the worker written by `app.tools.build_service_worker`."""
+    if not os.path.exists(SERVICE_WORKER_PATH):
+        return []
+    return [rx.el.script(REGISTER_SERVICE_WORKER)]
+
+
+def head_components() -> list[rx.Component]:
+    """Self-hosted fonts and scripts written by `app.tools.vendor_assets`,
+    preloaded with their integrity hashes. Falls back to the CDNs until the
+    vendor step has been run."""
+    manifest = load_vendor_manifest()
+    if manifest is None:
+        return cdn_head_components() + service_worker_components()
+    components = [
+        rx.el.link(
+            rel="preload",
+            href=font["url"],
+            type="font/woff2",
+            integrity=font["integrity"],
+            cross_origin="anonymous",
+            custom_attrs={"as": "font"},
+        )
+        for font in manifest["fonts"]
+    ]
+    stylesheet = manifest["stylesheet"]
+    components.append(
+        rx.el.link(
+            rel="stylesheet",
+            href=stylesheet["url"],
+            integrity=stylesheet["integrity"],
+            cross_origin="anonymous",
+        )
+    )
+    components.extend(
+        rx.el.script(
+            src=script["url"],
+            integrity=script["integrity"],
+            cross_origin="anonymous",
+            defer=True,
+        )
+        for script in manifest["scripts"]
+    )
+    return components + service_worker_components()
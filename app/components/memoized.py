@@ -0,0 +1,60 @@
+import reflex as rx
+
+# Memoized on their props only, so unrelated state changes on the page do not
+# re-render them. Callers resolve state and content into plain props.
+
+
+@rx.memo
+def sprite_figure(
+    src: rx.Var[str], position_class: rx.Var[str], speaking: rx.Var[bool]
+) -> rx.Component:
+    return rx.el.div(
+        rx.image(
+            src=src,
+            class_name="h-[80vh] md:h-[95vh] object-contain transition-all duration-500 ease-in-out",
+            style={
+                "transform": rx.cond(speaking, "scale(1.05)", "scale(1)"),
+                "filter": rx.cond(speaking, "brightness(1)", "brightness(0.8)"),
+            },
+        ),
+        class_name=f"absolute transition-opacity duration-500 opacity-100 {position_class}",
+    )
+
+
+@rx.memo
+def item_details(
+    icon: rx.Var[str],
+    name: rx.Var[str],
+    quantity: rx.Var[int],
+    stackable: rx.Var[bool],
+    equipped: rx.Var[bool],
+) -> rx.Component:
+    return rx.fragment(
+        rx.image(
+            src=icon,
+            class_name="w-16 h-16 object-contain p-2",
+        ),
+        rx.el.div(
+            rx.el.p(
+                name,
+                class_name="font-bold text-xs truncate",
+            ),
+            class_name="absolute bottom-0 left-0 right-0 p-1 bg-black/50 text-center",
+        ),
+        rx.cond(
+            stackable,
+            rx.el.div(
+                rx.el.span(quantity, class_name="text-xs font-bold"),
+                class_name="absolute top-1 right-1 px-1.5 py-0.5 bg-sky-600 rounded-full text-white",
+            ),
+            None,
+        ),
+        rx.cond(
+            equipped,
+            rx.el.div(
+                rx.el.span("E", class_name="text-xs font-bold"),
+                class_name="absolute top-1 left-1 px-1.5 py-0.5 bg-amber-500 rounded-full text-white",
+            ),
+            None,
+        ),
+    )
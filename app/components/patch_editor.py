@@ -0,0 +1,48 @@
+import reflex as rx
+from reflex.event import EventChain, EventType
+from reflex.vars import ObjectVar
+from reflex.vars.base import LiteralVar, Var, VarData
+from reflex.vars.function import ArgsFunctionOperation
+from reflex_monaco.monaco import MonacoEditor
+
+
+def content_changes_event(
+    value: rx.Var[str], event: ObjectVar[dict]
+) -> tuple[rx.Var[list], rx.Var[int]]:
+    return (
+        rx.Var(
+            f"{event}.changes.map((c) => [c.rangeOffset, c.rangeLength, c.text])"
+        ).to(list),
+        rx.Var(f"{event}.versionId").to(int),
+    )
+
+
+class PatchMonacoEditor(MonacoEditor):
+    path: rx.Var[str]
+
+    on_change: rx.EventHandler[content_changes_event]
+
+
+def separate_change_events(*events: EventType) -> Var:
+    """Bind several events to `on_change`, each with its own event actions.
+
+    Reflex applies a debounce on one event in a chain to the whole chain, so
+    patches that must reach the server on every keystroke are dispatched
+    separately from events that may wait for typing to pause.
+    """
+    chains = [
+        LiteralVar.create(EventChain.create(event, content_changes_event))
+        for event in events
+    ]
+    calls = ", ".join(f"({chain})(_value, _event)" for chain in chains)
+    return ArgsFunctionOperation.create(
+        ("_value", "_event"),
+        Var(f"[{calls}]")._replace(
+            merge_var_data=VarData.merge(
+                *(chain._get_all_var_data() for chain in chains)
+            )
+        ),
+    ).to(EventChain)
+
+
+patch_monaco = PatchMonacoEditor.create
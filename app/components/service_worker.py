@@ -0,0 +1,28 @@
+import reflex as rx
+from reflex.utils.imports import ImportVar
+from reflex.vars import VarData
+
+from app.states.game_state import GameState
+
+
+def chapter_precache() -> rx.Var:
+    """Tells the service worker which chapter the player is in, so it caches
+    that chapter's images and the ones after it ahead of time."""
+    chapter = GameState.current_chapter._js_expr
+    hook = (
+        "useEffect(() => {\n"
+        f"  const chapter = {chapter};\n"
+        "  if (!chapter || typeof navigator === 'undefined' ||"
+        " !navigator.serviceWorker) return;\n"
+        "  navigator.serviceWorker.ready.then((registration) =>\n"
+        "    registration.active?.postMessage({ type: 'precache-chapter', chapter })\n"
+        "  );\n"
+        f"}}, [{chapter}]);"
+    )
+    return rx.Var(
+        _js_expr="null",
+        _var_data=VarData(
+            imports={"react": [ImportVar(tag="useEffect")]},
+            hooks={hook: GameState.current_chapter._get_all_var_data()},
+        ),
+    )
@@ -0,0 +1,48 @@
+import reflex as rx
+from reflex.constants import Dirs
+from reflex.utils.imports import ImportVar
+from reflex.vars import VarData
+
+from app.states.game_state import CharacterData, GameState, Item, StatConfig
+
+# One request per bundle per page load, shared by every component using it.
+_FETCH_CONTENT = (
+    "((path) => { const cache = (window.__gameContent ??= {});"
+    " return (cache[path] ??= fetch(new URL(path, getBackendURL(env.PING)))"
+    ".then((r) => r.json()).catch((e) => { delete cache[path]; throw e; })); })"
+)
+
+
+def _content_var(kind: str, empty: str) -> rx.Var:
+    """Client-side value of a static content bundle. The state only carries
+    its hashed URL, so the browser caches the bundle across sessions."""
+    name = f"content_{kind}"
+    url = GameState.content_urls[kind]
+    url_expr = url._js_expr
+    hook = (
+        f"const [{name}, set_{name}] = useState(null);\n"
+        "useEffect(() => {\n"
+        f"  const path = {url_expr};\n"
+        "  if (!path || typeof window === 'undefined') return;\n"
+        "  let active = true;\n"
+        f"  {_FETCH_CONTENT}(path).then((data) => active && set_{name}(data))"
+        ".catch(() => {});\n"
+        "  return () => { active = false; };\n"
+        f"}}, [{url_expr}]);"
+    )
+    return rx.Var(
+        _js_expr=f"({name} ?? {empty})",
+        _var_data=VarData(
+            imports={
+                "react": [ImportVar(tag="useState"), ImportVar(tag="useEffect")],
+                f"$/{Dirs.STATE_PATH}": "getBackendURL",
+                "$/env.json": ImportVar(tag="env", is_default=True),
+            },
+            hooks={hook: url._get_all_var_data()},
+        ),
+    )
+
+
+content_characters = _content_var("characters", "{}").to(dict[str, CharacterData])
+content_items = _content_var("items", "{}").to(dict[str, Item])
+content_stats_config = _content_var("stats_config", "[]").to(list[StatConfig])
@@ -0,0 +1,83 @@
+import reflex as rx
+from reflex.utils.imports import ImportVar
+
+# Characters per second at text speed 1.0.
+CHARS_PER_SECOND = 40
+
+TYPEWRITER_COMPONENT = f"""
+const TYPEWRITER_CPS = {CHARS_PER_SECOND};
+function TypewriterText({{text, speed, instant, onFinish, className}}) {{
+  const full = text ?? "";
+  const [count, setCount] = useState(instant ? full.length : 0);
+  const shown = useRef(count);
+  const finished = useRef(false);
+  const finish = useCallback((clicked) => {{
+    if (finished.current) return;
+    finished.current = true;
+    shown.current = full.length;
+    setCount(full.length);
+    onFinish?.(clicked);
+  }}, [full, onFinish]);
+  useEffect(() => {{
+    if (instant || shown.current >= full.length) {{
+      finish(false);
+      return;
+    }}
+    // Resume from what is already shown when the speed changes mid-line.
+    const from = shown.current;
+    const start = performance.now();
+    const rate = (TYPEWRITER_CPS * Math.max(speed ?? 1, 0.01)) / 1000;
+    let frame = requestAnimationFrame(function step(now) {{
+      const next = Math.min(full.length, from + Math.floor((now - start) * rate));
+      if (next !== shown.current) {{
+        shown.current = next;
+        setCount(next);
+      }}
+      if (next >= full.length) finish(false);
+      else frame = requestAnimationFrame(step);
+    }});
+    return () => cancelAnimationFrame(frame);
+  }}, [full, speed, instant, finish]);
+  // The hidden remainder keeps the box at its final size while typing.
+  return jsx("p", {{className, onClick: () => finish(true)}},
+    full.slice(0, count),
+    jsx("span", {{style: {{visibility: "hidden"}}}}, full.slice(count)),
+  );
+}}
+"""
+
+
+def finish_event(clicked: rx.Var[bool]) -> tuple[rx.Var[bool]]:
+    return (clicked,)
+
+
+class TypewriterText(rx.Component):
+    """Reveals a line of text in the browser. Nothing is sent to the server
+    until the line is fully shown, either by finishing or by a click."""
+
+    tag = "TypewriterText"
+
+    text: rx.Var[str]
+
+    speed: rx.Var[float]
+
+    instant: rx.Var[bool]
+
+    on_finish: rx.EventHandler[finish_event]
+
+    def add_imports(self):
+        return {
+            "react": [
+                ImportVar(tag="useState"),
+                ImportVar(tag="useEffect"),
+                ImportVar(tag="useRef"),
+                ImportVar(tag="useCallback"),
+            ],
+            "@emotion/react": [ImportVar(tag="jsx")],
+        }
+
+    def add_custom_code(self) -> list[str]:
+        return [TYPEWRITER_COMPONENT]
+
+
+typewriter_text = TypewriterText.create
@@ -0,0 +1,305 @@
+import reflex as rx
+
+from app.components.patch_editor import patch_monaco, separate_change_events
+from app.engine.metrics import instrument_state
+from app.engine.search import SearchDocument
+from app.states.editor_state import EditorState
+
+
+def editor_preview_character_sprite(char_sprite: rx.Var[dict]) -> rx.Component:
+    char_id = char_sprite["id"]
+    sprite_key = char_sprite["sprite"]
+    sprite_src = rx.cond(
+        EditorState.preview_characters.contains(char_id),
+        rx.cond(
+            EditorState.preview_characters[char_id]["sprites"].contains(sprite_key),
+            EditorState.preview_characters[char_id]["sprites"][sprite_key],
+            "/placeholder.svg",
+        ),
+        "/placeholder.svg",
+    )
+    position_class = rx.match(
+        char_sprite["position"],
+        ("left", "bottom-0 left-[-5%] md:left-[5%]"),
+        ("right", "bottom-0 right-[-5%] md:right-[5%]"),
+        ("center", "bottom-0 left-1/2 -translate-x-1/2"),
+        "bottom-0 left-1/2 -translate-x-1/2",
+    )
+    is_speaking = EditorState.current_preview_dialogue.is_not_none() & (
+        EditorState.current_preview_dialogue["character"] == char_id
+    )
+    return rx.el.div(
+        rx.image(
+            src=sprite_src,
+            class_name="h-[80vh] md:h-[95vh] object-contain transition-all duration-300 ease-in-out",
+            style={
+                "transform": rx.cond(is_speaking, "scale(1.05)", "scale(1)"),
+                "filter": rx.cond(is_speaking, "brightness(1)", "brightness(0.8)"),
+            },
+            key=sprite_src,
+        ),
+        class_name=f"absolute transition-opacity duration-300 opacity-100 {position_class}",
+    )
+
+
+def story_report_panel() -> rx.Component:
+    report = EditorState.story_report
+
+    def stat(label: str, value: rx.Var) -> rx.Component:
+        return rx.el.div(
+            rx.el.span(label, class_name="text-gray-400"),
+            rx.el.span(value, class_name="font-mono text-gray-200"),
+            class_name="flex justify-between",
+        )
+
+    def issue_list(label: str, scenes: rx.Var) -> rx.Component:
+        return rx.cond(
+            scenes.length() > 0,
+            rx.el.div(
+                rx.el.p(
+                    f"{label} ({scenes.length()})",
+                    class_name="text-amber-400 font-semibold mt-2",
+                ),
+                rx.el.p(
+                    scenes.join(", "), class_name="font-mono text-gray-400 break-words"
+                ),
+            ),
+            None,
+        )
+
+    return rx.el.div(
+        rx.el.h3("Story Graph", class_name="font-bold mb-2 text-sm"),
+        stat("Scenes", report["scene_count"]),
+        stat("Reachable", report["reachable_count"]),
+        stat("Distinct paths", report["path_count"]),
+        stat("Longest path", report["longest_path"]),
+        stat("Cycles", report["cycles"].length()),
+        issue_list("Unreachable", report["unreachable"]),
+        issue_list("Dead ends", report["dead_ends"]),
+        rx.cond(
+            report["broken_links"].length() > 0,
+            rx.el.div(
+                rx.el.p(
+                    f"Broken links ({report['broken_links'].length()})",
+                    class_name="text-red-400 font-semibold mt-2",
+                ),
+                rx.foreach(
+                    report["broken_links"],
+                    lambda link: rx.el.p(
+                        f"{link['scene']} -> {link['target']}",
+                        class_name="font-mono text-gray-400",
+                    ),
+                ),
+            ),
+            None,
+        ),
+        class_name="p-3 border-t border-gray-700 text-xs max-h-64 overflow-y-auto",
+    )
+
+
+def search_result_entry(result: SearchDocument) -> rx.Component:
+    return rx.el.button(
+        rx.el.p(
+            result["label"],
+            class_name="text-xs text-sky-300 font-semibold truncate",
+        ),
+        rx.el.p(result["text"], class_name="text-sm text-gray-300 line-clamp-2"),
+        on_click=lambda: EditorState.open_search_result(result),
+        class_name="w-full text-left p-2 flex flex-col hover:bg-white/10 rounded-md",
+    )
+
+
+def editor_page() -> rx.Component:
+    file_browser = rx.el.div(
+        rx.el.h2(
+            "Game Files", class_name="text-lg font-bold p-4 border-b border-gray-700"
+        ),
+        rx.el.div(
+            rx.el.input(
+                placeholder="Search content...",
+                default_value=EditorState.search_query,
+                on_change=EditorState.search_content.debounce(200),
+                class_name="w-full px-3 py-2 bg-gray-800 border border-gray-700 rounded-md text-sm focus:outline-none focus:border-sky-500",
+            ),
+            class_name="p-2 border-b border-gray-700",
+        ),
+        rx.el.div(
+            rx.cond(
+                EditorState.search_query.strip() != "",
+                rx.foreach(EditorState.search_results, search_result_entry),
+                rx.foreach(
+                    EditorState.files,
+                    lambda file: rx.el.button(
+                        rx.icon("file-json-2", class_name="h-4 w-4 mr-2"),
+                        file["name"],
+                        on_click=lambda: EditorState.load_file(file["path"]),
+                        class_name=rx.cond(
+                            EditorState.current_file_path == file["path"],
+                            "w-full text-left p-2 flex items-center bg-sky-500/20 text-sky-300 rounded-md",
+                            "w-full text-left p-2 flex items-center hover:bg-white/10 rounded-md",
+                        ),
+                    ),
+                ),
+            ),
+            class_name="p-2 flex flex-col gap-1 overflow-y-auto flex-1",
+        ),
+        rx.cond(EditorState.story_report.is_not_none(), story_report_panel(), None),
+        class_name="h-full bg-gray-900/80 border-r border-gray-700 flex flex-col",
+    )
+    json_editor = rx.el.div(
+        rx.el.div(
+            rx.el.div(
+                rx.el.div(
+                    rx.el.p(
+                        EditorState.current_file_path, class_name="font-mono text-sm"
+                    ),
+                    rx.el.span(
+                        EditorState.editor_etag[:8],
+                        title="Version of the file this edit is based on",
+                        class_name="font-mono text-xs text-gray-500",
+                    ),
+                    class_name="flex items-center gap-3",
+                ),
+                rx.el.div(
+                    rx.el.button(
+                        rx.icon("refresh-cw", class_name="h-4 w-4 mr-2"),
+                        "Reload",
+                        on_click=EditorState.load_file(EditorState.current_file_path),
+                        class_name="flex items-center px-3 py-1 bg-gray-600 hover:bg-gray-700 rounded-md text-sm font-semibold",
+                    ),
+                    rx.el.button(
+                        rx.icon("save", class_name="h-4 w-4 mr-2"),
+                        "Save",
+                        on_click=EditorState.save_current_file,
+                        class_name="flex items-center px-3 py-1 bg-green-600 hover:bg-green-700 rounded-md text-sm font-semibold",
+                    ),
+                    class_name="flex items-center gap-2",
+                ),
+                class_name="flex justify-between items-center p-2 border-b border-gray-700 bg-gray-800",
+            ),
+            patch_monaco(
+                default_value=EditorState.editor_initial_content,
+                path=EditorState.current_file_path,
+                key=EditorState.editor_key,
+                language="json",
+                theme="vs-dark",
+                on_change=separate_change_events(
+                    EditorState.apply_editor_changes,
+                    EditorState.refresh_preview.debounce(300),
+                ),
+                options={"automaticLayout": True},
+                height="100%",
+            ),
+            rx.cond(
+                EditorState.editor_error != "",
+                rx.el.div(
+                    rx.el.p(
+                        EditorState.editor_error,
+                        class_name="font-mono text-sm text-red-400",
+                    ),
+                    class_name="absolute bottom-0 left-0 right-0 p-2 bg-red-900/80 backdrop-blur-sm",
+                ),
+                None,
+            ),
+            class_name="h-full relative",
+        ),
+        class_name="h-full bg-gray-800",
+    )
+    live_preview = rx.el.div(
+        rx.el.h2(
+            "Live Preview",
+            class_name="text-lg font-bold p-4 text-center border-b border-gray-700 bg-gray-900",
+        ),
+        rx.el.div(
+            rx.cond(
+                EditorState.preview_scene.is_not_none(),
+                rx.el.div(
+                    rx.image(
+                        src=EditorState.preview_scene["background"],
+                        class_name="absolute inset-0 w-full h-full object-cover transition-opacity duration-500 ease-in-out",
+                        key=EditorState.preview_scene["id"],
+                    ),
+                    rx.el.div(
+                        class_name="absolute inset-0 bg-gradient-to-t from-black/50 to-transparent"
+                    ),
+                    rx.foreach(
+                        EditorState.preview_scene["characters"],
+                        editor_preview_character_sprite,
+                    ),
+                    rx.el.div(
+                        rx.el.div(
+                            rx.cond(
+                                EditorState.preview_character_name != "Narrator",
+                                rx.el.h2(
+                                    EditorState.preview_character_name,
+                                    class_name="font-bold text-xl mb-1",
+                                    style={
+                                        "color": EditorState.preview_character_color
+                                    },
+                                ),
+                                None,
+                            ),
+                            rx.el.p(
+                                rx.cond(
+                                    EditorState.current_preview_dialogue.is_not_none(),
+                                    EditorState.current_preview_dialogue["text"],
+                                    "...",
+                                ),
+                                class_name="text-base text-gray-200 font-['Roboto']",
+                                key=EditorState.current_preview_dialogue.to_string(),
+                            ),
+                            class_name="min-h-[80px]",
+                        ),
+                        rx.el.div(
+                            rx.el.button(
+                                rx.icon("arrow-left", class_name="h-5 w-5"),
+                                on_click=EditorState.prev_preview_dialogue,
+                                disabled=EditorState.dialogue_index <= 0,
+                                class_name="p-2 bg-white/10 rounded-full hover:bg-white/20 transition-colors disabled:opacity-50",
+                            ),
+                            rx.el.button(
+                                rx.icon("arrow-right", class_name="h-5 w-5"),
+                                on_click=EditorState.next_preview_dialogue,
+                                class_name="p-2 bg-white/10 rounded-full hover:bg-white/20 transition-colors",
+                                disabled=EditorState.dialogue_index
+                                >= EditorState.current_dialogue_length - 1,
+                            ),
+                            class_name="flex justify-end gap-2 mt-2",
+                        ),
+                        class_name="absolute bottom-4 left-4 right-4 bg-black/70 backdrop-blur-md p-4 rounded-xl border border-gray-700/50 shadow-lg",
+                    ),
+                    class_name="relative w-full h-full overflow-hidden bg-gray-900",
+                    key=EditorState.preview_scene.to_string(),
+                ),
+                rx.el.div(
+                    rx.el.div(
+                        rx.icon("image-off", class_name="h-16 w-16 text-gray-500"),
+                        rx.el.p(
+                            "Edit a scene file to see a preview.",
+                            class_name="text-gray-400 mt-4",
+                        ),
+                        class_name="flex flex-col items-center justify-center",
+                    ),
+                    class_name="flex items-center justify-center h-full bg-gray-800",
+                ),
+            ),
+            class_name="flex-1 bg-gray-800",
+        ),
+        class_name="h-full bg-gray-900/50 flex flex-col",
+    )
+    return rx.el.main(
+        rx.el.div(
+            file_browser,
+            json_editor,
+            live_preview,
+            class_name="grid grid-cols-[300px_1fr_1fr] min-h-screen min-w-screen text-white bg-gray-800",
+        ),
+        class_name="font-['Roboto']",
+        on_mount=EditorState.on_load_editor,
+    )
+
+
+def add_editor(app):
+    """Serve the editor at /editor and instrument its state."""
+    app.add_page(editor_page, route="/editor")
+    instrument_state(EditorState)
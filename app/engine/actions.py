@@ -0,0 +1,253 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Callable
+
+from app.engine.metrics import metrics
+from app.engine.rewards import RewardSummary, roll_rewards
+
+stage_seconds = metrics.histogram(
+    "game_action_stage_duration_seconds",
+    "Time spent in each stage of an action.",
+    ("action", "stage"),
+)
+
+
+class ActionContext:
+    def __init__(
+        self,
+        action_id: str,
+        times: int = 1,
+        hours: int | None = None,
+        rng: random.Random | None = None,
+        stats: dict[str, int] | None = None,
+        item_counts: dict[str, int] | None = None,
+        game_vars: dict[str, Any] | None = None,
+        current_time: int = 0,
+    ):
+        self.action_id = action_id
+        self.times = times
+        self.hours = hours
+        self.rng = rng or random.Random()
+        self.stats = stats or {}
+        self.item_counts = item_counts or {}
+        self.game_vars = game_vars or {}
+        self.current_time = current_time
+        self.failure: str | None = None
+        self.summary: RewardSummary = {"xp": 0, "items": {}}
+        self.consumed: dict[str, int] = {}
+        self.stat_gains: dict[str, int] = {}
+        self.set_vars: dict[str, Any] = {}
+        self.game_mode: str | None = None
+        self.message = ""
+        self.timings: dict[str, float] = {}
+
+
+Stage = Callable[[ActionContext], None]
+
+
+def _check_min_stat(spec: dict) -> Callable[[ActionContext], bool]:
+    return lambda ctx: ctx.stats.get(spec["stat"], 0) >= spec["value"]
+
+
+def _check_has_item(spec: dict) -> Callable[[ActionContext], bool]:
+    quantity = spec.get("quantity", 1)
+    return lambda ctx: ctx.item_counts.get(spec["item_id"], 0) >= quantity * ctx.times
+
+
+def _check_time_between(spec: dict) -> Callable[[ActionContext], bool]:
+    start, end = spec["start"], spec["end"]
+    if start <= end:
+        return lambda ctx: start <= ctx.current_time < end
+    return lambda ctx: ctx.current_time >= start or ctx.current_time < end
+
+
+def _check_var_equals(spec: dict) -> Callable[[ActionContext], bool]:
+    return lambda ctx: ctx.game_vars.get(spec["var"]) == spec["value"]
+
+
+def _effect_set_game_mode(spec: dict) -> Stage:
+    def apply(ctx: ActionContext):
+        ctx.game_mode = spec["mode"]
+
+    return apply
+
+
+def _effect_set_vars(spec: dict) -> Stage:
+    def apply(ctx: ActionContext):
+        ctx.set_vars.update(spec["vars"])
+
+    return apply
+
+
+def _effect_consume_item(spec: dict) -> Stage:
+    quantity = spec.get("quantity", 1)
+
+    def apply(ctx: ActionContext):
+        ctx.consumed[spec["item_id"]] = (
+            ctx.consumed.get(spec["item_id"], 0) + quantity * ctx.times
+        )
+
+    return apply
+
+
+def _effect_raise_stat(spec: dict) -> Stage:
+    chance = spec.get("chance", 1.0)
+    amount = spec.get("amount", 1)
+
+    def apply(ctx: ActionContext):
+        gained = sum(amount for _ in range(ctx.times) if ctx.rng.random() < chance)
+        if gained:
+            ctx.stat_gains[spec["stat"]] = ctx.stat_gains.get(spec["stat"], 0) + gained
+
+    return apply
+
+
+PRECONDITIONS: dict[str, Callable[[dict], Callable[[ActionContext], bool]]] = {
+    "min_stat": _check_min_stat,
+    "has_item": _check_has_item,
+    "time_between": _check_time_between,
+    "var_equals": _check_var_equals,
+}
+
+EFFECTS: dict[str, Callable[[dict], Stage]] = {
+    "set_game_mode": _effect_set_game_mode,
+    "set_vars": _effect_set_vars,
+    "consume_item": _effect_consume_item,
+    "raise_stat": _effect_raise_stat,
+}
+
+
+class CompiledAction:
+    def __init__(self, action: dict):
+        self.action = action
+        self.id = action["id"]
+        self.stages: list[tuple[str, Stage]] = [
+            ("cost", self._compile_cost()),
+            ("preconditions", self._compile_preconditions()),
+            ("outcome", self._compile_outcome()),
+            ("effects", self._compile_effects()),
+        ]
+
+    def _compile_cost(self) -> Stage:
+        time_cost = self.action.get("time_cost", 0)
+
+        def cost(ctx: ActionContext):
+            if ctx.hours is None:
+                ctx.hours = time_cost * ctx.times
+
+        return cost
+
+    def _compile_preconditions(self) -> Stage:
+        checks = []
+        for spec in self.action.get("preconditions", []):
+            factory = PRECONDITIONS.get(spec.get("type", ""))
+            if factory is None:
+                raise ValueError(
+                    f"Unknown precondition '{spec.get('type')}' in {self.id}"
+                )
+            checks.append(factory(spec))
+        failure = self.action.get("messages", {}).get(
+            "failure", f"You cannot {self.action['name'].lower()} right now."
+        )
+
+        def preconditions(ctx: ActionContext):
+            if not all(check(ctx) for check in checks):
+                ctx.failure = failure
+
+        return preconditions
+
+    def _compile_outcome(self) -> Stage:
+        rewards = self.action.get("rewards", {})
+        messages = self.action.get("messages", {})
+        name = self.action["name"]
+        success = messages.get("success", f"Performed action: {name}")
+        empty = messages.get("empty", success)
+
+        def outcome(ctx: ActionContext):
+            ctx.summary = roll_rewards(rewards, ctx.rng, ctx.times)
+            if ctx.times > 1:
+                template = f"{name} x{{times}} ({{hours}} hours)"
+            elif rewards.get("loot") and not ctx.summary["items"]:
+                template = empty
+            else:
+                template = success
+            ctx.message = template.format(name=name, times=ctx.times, hours=ctx.hours)
+
+        return outcome
+
+    def _compile_effects(self) -> Stage:
+        effects = []
+        for spec in self.action.get("effects", []):
+            factory = EFFECTS.get(spec.get("type", ""))
+            if factory is None:
+                raise ValueError(f"Unknown effect '{spec.get('type')}' in {self.id}")
+            effects.append(factory(spec))
+
+        def apply_effects(ctx: ActionContext):
+            for effect in effects:
+                effect(ctx)
+
+        return apply_effects
+
+    def run(self, ctx: ActionContext) -> ActionContext:
+        for name, stage in self.stages:
+            start = time.perf_counter()
+            stage(ctx)
+            ctx.timings[name] = time.perf_counter() - start
+            if ctx.failure:
+                break
+        return ctx
+
+
+class ActionRegistry:
+    def __init__(self, path: str):
+        self.path = path
+        self.actions: dict[str, dict] = {}
+        self.handlers: dict[str, CompiledAction] = {}
+        self._mtime: float | None = None
+        self._digest: str | None = None
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            logging.error(f"Actions file not found: {self.path}")
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if digest == self._digest:
+                return False
+            actions_list: list[dict] = json.loads(raw)
+            handlers = {action["id"]: CompiledAction(action) for action in actions_list}
+        except Exception as e:
+            logging.exception(f"Error loading actions: {e}")
+            return False
+        self.actions = {action["id"]: action for action in actions_list}
+        self.handlers = handlers
+        self._digest = digest
+        return True
+
+    def get(self, action_id: str) -> CompiledAction | None:
+        return self.handlers.get(action_id)
+
+    def run(self, ctx: ActionContext) -> ActionContext | None:
+        handler = self.handlers.get(ctx.action_id)
+        if handler is None:
+            return None
+        handler.run(ctx)
+        for stage, elapsed in ctx.timings.items():
+            stage_seconds.observe(elapsed, ctx.action_id, stage)
+        logging.debug(
+            f"Action {ctx.action_id} stages: "
+            + ", ".join(f"{k}={v * 1000:.3f}ms" for k, v in ctx.timings.items())
+        )
+        return ctx
@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, NamedTuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.engine.content import content_cache, content_digest
+
+CONTENT_ROUTE = "/_content"
+CHARACTERS_DIR = "assets/game_data/characters"
+ITEMS_DIR = "assets/game_data/items"
+STATS_DIR = "assets/game_data/stats"
+# Older versions stay servable for a while so clients that loaded the
+# previous manifest can still fetch what they asked for.
+KEEP_VERSIONS = 4
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticBundle(NamedTuple):
+    name: str
+    digest: str
+    body: bytes
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.{self.digest[:16]}.json"
+
+
+class StaticContent:
+    """Content that is the same for every player. The server keeps one copy
+    and clients fetch it by content hash instead of through session state."""
+
+    def __init__(self):
+        self.characters: dict[str, Any] = {}
+        self.items: dict[str, Any] = {}
+        self.stats_config: list[Any] = []
+        self._bundles: dict[str, list[StaticBundle]] = {}
+        self._files: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, stats_config: str = "fantasy"):
+        characters = {
+            data["id"]: data for data in content_cache.load_dir(CHARACTERS_DIR).values()
+        }
+        items = {}
+        if os.path.isdir(ITEMS_DIR):
+            for entry in sorted(os.listdir(ITEMS_DIR)):
+                for data in content_cache.load_dir(
+                    os.path.join(ITEMS_DIR, entry)
+                ).values():
+                    items[data["id"]] = data
+        stats_path = os.path.join(STATS_DIR, f"{stats_config}_stats.json")
+        stats = []
+        try:
+            stats = content_cache.load(stats_path)
+        except Exception as e:
+            logging.exception(f"Error loading stats config {stats_path}: {e}")
+        with self._lock:
+            self.characters = characters
+            self.items = items
+            self.stats_config = stats
+            self._publish("characters", characters)
+            self._publish("items", items)
+            self._publish("stats_config", stats)
+
+    def _publish(self, name: str, data: Any):
+        body = json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        bundle = StaticBundle(name, content_digest(body), body)
+        versions = self._bundles.setdefault(name, [])
+        if versions and versions[-1].digest == bundle.digest:
+            return
+        versions.append(bundle)
+        self._files[bundle.filename] = body
+        while len(versions) > KEEP_VERSIONS:
+            self._files.pop(versions.pop(0).filename, None)
+
+    def urls(self) -> dict[str, str]:
+        with self._lock:
+            return {
+                name: f"{CONTENT_ROUTE}/{versions[-1].filename}"
+                for name, versions in self._bundles.items()
+            }
+
+    def file(self, filename: str) -> bytes | None:
+        return self._files.get(filename)
+
+
+static_content = StaticContent()
+
+
+async def content_endpoint(request: Request) -> Response:
+    filename = request.path_params["filename"]
+    body = static_content.file(filename)
+    if body is None:
+        return Response(status_code=404)
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": f'"{filename}"'}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def serve_static_content(app):
+    """Serve the shared content from the backend at /_content/<name>.<hash>.json."""
+    static_content.refresh()
+    if app._api is not None:
+        app._api.add_route(
+            f"{CONTENT_ROUTE}/{{filename}}", content_endpoint, methods=["GET"]
+        )
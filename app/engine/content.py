@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, NamedTuple
+
+from app.engine.tracing import tracer
+
+
+class CachedDocument(NamedTuple):
+    digest: str
+    mtime: float | None
+    data: Any
+
+
+def content_digest(content: str | bytes) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def apply_text_changes(content: str, changes: list[list]) -> str:
+    if content.isascii():
+        for offset, length, text in sorted(changes, key=lambda c: c[0], reverse=True):
+            content = content[:offset] + text + content[offset + length :]
+        return content
+    # Monaco offsets count UTF-16 code units, not code points.
+    encoded = content.encode("utf-16-le")
+    for offset, length, text in sorted(changes, key=lambda c: c[0], reverse=True):
+        encoded = (
+            encoded[: offset * 2]
+            + text.encode("utf-16-le")
+            + encoded[(offset + length) * 2 :]
+        )
+    return encoded.decode("utf-16-le")
+
+
+class ContentConflictError(Exception):
+    def __init__(self, path: str, expected: str | None, actual: str | None):
+        super().__init__(f"{path} changed on disk since it was loaded")
+        self.path = path
+        self.expected = expected
+        self.actual = actual
+
+
+# Read once; os.umask can only be queried by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_atomic(path: str, content: str | bytes, mode: int | None = None):
+    """Replace `path` in one step. The file keeps the mode it had, or gets
+    0644 less the umask when new, rather than mkstemp's private 0600."""
+    dir_path = os.path.dirname(path) or "."
+    if mode is None:
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except OSError:
+            mode = 0o644 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(
+        dir=dir_path, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with tracer.span("write", "io", path=path):
+            with os.fdopen(fd, "wb") as f:
+                f.write(
+                    content.encode("utf-8") if isinstance(content, str) else content
+                )
+                f.flush()
+                os.fchmod(f.fileno(), mode)
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ContentCache:
+    def __init__(self):
+        self._documents: dict[str, CachedDocument] = {}
+        self._drafts: dict[str, CachedDocument] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def get(self, path: str) -> CachedDocument | None:
+        return self._documents.get(os.path.abspath(path))
+
+    def parse(self, path: str, content: str) -> Any:
+        key = os.path.abspath(path)
+        digest = content_digest(content)
+        for cached in (self._drafts.get(key), self._documents.get(key)):
+            if cached is not None and cached.digest == digest:
+                return cached.data
+        data = json.loads(content)
+        with self._lock:
+            self._drafts[key] = CachedDocument(digest, None, data)
+        return data
+
+    def put(self, path: str, content: str, data: Any | None = None) -> Any:
+        key = os.path.abspath(path)
+        if data is None:
+            data = json.loads(content)
+        try:
+            mtime = os.path.getmtime(key)
+        except OSError:
+            mtime = None
+        with self._lock:
+            self._documents[key] = CachedDocument(content_digest(content), mtime, data)
+            self._drafts.pop(key, None)
+        return data
+
+    def disk_digest(self, path: str) -> str | None:
+        if not os.path.exists(path):
+            return None
+        self.load(path)
+        return self._documents[os.path.abspath(path)].digest
+
+    def save(self, path: str, content: str, expected_digest: str | None = None) -> str:
+        key = os.path.abspath(path)
+        data = json.loads(content)
+        with self._write_lock:
+            if expected_digest is not None:
+                actual = self.disk_digest(key)
+                if actual != expected_digest:
+                    raise ContentConflictError(key, expected_digest, actual)
+            write_atomic(key, content)
+            self.put(key, content, data)
+        return self._documents[key].digest
+
+    def load(self, path: str) -> Any:
+        key = os.path.abspath(path)
+        mtime = os.path.getmtime(key)
+        cached = self._documents.get(key)
+        if cached is not None and cached.mtime == mtime:
+            return cached.data
+        with tracer.span("read", "io", path=key), open(key, "rb") as f:
+            raw = f.read()
+        digest = content_digest(raw)
+        if cached is not None and cached.digest == digest:
+            data = cached.data
+        else:
+            data = json.loads(raw)
+        with self._lock:
+            self._documents[key] = CachedDocument(digest, mtime, data)
+        return data
+
+    def evict(self, paths: list[str]):
+        """Forget loaded documents. Unsaved drafts are kept."""
+        with self._lock:
+            for path in paths:
+                self._documents.pop(os.path.abspath(path), None)
+
+    def load_dir(self, dir_path: str) -> dict[str, Any]:
+        documents = {}
+        if not os.path.exists(dir_path):
+            return documents
+        for filename in sorted(os.listdir(dir_path)):
+            if filename.endswith(".json"):
+                path = os.path.join(dir_path, filename)
+                try:
+                    documents[path] = self.load(path)
+                except Exception as e:
+                    logging.exception(f"Failed to load {path}: {e}")
+        return documents
+
+
+content_cache = ContentCache()
@@ -0,0 +1,384 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import inspect
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable
+
+from reflex.middleware import Middleware
+from reflex.state import State
+from reflex.utils import format
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from app.engine.tracing import current_span, tracer
+
+METRICS_ROUTE = "/metrics"
+TRACES_ROUTE = "/traces"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Set to 1 to also time computed vars and state lock waits. These wrap Reflex
+# internals rather than using its middleware, so they are opt-in.
+PROFILE_ENV = "GAME_PROFILE"
+# Only one in this many deltas is serialized again to measure its size.
+DELTA_SAMPLE_EVERY = 16
+SECONDS_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+BYTES_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Handler that owns the current event, set before it runs so its updates,
+# errors and any background task it starts can be attributed.
+current_handler: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_handler", default="unknown"
+)
+_event_start: contextvars.ContextVar[float] = contextvars.ContextVar(
+    "event_start", default=0.0
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self.values.items())
+        return [
+            f"{self.name}{_labels(self.labels, key)} {value:g}" for key, value in values
+        ]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...],
+        buckets: tuple[float, ...] = SECONDS_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # Per series: one count per bucket plus +Inf, then the sum.
+        self.series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self.series.items())
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), values):
+                cumulative += count
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labels, key, le=le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {values[-1]:g}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, read: Callable[[], float]):
+        self.name = name
+        self.description = description
+        self.read = read
+
+    def samples(self) -> list[str]:
+        return [f"{self.name} {self.read():g}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: list[Counter | Histogram | Gauge] = []
+
+    def counter(self, name: str, description: str, labels: tuple[str, ...]) -> Counter:
+        metric = Counter(name, description, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...],
+        buckets: tuple[float, ...] = SECONDS_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, description, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, description: str, read: Callable[[], float]) -> Gauge:
+        metric = Gauge(name, description, read)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+handler_seconds = metrics.histogram(
+    "game_handler_duration_seconds",
+    "Time from an event getting its state lock to its final update.",
+    ("handler",),
+)
+handler_errors = metrics.counter(
+    "game_handler_exceptions_total",
+    "Exceptions raised by event handlers.",
+    ("handler", "exception"),
+)
+lock_wait_seconds = metrics.histogram(
+    "game_state_lock_wait_seconds",
+    "Time waiting for the session state lock, including loading the state.",
+    ("handler",),
+)
+delta_bytes = metrics.histogram(
+    "game_state_delta_bytes",
+    f"Serialized size of state deltas, sampled one in {DELTA_SAMPLE_EVERY}.",
+    ("handler",),
+    BYTES_BUCKETS,
+)
+computed_var_seconds = metrics.histogram(
+    "game_computed_var_duration_seconds",
+    "Time spent recomputing computed vars.",
+    ("var",),
+)
+computed_var_errors = metrics.counter(
+    "game_computed_var_exceptions_total",
+    "Exceptions raised by computed vars.",
+    ("var", "exception"),
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def event_label(event_name: str) -> str:
+    """Short `StateClass.handler` label for a fully qualified event name."""
+    state_path, _, handler = event_name.rpartition(".")
+    try:
+        state_name = State.get_class_substate(state_path).__name__
+    except ValueError:
+        state_name = state_path.rpartition(".")[2] or "unknown"
+    return f"{state_name}.{handler}"
+
+
+def _timed(
+    fn: Callable, label: str, cat: str, seconds: Histogram, errors: Counter
+) -> Callable:
+    def failed(e: Exception):
+        errors.inc(label, type(e).__name__)
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with tracer.span(label, cat):
+                    return await fn(*args, **kwargs)
+            except Exception as e:
+                failed(e)
+                raise
+            finally:
+                seconds.observe(time.perf_counter() - start, label)
+
+    else:
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with tracer.span(label, cat):
+                    return fn(*args, **kwargs)
+            except Exception as e:
+                failed(e)
+                raise
+            finally:
+                seconds.observe(time.perf_counter() - start, label)
+
+    # Reflex's dependency tracker unboxes `.func`, so computed var
+    # dependencies are still read from the original function.
+    wrapper.func = fn
+    wrapper._metrics_label = label
+    return wrapper
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "") == "1"
+
+
+def instrument_state(state_cls: type[State]):
+    """Time every computed var defined on a state class. Only with
+    GAME_PROFILE=1, since it replaces the vars' private getters."""
+    if not profiling_enabled():
+        return
+    for name, var in state_cls.computed_vars.items():
+        # The class attribute is a separate copy of the var and is the one
+        # evaluated when the delta is built.
+        for computed in {
+            id(v): v for v in (var, state_cls.__dict__.get(name))
+        }.values():
+            if not hasattr(computed, "_fget"):
+                msg = (
+                    f"Cannot profile {state_cls.__name__}.{name}: computed vars "
+                    f"no longer have _fget. Unset {PROFILE_ENV}."
+                )
+                raise RuntimeError(msg)
+            fn = computed._fget
+            if not inspect.isfunction(fn) or hasattr(fn, "_metrics_label"):
+                continue
+            wrapped = _timed(
+                fn,
+                f"{state_cls.__name__}.{name}",
+                "computed_var",
+                computed_var_seconds,
+                computed_var_errors,
+            )
+            object.__setattr__(computed, "_fget", wrapped)
+
+
+def _time_lock_waits(state_manager):
+    modify_state = getattr(state_manager, "modify_state", None)
+    if modify_state is None:
+        msg = (
+            f"Cannot profile lock waits on {type(state_manager).__name__}: it has "
+            f"no modify_state. Unset {PROFILE_ENV}."
+        )
+        raise RuntimeError(msg)
+
+    @contextlib.asynccontextmanager
+    async def timed_modify_state(token: str, **context: Any):
+        event = context.get("event")
+        label = event_label(event.name) if event is not None else current_handler.get()
+        start = time.perf_counter()
+        async with modify_state(token, **context) as state:
+            lock_wait_seconds.observe(time.perf_counter() - start, label)
+            yield state
+
+    state_manager.modify_state = timed_modify_state
+
+
+class MetricsMiddleware(Middleware):
+    """Times events, samples delta sizes and links the events a handler
+    returns into its trace, through Reflex's middleware hooks."""
+
+    def __init__(self):
+        self._updates = itertools.count()
+
+    async def preprocess(self, app, state, event):
+        label = event_label(event.name)
+        # Runs in the task that processes the event; background tasks copy
+        # this context when they are created.
+        current_handler.set(label)
+        _event_start.set(time.perf_counter())
+        tracer.begin_event(event.token, event.name, label)
+
+    async def postprocess(self, app, state, event, update):
+        label = current_handler.get()
+        if update.delta and next(self._updates) % DELTA_SAMPLE_EVERY == 0:
+            delta_bytes.observe(
+                len(format.json_dumps(update.delta).encode("utf-8")), label
+            )
+        if (ctx := current_span.get()) is not None:
+            for queued in update.events:
+                tracer.link(event.token, queued.name, ctx)
+            if update.final:
+                tracer.end_event(ctx)
+        if update.final and (start := _event_start.get()):
+            handler_seconds.observe(time.perf_counter() - start, label)
+        return update
+
+
+def _count_errors(app):
+    handle = app.backend_exception_handler
+
+    def count_backend_exception(exception: Exception):
+        handler_errors.inc(current_handler.get(), type(exception).__name__)
+        return handle(exception)
+
+    app.backend_exception_handler = count_backend_exception
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
+async def traces_endpoint(request: Request) -> JSONResponse:
+    return JSONResponse(
+        tracer.export(request.query_params.get("trace_id")),
+        headers={"Content-Disposition": 'attachment; filename="trace.json"'},
+    )
+
+
+def instrument_app(app, states: list[type[State]]):
+    """Serve metrics at /metrics and Chrome trace JSON at /traces. Traces
+    stay empty unless GAME_TRACING=1; computed var and lock wait timings
+    are only collected with GAME_PROFILE=1."""
+    app.add_middleware(MetricsMiddleware())
+    _count_errors(app)
+    if profiling_enabled():
+        for state_cls in states:
+            instrument_state(state_cls)
+        if app._state_manager is not None:
+            _time_lock_waits(app._state_manager)
+    if app._api is not None:
+        app._api.add_route(METRICS_ROUTE, metrics_endpoint, methods=["GET"])
+        app._api.add_route(TRACES_ROUTE, traces_endpoint, methods=["GET"])
@@ -0,0 +1,333 @@
+import asyncio
+import collections
+import json
+import logging
+import os
+import threading
+import time
+
+from app.engine.catalog import CHARACTERS_DIR, ITEMS_DIR
+from app.engine.content import content_cache, content_digest, write_atomic
+from app.engine.metrics import metrics
+from app.engine.story import SCENES_DIR, load_scene_file
+from app.engine.story_graph import START_SCENE, scene_targets
+
+PARTITIONS_PATH = "assets/game_data/partitions.json"
+REGIONS_DIR = "assets/game_data/maps/regions"
+# Scenes per chapter partition when scenes do not name their chapter.
+PARTITION_SIZE = 250
+# Partitions this many transitions ahead of a player are streamed in.
+PREFETCH_DEPTH = 1
+# Positions not refreshed for this long no longer keep partitions loaded.
+POSITION_TTL = 300.0
+SHARED = "shared"
+
+partition_loads = metrics.counter(
+    "game_partition_loads_total",
+    "Content partitions read into memory, by whether it was prefetched.",
+    ("mode",),
+)
+partition_misses = metrics.counter(
+    "game_partition_misses_total",
+    "Scenes looked up before their partition was streamed in.",
+    (),
+)
+partition_evictions = metrics.counter(
+    "game_partition_evictions_total",
+    "Content partitions dropped because no player can reach them.",
+    (),
+)
+
+
+def _json_files(dir_path: str) -> dict[str, str]:
+    """Documents in `dir_path` keyed by their id, mapped to their path."""
+    files = {}
+    if not os.path.isdir(dir_path):
+        return files
+    for root, _, filenames in os.walk(dir_path):
+        for filename in sorted(filenames):
+            if filename.endswith(".json"):
+                files[os.path.splitext(filename)[0]] = os.path.join(root, filename)
+    return files
+
+
+def build_manifest(
+    scenes_dir: str = SCENES_DIR,
+    regions_dir: str = REGIONS_DIR,
+    start: str = START_SCENE,
+    size: int = PARTITION_SIZE,
+) -> dict:
+    """Assign every scene to a chapter and every regional map to a region.
+
+    Scenes with a "chapter" field use it. The rest are cut into chapters of
+    `size` scenes in breadth-first order from `start`, so a chapter holds
+    scenes a player meets around the same time. Characters belong to the
+    first chapter that shows them and items to their folder's partition.
+    """
+    files = {}
+    scenes = {}
+    for name, path in _json_files(scenes_dir).items():
+        # Read without caching so building a manifest does not load the game.
+        with open(path, "rb") as f:
+            scenes[name] = json.loads(f.read())
+        files[name] = path
+
+    order = []
+    seen = set()
+    queue = collections.deque([start] if start in scenes else [])
+    seen.update(queue)
+    while queue:
+        scene_id = queue.popleft()
+        order.append(scene_id)
+        for target in scene_targets(scenes[scene_id]):
+            if target in scenes and target not in seen:
+                seen.add(target)
+                queue.append(target)
+    order.extend(sorted(set(scenes) - seen))
+
+    scene_partition = {}
+    counted = 0
+    for scene_id in order:
+        chapter = scenes[scene_id].get("chapter")
+        if chapter is None:
+            chapter = f"{counted // size:03d}"
+            counted += 1
+        scene_partition[scene_id] = f"chapter_{chapter}"
+
+    partitions: dict[str, dict] = {}
+    character_partition = {}
+    for scene_id in order:
+        pid = scene_partition[scene_id]
+        partition = partitions.setdefault(
+            pid, {"scenes": [], "characters": set(), "next": set()}
+        )
+        partition["scenes"].append(scene_id)
+        scene = scenes[scene_id]
+        for char_id in {
+            *(line.get("character") for line in scene.get("dialogue") or []),
+            *(sprite.get("id") for sprite in scene.get("characters") or []),
+        } - {None}:
+            partition["characters"].add(char_id)
+            character_partition.setdefault(char_id, pid)
+        for target in scene_targets(scene):
+            target_pid = scene_partition.get(target)
+            if target_pid is not None and target_pid != pid:
+                partition["next"].add(target_pid)
+
+    region_files = _json_files(regions_dir)
+    for region_id in region_files:
+        partitions[region_id] = {"regions": [region_id], "next": set()}
+
+    for char_id in _json_files(CHARACTERS_DIR):
+        character_partition.setdefault(char_id, SHARED)
+    item_partition = {}
+    for folder in sorted(os.listdir(ITEMS_DIR)) if os.path.isdir(ITEMS_DIR) else []:
+        for item_id in _json_files(os.path.join(ITEMS_DIR, folder)):
+            item_partition[item_id] = f"items_{folder}"
+
+    for partition in partitions.values():
+        for key in ("characters", "next"):
+            if key in partition:
+                partition[key] = sorted(partition[key])
+    manifest = {
+        "start": start,
+        "partitions": partitions,
+        "scenes": scene_partition,
+        "characters": character_partition,
+        "items": item_partition,
+        "regions": {region_id: region_id for region_id in region_files},
+        "files": {**files, **region_files},
+    }
+    manifest["version"] = content_digest(json.dumps(manifest, sort_keys=True))[:16]
+    return manifest
+
+
+def write_manifest(manifest: dict, path: str = PARTITIONS_PATH):
+    write_atomic(path, json.dumps(manifest, indent=2, sort_keys=True))
+
+
+class ContentStreamer:
+    """Keeps only the content partitions that some player can reach soon.
+
+    Each player's position is the partition of their current scene, plus
+    the region whose map they have open. Moving streams in the partitions
+    within `depth` transitions on a worker thread and drops any partition no
+    tracked player can reach any more. A scene looked up before its
+    partition arrives is read on its own.
+    """
+
+    def __init__(
+        self,
+        manifest_path: str = PARTITIONS_PATH,
+        depth: int = PREFETCH_DEPTH,
+        position_ttl: float = POSITION_TTL,
+    ):
+        self.manifest_path = manifest_path
+        self.depth = depth
+        self.position_ttl = position_ttl
+        self._manifest: dict | None = None
+        self._root: str | None = None
+        self.resident: set[str] = set()
+        self._positions: dict[str, tuple[str, float]] = {}
+        self._loading: dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def manifest(self) -> dict:
+        # Content paths are relative to the working directory, so a manifest
+        # read from another one points at other files.
+        if self._manifest is None or self._root != os.getcwd():
+            self._root = os.getcwd()
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path) as f:
+                    manifest = json.load(f)
+            else:
+                logging.info(
+                    f"{self.manifest_path} not found, partitioning content at "
+                    "startup. Run app.tools.partition_content to build it ahead."
+                )
+                manifest = build_manifest()
+            # Absolute, so prefetches that finish after a chdir read the
+            # files the manifest was built from.
+            manifest["files"] = {
+                doc_id: os.path.abspath(path)
+                for doc_id, path in manifest["files"].items()
+            }
+            self._manifest = manifest
+        return self._manifest
+
+    def reload(self):
+        with self._lock:
+            self._manifest = None
+
+    def partition_of(self, scene_id: str) -> str | None:
+        return self.manifest["scenes"].get(scene_id)
+
+    def _paths(self, pid: str) -> list[str]:
+        partition = self.manifest["partitions"].get(pid, {})
+        files = self.manifest["files"]
+        ids = [*partition.get("scenes", []), *partition.get("regions", [])]
+        return [files[doc_id] for doc_id in ids if doc_id in files]
+
+    def _load_partition(self, pid: str, mode: str):
+        for path in self._paths(pid):
+            try:
+                content_cache.load(path)
+            except FileNotFoundError:
+                logging.warning(f"Skipping {path}: it no longer exists")
+            except Exception as e:
+                logging.exception(f"Failed to load {path}: {e}")
+        with self._lock:
+            self.resident.add(pid)
+        partition_loads.inc(mode)
+
+    def _ensure(self, pid: str | None):
+        if pid is not None and pid not in self.resident:
+            self._load_partition(pid, "demand")
+
+    def scene(self, scene_id: str) -> dict | None:
+        pid = self.partition_of(scene_id)
+        if pid is not None and pid not in self.resident:
+            # Only this scene is read here; focus() streams in the rest.
+            partition_misses.inc()
+        path = self.manifest["files"].get(scene_id)
+        if path is None:
+            return load_scene_file(scene_id)
+        return load_scene_file(scene_id, os.path.dirname(path))
+
+    def region(self, region_id: str) -> dict | None:
+        self._ensure(self.manifest["regions"].get(region_id))
+        path = self.manifest["files"].get(
+            region_id, os.path.join(REGIONS_DIR, f"{region_id}.json")
+        )
+        if not os.path.exists(path):
+            logging.error(f"Regional map not found: {path}")
+            return None
+        try:
+            return content_cache.load(path)
+        except Exception as e:
+            logging.exception(f"Error loading regional map {region_id}: {e}")
+            return None
+
+    def reachable(self, pid: str, depth: int | None = None) -> set[str]:
+        partitions = self.manifest["partitions"]
+        depth = self.depth if depth is None else depth
+        seen = {pid}
+        frontier = [pid]
+        for _ in range(depth):
+            frontier = [
+                target
+                for source in frontier
+                for target in partitions.get(source, {}).get("next", [])
+                if target not in seen
+            ]
+            seen.update(frontier)
+        return seen
+
+    def focus(self, token: str, pid: str | None):
+        """Record where a player is, prefetch what is ahead of them and evict
+        what nobody can reach."""
+        now = time.monotonic()
+        if pid is None:
+            self._positions.pop(token, None)
+        else:
+            self._positions[token] = (pid, now)
+            ahead = self.reachable(pid) - self.resident
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            for target in ahead:
+                if loop is None:
+                    self._load_partition(target, "prefetch")
+                elif target not in self._loading:
+                    self._loading[target] = loop.create_task(self._prefetch(target))
+        self.evict(now)
+
+    def focus_region(self, token: str, region_id: str | None):
+        """Track the region a player has open as a second position, so its
+        map stays loaded until they leave it."""
+        pid = self.manifest["regions"].get(region_id) if region_id else None
+        self.focus(f"{token}#region", pid)
+
+    async def _prefetch(self, pid: str):
+        try:
+            await asyncio.to_thread(self._load_partition, pid, "prefetch")
+        finally:
+            self._loading.pop(pid, None)
+
+    async def drain(self, cancel: bool = False):
+        """Wait for partitions still being prefetched, or cancel them first.
+
+        A cancelled prefetch stops waiting, but a file read already on a
+        worker thread still completes.
+        """
+        tasks = list(self._loading.values())
+        if cancel:
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def evict(self, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        needed = set()
+        for token, (pid, seen) in list(self._positions.items()):
+            if now - seen > self.position_ttl:
+                del self._positions[token]
+            else:
+                needed |= self.reachable(pid)
+        with self._lock:
+            stale = self.resident - needed - set(self._loading)
+            self.resident -= stale
+        for pid in stale:
+            content_cache.evict(self._paths(pid))
+            partition_evictions.inc()
+
+
+content_streamer = ContentStreamer()
+
+metrics.gauge(
+    "game_partitions_resident",
+    "Content partitions currently held in memory.",
+    lambda: len(content_streamer.resident),
+)
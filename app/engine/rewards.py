@@ -0,0 +1,27 @@
+import random
+from typing import TypedDict
+
+LEVEL_XP_GROWTH = 1.5
+
+
+class RewardSummary(TypedDict):
+    xp: int
+    items: dict[str, int]
+
+
+def roll_rewards(rewards: dict, rng: random.Random, times: int = 1) -> RewardSummary:
+    xp_lo, xp_hi = rewards.get("xp", [0, 0])
+    loot = rewards.get("loot", [])
+    xp = 0
+    items: dict[str, int] = {}
+    for _ in range(times):
+        xp += rng.randint(xp_lo, xp_hi)
+        for entry in loot:
+            if rng.random() < entry["chance"]:
+                qty = rng.randint(entry["min"], entry["max"])
+                items[entry["item_id"]] = items.get(entry["item_id"], 0) + qty
+    return {"xp": xp, "items": items}
+
+
+def next_level_threshold(xp_to_next_level: int) -> int:
+    return int(xp_to_next_level * LEVEL_XP_GROWTH)
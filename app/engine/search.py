@@ -0,0 +1,288 @@
+import bisect
+import heapq
+import logging
+import os
+import re
+import shlex
+import threading
+from typing import Any, TypedDict
+
+from app.engine.content import content_cache
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+CONTENT_DIRS = (
+    "assets/game_data/scenes",
+    "assets/game_data/items",
+    "assets/game_data/maps/regions",
+)
+WORLD_MAP_PATH = "assets/game_data/maps/world_map.json"
+
+
+class SearchDocument(TypedDict):
+    id: str
+    kind: str
+    path: str
+    label: str
+    text: str
+    position: int
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> list[tuple[str, list[str]]]:
+    """Split a query into quoted phrases, whole terms and the prefix of the
+    word still being typed."""
+    try:
+        parts = shlex.split(query)
+    except ValueError:
+        parts = query.replace('"', " ").split()
+    # Only the word still being typed is expanded as a prefix.
+    typing = bool(parts) and not query[-1:].isspace() and not query.endswith('"')
+    clauses = []
+    for i, part in enumerate(parts):
+        words = tokenize(part)
+        if len(words) > 1:
+            clauses.append(("phrase", words))
+        elif words:
+            is_last = typing and i == len(parts) - 1
+            clauses.append(("prefix" if is_last else "term", words))
+    return clauses
+
+
+def matches_query(clauses: list[tuple[str, list[str]]], text: str) -> bool:
+    """Whether `text` satisfies every clause, without building an index."""
+    if not clauses:
+        return False
+    tokens = tokenize(text)
+    for kind, words in clauses:
+        if kind == "term":
+            found = words[0] in tokens
+        elif kind == "prefix":
+            found = any(token.startswith(words[0]) for token in tokens)
+        else:
+            size = len(words)
+            found = any(
+                tokens[i : i + size] == words for i in range(len(tokens) - size + 1)
+            )
+        if not found:
+            return False
+    return True
+
+
+class InvertedIndex:
+    def __init__(self):
+        self.documents: dict[str, SearchDocument] = {}
+        self._postings: dict[str, dict[str, list[int]]] = {}
+        self._doc_tokens: dict[str, set[str]] = {}
+        self._sources: dict[str, set[str]] = {}
+        self._source_digests: dict[str, str] = {}
+        self._tokens: list[str] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add(self, doc: SearchDocument):
+        with self._lock:
+            if doc["id"] in self.documents:
+                self.remove(doc["id"])
+            self.documents[doc["id"]] = doc
+            self._sources.setdefault(doc["path"], set()).add(doc["id"])
+            tokens = tokenize(doc["text"])
+            self._doc_tokens[doc["id"]] = set(tokens)
+            for position, token in enumerate(tokens):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    bisect.insort(self._tokens, token)
+                postings.setdefault(doc["id"], []).append(position)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            doc = self.documents.pop(doc_id, None)
+            if doc is None:
+                return
+            self._sources.get(doc["path"], set()).discard(doc_id)
+            for token in self._doc_tokens.pop(doc_id, set()):
+                postings = self._postings[token]
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+                    del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def replace_source(
+        self, path: str, docs: list[SearchDocument], digest: str | None = None
+    ):
+        with self._lock:
+            for doc_id in list(self._sources.pop(path, set())):
+                self.remove(doc_id)
+            for doc in docs:
+                self.add(doc)
+            if digest is not None:
+                self._source_digests[path] = digest
+
+    def source_digest(self, path: str) -> str | None:
+        return self._source_digests.get(path)
+
+    def _prefix_postings(self, prefix: str) -> dict[str, int]:
+        matches: dict[str, int] = {}
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + "\U0010ffff", start)
+        for token in self._tokens[start:end]:
+            for doc_id, positions in self._postings[token].items():
+                matches[doc_id] = matches.get(doc_id, 0) + len(positions)
+        return matches
+
+    def _phrase_postings(self, words: list[str]) -> dict[str, int]:
+        first = self._postings.get(words[0], {})
+        matches: dict[str, int] = {}
+        for doc_id, positions in first.items():
+            hits = set(positions)
+            for offset, word in enumerate(words[1:], start=1):
+                next_positions = self._postings.get(word, {}).get(doc_id)
+                if not next_positions:
+                    hits = set()
+                    break
+                hits &= {p - offset for p in next_positions}
+                if not hits:
+                    break
+            if hits:
+                matches[doc_id] = len(hits)
+        return matches
+
+    def search(
+        self, query: str, limit: int = 50, kinds: set[str] | None = None
+    ) -> list[SearchDocument]:
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        with self._lock:
+            scores: dict[str, int] | None = None
+            for kind, words in sorted(clauses, key=lambda c: -len(c[1][0])):
+                if kind == "phrase":
+                    matches = self._phrase_postings(words)
+                elif kind == "term":
+                    matches = {
+                        doc_id: len(positions)
+                        for doc_id, positions in self._postings.get(
+                            words[0], {}
+                        ).items()
+                    }
+                else:
+                    matches = self._prefix_postings(words[0])
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {
+                        doc_id: score + matches[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in matches
+                    }
+                if not scores:
+                    return []
+            hits = [
+                self.documents[doc_id]
+                for doc_id in scores
+                if kinds is None or self.documents[doc_id]["kind"] in kinds
+            ]
+        return heapq.nsmallest(
+            limit, hits, key=lambda doc: (-scores[doc["id"]], doc["id"])
+        )
+
+
+def documents_for_file(path: str, data: Any) -> list[SearchDocument]:
+    path = os.path.normpath(path)
+    docs: list[SearchDocument] = []
+    if path.startswith(os.path.normpath("assets/game_data/scenes")):
+        scene_id = data.get("id", path)
+        for i, line in enumerate(data.get("dialogue", [])):
+            docs.append(
+                {
+                    "id": f"{path}#dialogue{i}",
+                    "kind": "dialogue",
+                    "path": path,
+                    "label": f"{scene_id} · {line.get('character', '')}",
+                    "text": line.get("text", ""),
+                    "position": i,
+                }
+            )
+        for i, choice in enumerate(data.get("choices") or []):
+            docs.append(
+                {
+                    "id": f"{path}#choice{i}",
+                    "kind": "choice",
+                    "path": path,
+                    "label": f"{scene_id} · choice",
+                    "text": choice.get("text", ""),
+                    "position": i,
+                }
+            )
+    elif path.startswith(os.path.normpath("assets/game_data/items")):
+        docs.append(
+            {
+                "id": f"{path}#item",
+                "kind": "item",
+                "path": path,
+                "label": data.get("name", path),
+                "text": f"{data.get('name', '')} {data.get('description', '')}",
+                "position": 0,
+            }
+        )
+    elif path.startswith(os.path.normpath("assets/game_data/maps/regions")):
+        for i, loc in enumerate(data.get("locations", [])):
+            docs.append(
+                {
+                    "id": f"{path}#{loc['id']}",
+                    "kind": "location",
+                    "path": path,
+                    "label": f"{data.get('name', '')} · {loc.get('name', '')}",
+                    "text": f"{loc.get('name', '')} {loc.get('description', '')}",
+                    "position": i,
+                }
+            )
+    elif path == os.path.normpath(WORLD_MAP_PATH):
+        for i, loc in enumerate(data):
+            docs.append(
+                {
+                    "id": f"{path}#{loc['id']}",
+                    "kind": "location",
+                    "path": path,
+                    "label": loc.get("name", ""),
+                    "text": f"{loc.get('name', '')} {loc.get('description', '')}",
+                    "position": i,
+                }
+            )
+    return docs
+
+
+def index_file(index: InvertedIndex, path: str, data: Any | None = None):
+    path = os.path.normpath(path)
+    if data is None:
+        data = content_cache.load(path)
+    cached = content_cache.get(path)
+    digest = cached.digest if cached else None
+    if digest is not None and index.source_digest(path) == digest:
+        return
+    index.replace_source(path, documents_for_file(path, data), digest)
+
+
+def refresh_content_index(index: InvertedIndex):
+    paths = [WORLD_MAP_PATH] if os.path.exists(WORLD_MAP_PATH) else []
+    for dir_path in CONTENT_DIRS:
+        for root, _, filenames in os.walk(dir_path):
+            paths.extend(
+                os.path.join(root, name)
+                for name in sorted(filenames)
+                if name.endswith(".json")
+            )
+    for path in paths:
+        try:
+            index_file(index, path)
+        except Exception as e:
+            logging.exception(f"Failed to index {path}: {e}")
+
+
+content_index = InvertedIndex()
@@ -0,0 +1,281 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import pickle
+import time
+import zlib
+
+from reflex.state import BaseState, _split_substate_key
+from reflex.utils import prerequisites
+
+from app.engine.content import write_atomic
+from app.engine.metrics import metrics
+from app.engine.tracing import tracer
+
+IDLE_TIMEOUT = 300.0
+SWEEP_INTERVAL = 30.0
+RETENTION = 7 * 24 * 3600
+SESSION_SUFFIX = ".session"
+# Set to 1 to hibernate idle sessions. Opt-in because it wraps the memory and
+# disk state managers' get_state, which Reflex does not offer a hook for.
+HIBERNATION_ENV = "GAME_HIBERNATION"
+SIZE_BUCKETS = (4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+rehydrate_seconds = metrics.histogram(
+    "game_session_rehydrate_seconds",
+    "Time to load a hibernated session back into memory.",
+    (),
+)
+hibernate_seconds = metrics.histogram(
+    "game_session_hibernate_seconds",
+    "Time to write an idle session to disk and evict it.",
+    (),
+)
+hibernated_bytes = metrics.histogram(
+    "game_session_hibernated_bytes",
+    "Compressed size of hibernated sessions.",
+    (),
+    SIZE_BUCKETS,
+)
+
+
+def serialize_session(root: BaseState) -> bytes:
+    """Every substate of a session, compressed into a single blob."""
+    payload = {}
+    pending = [root]
+    while pending:
+        state = pending.pop()
+        payload[state.get_full_name()] = state._serialize()
+        pending.extend(state.substates.values())
+    return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def restore_session(state_cls: type[BaseState], data: bytes) -> BaseState:
+    """Rebuild a session tree. Substates that were added since the session
+    was stored, or whose schema changed, start fresh."""
+    payload = pickle.loads(zlib.decompress(data))
+
+    def restore(fresh: BaseState, parent: BaseState | None) -> BaseState:
+        instance = fresh
+        if blob := payload.get(fresh.get_full_name()):
+            try:
+                instance = BaseState._deserialize(blob)
+            except Exception as e:
+                logging.warning(f"Discarding stored {fresh.get_full_name()}: {e}")
+        children = list(fresh.substates.items())
+        instance.substates = {}
+        instance.parent_state = parent
+        for name, child in children:
+            instance.substates[name] = restore(child, instance)
+        return instance
+
+    return restore(state_cls(_reflex_internal_init=True), None)
+
+
+class SessionHibernator:
+    """Moves idle sessions out of the state manager's memory and back.
+
+    Works with the memory and disk state managers, which both keep every
+    session's root state in `states`. Rehydration hooks `get_state`, which
+    they call while holding the session lock, so an event never sees a
+    half-evicted session."""
+
+    def __init__(
+        self,
+        state_manager,
+        store_dir: str,
+        idle_timeout: float = IDLE_TIMEOUT,
+        sweep_interval: float = SWEEP_INTERVAL,
+        retention: float = RETENTION,
+    ):
+        self.manager = state_manager
+        self.store_dir = store_dir
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.retention = retention
+        self.last_seen: dict[str, float] = {}
+        os.makedirs(store_dir, exist_ok=True)
+        # Sessions stored by an earlier run are picked up again.
+        self.hibernated = {
+            name.removesuffix(SESSION_SUFFIX)
+            for name in os.listdir(store_dir)
+            if name.endswith(SESSION_SUFFIX)
+        }
+        self._rehydrate_locks: dict[str, asyncio.Lock] = {}
+        self._wrap_get_state()
+
+    @property
+    def resident(self) -> int:
+        return len(self.manager.states)
+
+    def _key(self, client_token: str) -> str:
+        return hashlib.sha256(client_token.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.store_dir, key + SESSION_SUFFIX)
+
+    def _wrap_get_state(self):
+        get_state = self.manager.get_state
+
+        async def get_state_or_rehydrate(token: str) -> BaseState:
+            client_token = _split_substate_key(token)[0]
+            self.last_seen[client_token] = time.monotonic()
+            if (
+                self.hibernated
+                and client_token not in self.manager.states
+                and self._key(client_token) in self.hibernated
+            ):
+                await self.rehydrate(client_token)
+            return await get_state(token)
+
+        self.manager.get_state = get_state_or_rehydrate
+
+    def _read_session(self, path: str) -> BaseState:
+        with open(path, "rb") as f:
+            data = f.read()
+        return restore_session(self.manager.state, data)
+
+    async def rehydrate(self, client_token: str) -> bool:
+        key = self._key(client_token)
+        if key not in self.hibernated:
+            return False
+        # One lock per session, so restoring a large session only holds up
+        # requests for that same session.
+        lock = self._rehydrate_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self.hibernated or client_token in self.manager.states:
+                return False
+            start = time.perf_counter()
+            path = self._path(key)
+            with tracer.span("rehydrate session", "io"):
+                try:
+                    root = await asyncio.to_thread(self._read_session, path)
+                except Exception as e:
+                    logging.exception(f"Failed to rehydrate session {key}: {e}")
+                    root = None
+            self.hibernated.discard(key)
+            self._rehydrate_locks.pop(key, None)
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+            if root is None:
+                return False
+            self.manager.states[client_token] = root
+            rehydrate_seconds.observe(time.perf_counter() - start)
+            return True
+
+    async def hibernate(self, client_token: str) -> bool:
+        lock = self.manager._states_locks.get(client_token)
+        if lock is not None and lock.locked():
+            return False
+        async with lock or contextlib.nullcontext():
+            root = self.manager.states.get(client_token)
+            if root is None:
+                return False
+            start = time.perf_counter()
+            key = self._key(client_token)
+            # Holding the session lock, so nothing mutates the tree while
+            # it is pickled off the event loop.
+            data = await asyncio.to_thread(serialize_session, root)
+            # Sessions are never served, so they stay private to the server.
+            await asyncio.to_thread(write_atomic, self._path(key), data, 0o600)
+            self.manager.states.pop(client_token, None)
+            self.last_seen.pop(client_token, None)
+            self.hibernated.add(key)
+        hibernate_seconds.observe(time.perf_counter() - start)
+        hibernated_bytes.observe(len(data))
+        return True
+
+    async def sweep(self) -> int:
+        now = time.monotonic()
+        count = 0
+        for client_token in list(self.manager.states):
+            last_seen = self.last_seen.setdefault(client_token, now)
+            if now - last_seen >= self.idle_timeout:
+                try:
+                    count += await self.hibernate(client_token)
+                except Exception as e:
+                    logging.exception(f"Failed to hibernate session: {e}")
+        await asyncio.to_thread(self._purge_expired)
+        return count
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.retention
+        for entry in os.scandir(self.store_dir):
+            if entry.name.endswith(SESSION_SUFFIX) and entry.stat().st_mtime < cutoff:
+                self.hibernated.discard(entry.name.removesuffix(SESSION_SUFFIX))
+                with contextlib.suppress(OSError):
+                    os.unlink(entry.path)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.sweep()
+
+    async def hibernate_all(self) -> int:
+        count = 0
+        for client_token in list(self.manager.states):
+            count += await self.hibernate(client_token)
+        return count
+
+
+_hibernator: SessionHibernator | None = None
+
+metrics.gauge(
+    "game_sessions_resident",
+    "Sessions currently held in memory.",
+    lambda: _hibernator.resident if _hibernator else 0,
+)
+metrics.gauge(
+    "game_sessions_hibernated",
+    "Sessions stored on disk waiting for their next event.",
+    lambda: len(_hibernator.hibernated) if _hibernator else 0,
+)
+
+
+@contextlib.asynccontextmanager
+async def session_hibernation(hibernator: SessionHibernator):
+    task = asyncio.create_task(hibernator.run(), name="session_hibernation")
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        # Keep every session across restarts, not just the idle ones.
+        await hibernator.hibernate_all()
+
+
+def enable_hibernation(
+    app,
+    idle_timeout: float = IDLE_TIMEOUT,
+    sweep_interval: float = SWEEP_INTERVAL,
+    store_dir: str | None = None,
+) -> SessionHibernator | None:
+    """Hibernate sessions idle for `idle_timeout` seconds to disk, when
+    GAME_HIBERNATION=1."""
+    global _hibernator
+    if os.environ.get(HIBERNATION_ENV, "") != "1":
+        return None
+    manager = app._state_manager
+    if manager is None or not hasattr(manager, "states"):
+        # Redis already keeps sessions out of process memory.
+        return None
+    missing = [
+        name for name in ("get_state", "_states_locks") if not hasattr(manager, name)
+    ]
+    if missing:
+        msg = (
+            f"Cannot hibernate sessions with {type(manager).__name__}: it has no "
+            f"{', '.join(missing)}. Unset {HIBERNATION_ENV}."
+        )
+        raise RuntimeError(msg)
+    if store_dir is None:
+        # Beside the states directory, not in it: `reflex run` unlinks every
+        # entry of that directory on startup and fails on a subdirectory.
+        states_dir = prerequisites.get_states_dir()
+        store_dir = str(states_dir.with_name(states_dir.name + "_sessions"))
+    _hibernator = SessionHibernator(manager, store_dir, idle_timeout, sweep_interval)
+    app.register_lifespan_task(session_hibernation, hibernator=_hibernator)
+    return _hibernator
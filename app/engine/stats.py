@@ -0,0 +1,151 @@
+import json
+import logging
+import math
+import os
+from typing import TypedDict
+
+ITEM_PROPERTY_PREFIX = "item:"
+
+
+class DerivedStatConfig(TypedDict):
+    id: str
+    name: str
+    icon: str
+    base: float
+    scale: dict[str, float]
+    item_property: str
+
+
+def load_derived_stats_config(path: str) -> list[DerivedStatConfig]:
+    if not os.path.exists(path):
+        logging.warning(f"Derived stats config not found: {path}")
+        return []
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        logging.exception(f"Error loading derived stats config {path}: {e}")
+        return []
+
+
+class DerivedStatEngine:
+    def __init__(self, formulas: list[DerivedStatConfig]):
+        self.formulas = {f["id"]: f for f in formulas}
+        self.base_stats: dict[str, int] = {}
+        self.stat_boosts: dict[str, int] = {}
+        self.item_properties: dict[str, float] = {}
+        self.equipped: dict[str, dict] = {}
+        self.values: dict[str, int] = {}
+        self.dependents: dict[str, set[str]] = {}
+        for formula in formulas:
+            inputs = list(formula.get("scale", {}))
+            if formula.get("item_property"):
+                inputs.append(ITEM_PROPERTY_PREFIX + formula["item_property"])
+            for key in inputs:
+                self.dependents.setdefault(key, set()).add(formula["id"])
+        self.order = self._topological_order()
+        self.rank = {stat_id: i for i, stat_id in enumerate(self.order)}
+
+    def _topological_order(self) -> list[str]:
+        order: list[str] = []
+        state: dict[str, int] = {}
+
+        def visit(stat_id: str):
+            if state.get(stat_id) == 2:
+                return
+            if state.get(stat_id) == 1:
+                raise ValueError(f"Derived stat cycle through '{stat_id}'")
+            state[stat_id] = 1
+            for dep in self.formulas[stat_id].get("scale", {}):
+                if dep in self.formulas:
+                    visit(dep)
+            state[stat_id] = 2
+            order.append(stat_id)
+
+        for stat_id in self.formulas:
+            visit(stat_id)
+        return order
+
+    def effective_stat(self, stat: str) -> int:
+        return self.base_stats.get(stat, 0) + self.stat_boosts.get(stat, 0)
+
+    def effective_stats(self) -> dict[str, int]:
+        keys = set(self.base_stats) | set(self.stat_boosts)
+        return {key: self.effective_stat(key) for key in keys}
+
+    def _input(self, key: str) -> float:
+        if key in self.formulas:
+            return self.values.get(key, 0)
+        return self.effective_stat(key)
+
+    def _compute(self, stat_id: str) -> int:
+        formula = self.formulas[stat_id]
+        value = formula.get("base", 0)
+        for key, factor in formula.get("scale", {}).items():
+            value += factor * self._input(key)
+        if formula.get("item_property"):
+            value += self.item_properties.get(formula["item_property"], 0)
+        return math.floor(value)
+
+    def _recompute(self, changed_inputs: set[str]) -> dict[str, int]:
+        pending = set()
+        for key in changed_inputs:
+            pending |= self.dependents.get(key, set())
+        changed: dict[str, int] = {}
+        while pending:
+            stat_id = min(pending, key=self.rank.__getitem__)
+            pending.discard(stat_id)
+            value = self._compute(stat_id)
+            if self.values.get(stat_id) != value:
+                self.values[stat_id] = value
+                changed[stat_id] = value
+                pending |= self.dependents.get(stat_id, set())
+        return changed
+
+    def recompute_all(self) -> dict[str, int]:
+        for stat_id in self.order:
+            self.values[stat_id] = self._compute(stat_id)
+        return dict(self.values)
+
+    def set_base_stats(self, stats: dict[str, int]) -> dict[str, int]:
+        changed = {
+            k
+            for k in set(stats) | set(self.base_stats)
+            if stats.get(k) != self.base_stats.get(k)
+        }
+        self.base_stats = dict(stats)
+        return self._recompute(changed)
+
+    def set_base_stat(self, stat: str, value: int) -> dict[str, int]:
+        if self.base_stats.get(stat) == value:
+            return {}
+        self.base_stats[stat] = value
+        return self._recompute({stat})
+
+    def _apply_item(self, item: dict, sign: int) -> set[str]:
+        changed = set()
+        boosts = item.get("effects", {}).get("stat_boost", {})
+        if isinstance(boosts, dict):
+            for stat, amount in boosts.items():
+                self.stat_boosts[stat] = self.stat_boosts.get(stat, 0) + sign * amount
+                changed.add(stat)
+        for prop, amount in item.get("properties", {}).items():
+            if isinstance(amount, (int, float)) and not isinstance(amount, bool):
+                self.item_properties[prop] = (
+                    self.item_properties.get(prop, 0) + sign * amount
+                )
+                changed.add(ITEM_PROPERTY_PREFIX + prop)
+        return changed
+
+    def equip(self, slot: str, item: dict) -> dict[str, int]:
+        changed = set()
+        if slot in self.equipped:
+            changed |= self._apply_item(self.equipped.pop(slot), -1)
+        self.equipped[slot] = item
+        changed |= self._apply_item(item, 1)
+        return self._recompute(changed)
+
+    def unequip(self, slot: str) -> dict[str, int]:
+        if slot not in self.equipped:
+            return {}
+        return self._recompute(self._apply_item(self.equipped.pop(slot), -1))
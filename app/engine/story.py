@@ -0,0 +1,136 @@
+import logging
+import os
+from typing import Any, Callable
+
+from app.engine.content import content_cache
+
+SCENES_DIR = "assets/game_data/scenes"
+ACTION_MENU = "action_menu"
+
+SceneLoader = Callable[[str], dict | None]
+
+
+def load_scene_file(scene_id: str, scenes_dir: str = SCENES_DIR) -> dict | None:
+    scene_path = os.path.join(scenes_dir, f"{scene_id}.json")
+    if not os.path.exists(scene_path):
+        logging.error(f"Scene file not found: {scene_path}")
+        return None
+    try:
+        return content_cache.load(scene_path)
+    except Exception as e:
+        logging.exception(f"Error loading scene file {scene_id}.json: {e}")
+        return None
+
+
+def current_line(scene: dict | None, dialogue_index: int) -> dict | None:
+    if scene and dialogue_index < len(scene["dialogue"]):
+        return scene["dialogue"][dialogue_index]
+    return None
+
+
+def shows_choices(scene: dict | None, dialogue_index: int) -> bool:
+    if scene:
+        return dialogue_index == len(scene["dialogue"]) - 1 and bool(
+            scene.get("choices")
+        )
+    return False
+
+
+class StorySession:
+    def __init__(
+        self,
+        scene_id: str,
+        scene: dict | None = None,
+        dialogue_index: int = 0,
+        history: list[str] | None = None,
+        dialogue_history: list[dict] | None = None,
+        game_vars: dict[str, Any] | None = None,
+        mode: str = "novel",
+    ):
+        self.scene_id = scene_id
+        self.scene = scene
+        self.dialogue_index = dialogue_index
+        self.history = history if history is not None else []
+        self.dialogue_history = dialogue_history if dialogue_history is not None else []
+        self.game_vars = game_vars if game_vars is not None else {}
+        self.mode = mode
+
+    @property
+    def current_line(self) -> dict | None:
+        return current_line(self.scene, self.dialogue_index)
+
+    @property
+    def shows_choices(self) -> bool:
+        return shows_choices(self.scene, self.dialogue_index)
+
+
+class StoryEngine:
+    """Narrative rules shared by GameState and the offline tools."""
+
+    def __init__(self, load_scene: SceneLoader = load_scene_file):
+        self.load_scene = load_scene
+
+    def _resolve(self, session: StorySession, scene_id: str) -> dict | None:
+        if scene_id == ACTION_MENU:
+            session.mode = "context"
+            return session.scene
+        return self.load_scene(scene_id)
+
+    def start(self, session: StorySession) -> bool:
+        scene = self._resolve(session, session.scene_id)
+        if not scene:
+            return False
+        session.scene = scene
+        session.history.append(session.scene_id)
+        if scene["dialogue"]:
+            session.dialogue_history.append(session.current_line)
+        return True
+
+    def change_scene(
+        self, session: StorySession, scene_id: str, at_end: bool = False
+    ) -> bool:
+        scene = self._resolve(session, scene_id)
+        if not scene:
+            return False
+        session.scene = scene
+        session.scene_id = scene_id
+        session.dialogue_index = 0
+        if scene["dialogue"]:
+            session.dialogue_history.append(session.current_line)
+        if at_end:
+            session.dialogue_index = len(scene["dialogue"]) - 1
+        else:
+            session.history.append(scene_id)
+        return True
+
+    def next_dialogue(self, session: StorySession) -> bool:
+        """Advance one line. Returns True when the end of the scene was reached."""
+        scene = session.scene
+        if not scene:
+            return False
+        if session.dialogue_index < len(scene["dialogue"]) - 1:
+            session.dialogue_index += 1
+            if session.current_line:
+                session.dialogue_history.append(session.current_line)
+            return False
+        next_scene_id = scene.get("nextScene")
+        if next_scene_id and not scene.get("choices"):
+            self.change_scene(session, next_scene_id)
+        return True
+
+    def prev_dialogue(self, session: StorySession) -> bool:
+        if session.dialogue_index > 0:
+            session.dialogue_index -= 1
+            return True
+        if len(session.history) > 1:
+            session.history.pop()
+            return self.change_scene(session, session.history[-1], at_end=True)
+        return False
+
+    def make_choice(self, session: StorySession, choice: dict) -> bool:
+        for key, value in choice.get("set_vars", {}).items():
+            session.game_vars[key] = value
+        return self.change_scene(session, choice["nextScene"])
+
+
+story_engine = StoryEngine()
@@ -0,0 +1,164 @@
+import time
+from typing import Any, TypedDict
+
+from app.engine.content import content_cache
+
+SCENES_DIR = "assets/game_data/scenes"
+START_SCENE = "scene_001"
+EXIT_SCENES = {"action_menu"}
+
+
+class BrokenLink(TypedDict):
+    scene: str
+    target: str
+
+
+class StoryReport(TypedDict):
+    start: str
+    scene_count: int
+    edge_count: int
+    reachable_count: int
+    unreachable: list[str]
+    dead_ends: list[str]
+    exits: list[str]
+    broken_links: list[BrokenLink]
+    cycles: list[list[str]]
+    path_count: str
+    longest_path: int
+    elapsed_ms: float
+
+
+def load_scenes(dir_path: str = SCENES_DIR) -> dict[str, dict]:
+    return {
+        scene["id"]: scene
+        for scene in content_cache.load_dir(dir_path).values()
+        if isinstance(scene, dict) and "id" in scene
+    }
+
+
+def scene_targets(scene: dict) -> list[str]:
+    targets = [c["nextScene"] for c in scene.get("choices") or [] if c.get("nextScene")]
+    if scene.get("nextScene"):
+        targets.append(scene["nextScene"])
+    return list(dict.fromkeys(targets))
+
+
+class StoryGraph:
+    def __init__(self, scenes: dict[str, Any]):
+        self.ids = sorted(scenes)
+        self.index = {scene_id: i for i, scene_id in enumerate(self.ids)}
+        self.edges: list[list[int]] = []
+        self.exits: set[int] = set()
+        self.broken_links: list[BrokenLink] = []
+        for scene_id in self.ids:
+            out = []
+            for target in scene_targets(scenes[scene_id]):
+                if target in self.index:
+                    out.append(self.index[target])
+                elif target in EXIT_SCENES:
+                    self.exits.add(self.index[scene_id])
+                else:
+                    self.broken_links.append({"scene": scene_id, "target": target})
+            self.edges.append(out)
+
+    def reachable_from(self, start: int) -> list[bool]:
+        seen = [False] * len(self.ids)
+        seen[start] = True
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for target in self.edges[node]:
+                if not seen[target]:
+                    seen[target] = True
+                    stack.append(target)
+        return seen
+
+    def strongly_connected_components(self) -> tuple[list[int], list[list[int]]]:
+        """Iterative Tarjan. Components come out in reverse topological order."""
+        n = len(self.ids)
+        order = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        comp_of = [-1] * n
+        components: list[list[int]] = []
+        stack: list[int] = []
+        counter = 0
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, i = work.pop()
+                if i == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                if i < len(self.edges[node]):
+                    work.append((node, i + 1))
+                    target = self.edges[node][i]
+                    if order[target] == -1:
+                        work.append((target, 0))
+                    elif on_stack[target]:
+                        low[node] = min(low[node], order[target])
+                    continue
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        comp_of[member] = len(components)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+        return comp_of, components
+
+    def analyze(self, start: str = START_SCENE) -> StoryReport:
+        began = time.perf_counter()
+        n = len(self.ids)
+        reachable = (
+            self.reachable_from(self.index[start])
+            if start in self.index
+            else [False] * n
+        )
+        dead_ends = [i for i in range(n) if not self.edges[i] and i not in self.exits]
+        comp_of, components = self.strongly_connected_components()
+
+        # Memoized DP over the condensation DAG; Tarjan already emits sinks
+        # first, so every successor component is final before it is read.
+        paths = [0] * len(components)
+        depth = [0] * len(components)
+        for c, members in enumerate(components):
+            successors = {comp_of[t] for m in members for t in self.edges[m]}
+            successors.discard(c)
+            endings = sum(1 for m in members if m in self.exits or not self.edges[m])
+            paths[c] = endings + sum(paths[s] for s in successors)
+            depth[c] = len(members) + max((depth[s] for s in successors), default=0)
+
+        start_comp = comp_of[self.index[start]] if start in self.index else None
+        return {
+            "start": start,
+            "scene_count": n,
+            "edge_count": sum(len(out) for out in self.edges),
+            "reachable_count": sum(reachable),
+            "unreachable": [self.ids[i] for i in range(n) if not reachable[i]],
+            "dead_ends": [self.ids[i] for i in dead_ends],
+            "exits": [self.ids[i] for i in sorted(self.exits)],
+            "broken_links": self.broken_links,
+            "cycles": [
+                sorted(self.ids[m] for m in members)
+                for members in components
+                if len(members) > 1 or members[0] in self.edges[members[0]]
+            ],
+            "path_count": str(paths[start_comp]) if start_comp is not None else "0",
+            "longest_path": depth[start_comp] if start_comp is not None else 0,
+            "elapsed_ms": (time.perf_counter() - began) * 1000,
+        }
+
+
+def analyze_story(dir_path: str = SCENES_DIR, start: str = START_SCENE) -> StoryReport:
+    return StoryGraph(load_scenes(dir_path)).analyze(start)
@@ -0,0 +1,109 @@
+import heapq
+import json
+import logging
+import os
+from typing import NamedTuple, TypedDict, Union
+
+HOURS_PER_DAY = 24
+
+
+class TimelineEvent(TypedDict):
+    id: str
+    at: int
+    every: int
+    set_vars: dict[str, Union[str, int, bool, float]]
+    message: str
+
+
+class FiredEvent(NamedTuple):
+    event: TimelineEvent
+    due: int
+    missed: int
+
+
+def to_absolute_hour(day: int, hour: int) -> int:
+    return (day - 1) * HOURS_PER_DAY + hour
+
+
+def from_absolute_hour(hours: int) -> tuple[int, int]:
+    day, hour = divmod(hours, HOURS_PER_DAY)
+    return day + 1, hour
+
+
+def load_timeline_events(path: str) -> list[TimelineEvent]:
+    if not os.path.exists(path):
+        logging.warning(f"World events file not found: {path}")
+        return []
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        logging.exception(f"Error loading world events: {e}")
+        return []
+
+
+class Timeline:
+    def __init__(self, now: int = 0):
+        self.now = now
+        self._heap: list[tuple[int, int, int, TimelineEvent]] = []
+        # A plain int rather than itertools.count, which cannot be pickled
+        # with the session state on newer Pythons.
+        self._seq = 0
+        self._live: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def schedule(self, event: TimelineEvent, due: int | None = None, missed: int = 0):
+        """Queue `event` at `due`, or its own "at" hour.
+
+        Occurrences before `now` are skipped: a repeating event is moved to
+        its next one and a one-off event is not scheduled.
+        """
+        due = event["at"] if due is None else due
+        if due < self.now:
+            every = event.get("every", 0)
+            if every <= 0:
+                return
+            due += every * -((due - self.now) // every)
+        seq = self._seq
+        self._seq += 1
+        self._live[event["id"]] = seq
+        heapq.heappush(self._heap, (due, seq, missed, event))
+
+    def cancel(self, event_id: str):
+        self._live.pop(event_id, None)
+
+    def next_due(self) -> int | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def advance(self, hours: int) -> list[FiredEvent]:
+        return self.advance_to(self.now + max(hours, 0))
+
+    def advance_to(self, target: int) -> list[FiredEvent]:
+        self.now = max(self.now, target)
+        fired: list[FiredEvent] = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > self.now:
+                break
+            due, seq, missed, event = heapq.heappop(self._heap)
+            every = event.get("every", 0)
+            if every > 0:
+                last_due = due + every * ((self.now - due) // every)
+                if last_due > due:
+                    # Collapse skipped occurrences into the latest one so it is
+                    # re-ordered against other events before being applied.
+                    missed += (last_due - due) // every
+                    heapq.heappush(self._heap, (last_due, seq, missed, event))
+                    continue
+                heapq.heappush(self._heap, (due + every, seq, 0, event))
+            else:
+                del self._live[event["id"]]
+            fired.append(FiredEvent(event, due, missed))
+        return fired
+
+    def _drop_stale(self):
+        while self._heap and self._live.get(self._heap[0][3]["id"]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
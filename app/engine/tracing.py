@@ -0,0 +1,192 @@
+import collections
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, NamedTuple
+
+MAX_SPANS = 100_000
+MAX_PENDING = 10_000
+# Set to 1 to record spans for /traces. Off by default because every event,
+# handler and computed var evaluation then records a span.
+TRACING_ENV = "GAME_TRACING"
+
+
+def _new_id() -> str:
+    return os.urandom(8).hex()
+
+
+class SpanRecord(NamedTuple):
+    name: str
+    cat: str
+    start: float
+    duration: float
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    lane: int
+    args: dict[str, Any] | None
+
+
+class TraceContext:
+    """The span that is currently running. Events also carry their name and
+    start time so the event span can be recorded once its final update is
+    sent."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "lane", "name", "start", "ended")
+
+    def __init__(
+        self,
+        trace_id: str,
+        span_id: str,
+        parent_id: str | None,
+        lane: int,
+        name: str | None = None,
+        start: float = 0.0,
+    ):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.lane = lane
+        self.name = name
+        self.start = start
+        self.ended = False
+
+    def child(self, name: str | None = None, start: float = 0.0) -> "TraceContext":
+        return TraceContext(
+            self.trace_id, _new_id(), self.span_id, self.lane, name, start
+        )
+
+
+current_span: contextvars.ContextVar[TraceContext | None] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Tracer:
+    def __init__(self, max_spans: int = MAX_SPANS, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: collections.deque[SpanRecord] = collections.deque(maxlen=max_spans)
+        # Chained events waiting for the client to send them back, keyed by
+        # (client token, event name), so they join the trace that yielded them.
+        self._pending: dict[tuple[str, str], TraceContext] = {}
+        self._lanes = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def link(self, token: str, event_name: str, ctx: TraceContext):
+        with self._lock:
+            self._pending[(token, event_name)] = ctx
+            if len(self._pending) > MAX_PENDING:
+                del self._pending[next(iter(self._pending))]
+
+    def begin_event(
+        self, token: str, event_name: str, label: str
+    ) -> TraceContext | None:
+        """Start the span for an incoming event and make it current. With
+        tracing off no span is current, so nothing below it is recorded."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            parent = self._pending.pop((token, event_name), None)
+        start = time.perf_counter()
+        if parent is None:
+            ctx = TraceContext(
+                _new_id() + _new_id(), _new_id(), None, next(self._lanes), label, start
+            )
+        else:
+            ctx = parent.child(label, start)
+        current_span.set(ctx)
+        return ctx
+
+    def end_event(self, ctx: TraceContext):
+        if not ctx.ended and ctx.name is not None:
+            ctx.ended = True
+            self.record(ctx.name, "event", ctx, ctx.start, time.perf_counter())
+
+    def record(
+        self,
+        name: str,
+        cat: str,
+        ctx: TraceContext,
+        start: float,
+        end: float,
+        args: dict[str, Any] | None = None,
+    ):
+        if self.enabled:
+            self.spans.append(
+                SpanRecord(
+                    name,
+                    cat,
+                    start,
+                    end - start,
+                    ctx.trace_id,
+                    ctx.span_id,
+                    ctx.parent_id,
+                    ctx.lane,
+                    args,
+                )
+            )
+
+    @contextlib.contextmanager
+    def span(self, name: str, cat: str = "span", **args: Any):
+        """Record a child of the current span. Does nothing outside an event."""
+        parent = current_span.get()
+        if parent is None or not self.enabled:
+            yield
+            return
+        ctx = parent.child()
+        token = current_span.set(ctx)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            current_span.reset(token)
+            self.record(name, cat, ctx, start, time.perf_counter(), args or None)
+
+    def export(self, trace_id: str | None = None) -> dict:
+        """Spans in Chrome trace event format, one row per trace."""
+        pid = os.getpid()
+        events = []
+        lanes: dict[int, str] = {}
+        for span in list(self.spans):
+            if trace_id is not None and span.trace_id != trace_id:
+                continue
+            lanes.setdefault(span.lane, span.trace_id)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.cat,
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.lane,
+                    "args": {
+                        "trace_id": span.trace_id,
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                        **(span.args or {}),
+                    },
+                }
+            )
+        for lane, lane_trace in lanes.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": lane,
+                    "args": {"name": f"trace {lane_trace[:8]}"},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str, trace_id: str | None = None):
+        with open(path, "w") as f:
+            json.dump(self.export(trace_id), f)
+
+
+tracer = Tracer(enabled=os.environ.get(TRACING_ENV, "") == "1")
@@ -1,9 +1,30 @@
 import reflex as rx
-import json
-import os
-import logging
-from typing import TypedDict, Literal
+from typing import Any, TypedDict, Literal
 import datetime
+from app.engine.catalog import static_content
+from app.engine.actions import ActionContext, ActionRegistry
+from app.engine.timeline import (
+    Timeline,
+    from_absolute_hour,
+    load_timeline_events,
+    to_absolute_hour,
+)
+
+
+MAX_BATCH_SIZE = 100
+MORNING_HOUR = 6
+
+
+class LootEntry(TypedDict):
+    item_id: str
+    chance: float
+    min: int
+    max: int
+
+
+class ActionRewards(TypedDict):
+    xp: list[int]
+    loot: list[LootEntry]
 
 
 class Action(TypedDict):
@@ -12,6 +33,13 @@ class Action(TypedDict):
     description: str
     icon: str
     time_cost: int
+    rewards: ActionRewards
+    preconditions: list[dict[str, Any]]
+    effects: list[dict[str, Any]]
+    messages: dict[str, str]
+
+
+action_registry = ActionRegistry("assets/game_data/actions.json")
 
 
 class ActionState(rx.State):
@@ -19,6 +47,7 @@ class ActionState(rx.State):
     current_time: int = 8
     current_day: int = 1
     _current_location_id: str | None = None
+    _timeline: Timeline | None = None
 
     @rx.event
     async def on_load_context(self):
@@ -29,16 +58,35 @@ class ActionState(rx.State):
         self._load_actions()
 
     def _load_actions(self):
-        actions_path = "assets/game_data/actions.json"
-        if not os.path.exists(actions_path):
-            logging.error(f"Actions file not found: {actions_path}")
-            return
-        try:
-            with open(actions_path, "r") as f:
-                actions_list: list[Action] = json.load(f)
-                self.actions = {action["id"]: action for action in actions_list}
-        except Exception as e:
-            logging.exception(f"Error loading actions: {e}")
+        action_registry.reload_if_changed()
+        self.actions = dict(action_registry.actions)
+
+    def _get_timeline(self) -> Timeline:
+        if self._timeline is None:
+            timeline = Timeline(to_absolute_hour(self.current_day, self.current_time))
+            for event in load_timeline_events("assets/game_data/world_events.json"):
+                timeline.schedule(event)
+            self._timeline = timeline
+        return self._timeline
+
+    async def _advance_time(self, hours: int) -> list[str]:
+        from app.states.game_state import GameState
+
+        timeline = self._get_timeline()
+        fired = timeline.advance_to(
+            to_absolute_hour(self.current_day, self.current_time) + hours
+        )
+        self.current_day, self.current_time = from_absolute_hour(timeline.now)
+        if not fired:
+            return []
+        game_state = await self.get_state(GameState)
+        messages = []
+        for fired_event in fired:
+            for key, value in fired_event.event["set_vars"].items():
+                game_state.game_vars[key] = value
+            if fired_event.event["message"]:
+                messages.append(fired_event.event["message"])
+        return messages
 
     @rx.var
     async def current_location(self) -> dict | None:
@@ -89,36 +137,86 @@ class ActionState(rx.State):
             display_hour = 12
         return f"Day {self.current_day}, {display_hour}:00 {am_pm}"
 
+    @rx.var
+    async def batch_actions(self) -> list[str]:
+        return [
+            action_id
+            for action_id in await self.available_actions
+            if action_id in self.actions
+            and action_id not in ("travel", "rest")
+            and self.actions[action_id]["time_cost"] > 0
+        ]
+
+    @rx.event
+    async def perform_action(self, action_id: str):
+        return await self._run_action(action_id)
+
     @rx.event
-    def perform_action(self, action_id: str):
-        if action_id not in self.actions:
+    async def perform_action_batch(self, action_id: str, count: int):
+        count = max(1, min(int(count), MAX_BATCH_SIZE))
+        return await self._run_action(action_id, count)
+
+    @rx.event
+    async def rest_until_morning(self):
+        hours = (MORNING_HOUR - self.current_time) % 24 or 24
+        return await self._run_action("rest", hours=hours)
+
+    async def _run_action(
+        self, action_id: str, times: int = 1, hours: int | None = None
+    ):
+        from app.states.game_state import GameState
+
+        action_registry.reload_if_changed()
+        game_state = await self.get_state(GameState)
+        ctx = action_registry.run(
+            ActionContext(
+                action_id,
+                times=times,
+                hours=hours,
+                stats=game_state.player_stats["stats"]
+                if game_state.player_stats
+                else {},
+                item_counts=game_state._item_counts(),
+                game_vars=game_state.game_vars,
+                current_time=self.current_time,
+            )
+        )
+        if ctx is None:
             return rx.toast(f"Action '{action_id}' not found.", duration=3000)
-        action = self.actions[action_id]
-        time_cost = action.get("time_cost", 0)
-        if time_cost > 0:
-            self.current_time += time_cost
-            if self.current_time >= 24:
-                days_passed = self.current_time // 24
-                self.current_day += days_passed
-                self.current_time %= 24
-        if action_id == "explore":
-            return rx.toast(
-                "You explore the area and find nothing of interest.", duration=3000
+        if ctx.failure:
+            return rx.toast(ctx.failure, duration=3000)
+        world_messages = await self._advance_time(ctx.hours or 0)
+        for item_id, quantity in ctx.consumed.items():
+            game_state._remove_item(item_id, quantity)
+        for key, value in ctx.set_vars.items():
+            game_state.game_vars[key] = value
+        for stat, amount in ctx.stat_gains.items():
+            current = (
+                game_state.player_stats["stats"].get(stat, 0)
+                if game_state.player_stats
+                else 0
             )
-        elif action_id == "gather":
-            return rx.toast("You gather some common herbs.", duration=3000)
-        elif action_id == "travel":
-            from app.states.game_state import GameState
-
-            return GameState.set_game_mode("map")
-        elif action_id == "train":
-            return rx.toast("You spend some time training.", duration=3000)
-        elif action_id == "craft":
-            return rx.toast(
-                "You don't have the required materials to craft anything.",
-                duration=3000,
+            game_state._set_base_stat(stat, current + amount)
+        levels_gained, overflow = game_state._grant_rewards(ctx.summary)
+        reward_parts = []
+        if ctx.summary["xp"]:
+            reward_parts.append(f"+{ctx.summary['xp']} XP")
+        for stat, amount in ctx.stat_gains.items():
+            reward_parts.append(f"+{amount} {stat.upper()}")
+        for item_id, quantity in ctx.summary["items"].items():
+            name = static_content.items.get(item_id, {}).get("name", item_id)
+            reward_parts.append(f"{quantity}x {name}")
+        if levels_gained:
+            reward_parts.append(
+                f"Level up! Now level {game_state.player_stats['level']}"
             )
-        elif action_id == "rest":
-            return rx.toast(f"You rest for {time_cost} hours.", duration=3000)
-        else:
-            return rx.toast(f"Performed action: {action['name']}", duration=3000)
\ No newline at end of file
+        if overflow:
+            reward_parts.append("Inventory full, some items were left behind")
+        details = [", ".join(reward_parts) + "."] if reward_parts else []
+        if ctx.game_mode:
+            return GameState.set_game_mode(ctx.game_mode)
+        return rx.toast(
+            ctx.message,
+            description=" ".join(details + world_messages),
+            duration=4000,
+        )
@@ -1,9 +1,33 @@
+import asyncio
 import reflex as rx
 import json
 import os
 from typing import Any, cast, TypedDict, Union
 import logging
 from app.states.game_state import Scene, CharacterData, DialogueLine, CharacterSprite
+from app.engine.content import (
+    ContentConflictError,
+    apply_text_changes,
+    content_cache,
+    content_digest,
+)
+from app.engine.search import (
+    SearchDocument,
+    content_index,
+    index_file,
+    refresh_content_index,
+)
+from app.engine.story_graph import StoryReport, analyze_story
+
+
+# Kept out of app.components.patch_editor so the state can be imported without
+# loading Monaco.
+def read_editor_script(path: str) -> str:
+    return (
+        "(() => { const model = window.monaco && window.monaco.editor.getModels()"
+        f".find((m) => m.uri.toString().endsWith({json.dumps(path)}));"
+        " return model ? [model.getValue(), model.getVersionId()] : null; })()"
+    )
 
 
 class FileData(TypedDict):
@@ -15,11 +39,20 @@ class FileData(TypedDict):
 class EditorState(rx.State):
     files: list[FileData] = []
     current_file_path: str = ""
-    current_file_content: str = ""
+    editor_initial_content: str = ""
+    editor_key: str = ""
+    editor_version: int = 0
+    editor_etag: str = ""
+    _current_file_content: str = ""
+    _load_count: int = 0
     editor_error: str = ""
     preview_scene: Scene | None = None
     preview_characters: dict[str, CharacterData] = {}
     dialogue_index: int = 0
+    _preview_character_ids: dict[str, str] = {}
+    search_query: str = ""
+    search_results: list[SearchDocument] = []
+    story_report: StoryReport | None = None
 
     @rx.event(background=True)
     async def on_load_editor(self):
@@ -28,6 +61,8 @@ class EditorState(rx.State):
             self._scan_files("assets/game_data/scenes", "scene")
             self._scan_files("assets/game_data/characters", "character")
             self._load_all_characters_for_preview()
+            refresh_content_index(content_index)
+            self._analyze_story()
         if self.files:
             yield EditorState.load_file(self.files[0]["path"])
 
@@ -44,51 +79,122 @@ class EditorState(rx.State):
                     }
                 )
 
+    def _analyze_story(self):
+        try:
+            self.story_report = analyze_story()
+        except Exception as e:
+            logging.exception(f"Error analyzing story graph: {e}")
+            self.story_report = None
+
     def _load_all_characters_for_preview(self):
         self.preview_characters.clear()
-        char_dir = "assets/game_data/characters"
-        if not os.path.exists(char_dir):
-            return
-        for filename in os.listdir(char_dir):
-            if filename.endswith(".json"):
-                try:
-                    with open(os.path.join(char_dir, filename), "r") as f:
-                        char_data: CharacterData = json.load(f)
-                        self.preview_characters[char_data["id"]] = char_data
-                except Exception as e:
-                    logging.exception(
-                        f"Failed to load character {filename} for preview: {e}"
-                    )
+        self._preview_character_ids.clear()
+        for path, char_data in content_cache.load_dir(
+            "assets/game_data/characters"
+        ).items():
+            try:
+                self.preview_characters[char_data["id"]] = char_data
+                self._preview_character_ids[os.path.normpath(path)] = char_data["id"]
+            except Exception as e:
+                logging.exception(f"Failed to load character {path} for preview: {e}")
+
+    def _merge_preview_character(self, char_data: CharacterData):
+        path = os.path.normpath(self.current_file_path)
+        previous_id = self._preview_character_ids.get(path)
+        if previous_id is not None and previous_id != char_data["id"]:
+            self.preview_characters.pop(previous_id, None)
+        self._preview_character_ids[path] = char_data["id"]
+        if self.preview_characters.get(char_data["id"]) != char_data:
+            self.preview_characters[char_data["id"]] = char_data
 
     @rx.event
     async def load_file(self, path: str):
         self.current_file_path = path
+        self._load_count += 1
+        self.editor_key = f"{path}#{self._load_count}"
+        self.editor_version = 1
         try:
-            with open(path, "r") as f:
-                self.current_file_content = f.read()
-            self.update_preview(self.current_file_content)
+            # Hash the raw bytes, as ContentCache.disk_digest does, so files
+            # with CRLF line endings do not look changed on the first save.
+            with open(path, "rb") as f:
+                raw = f.read()
+            self._current_file_content = raw.decode("utf-8")
+            self.editor_etag = content_digest(raw)
+            self.editor_initial_content = self._current_file_content
+            self.update_preview(self._current_file_content)
         except Exception as e:
             logging.exception(f"Error loading file: {e}")
-            self.current_file_content = f"Error loading file: {e}"
+            self._current_file_content = f"Error loading file: {e}"
+            self.editor_etag = ""
+            self.editor_initial_content = self._current_file_content
             self.preview_scene = None
 
     @rx.event
-    def on_editor_change(self, content: str):
-        self.current_file_content = content
+    def search_content(self, query: str):
+        self.search_query = query
+        if not query.strip():
+            self.search_results = []
+            return
+        self.search_results = content_index.search(query, limit=50)
+
+    @rx.event
+    async def open_search_result(self, result: SearchDocument):
+        await self.load_file(result["path"])
+        if result["kind"] == "dialogue" and self.preview_scene:
+            self.dialogue_index = min(
+                result["position"], max(len(self.preview_scene["dialogue"]) - 1, 0)
+            )
+
+    @rx.event
+    def apply_editor_changes(self, changes: list[list], version: int):
+        if version != self.editor_version + 1:
+            return rx.call_script(
+                read_editor_script(self.current_file_path),
+                callback=EditorState.resync_editor_content,
+            )
+        try:
+            self._current_file_content = apply_text_changes(
+                self._current_file_content, changes
+            )
+        except Exception as e:
+            logging.exception(f"Error applying editor changes: {e}")
+            return rx.call_script(
+                read_editor_script(self.current_file_path),
+                callback=EditorState.resync_editor_content,
+            )
+        self.editor_version = version
+
+    @rx.event
+    def refresh_preview(self):
+        self.update_preview(self._current_file_content)
+
+    @rx.event
+    def resync_editor_content(self, snapshot: list | None):
+        if not snapshot:
+            return
+        content, version = snapshot
+        self._current_file_content = content
+        self.editor_version = version
         self.update_preview(content)
 
     @rx.event
     def update_preview(self, content: str):
         self.editor_error = ""
         try:
-            data = json.loads(content)
+            data = content_cache.parse(self.current_file_path, content)
             if self.current_file_path.startswith("assets/game_data/scenes"):
-                self.preview_scene = cast(Scene, data)
-                self.dialogue_index = 0
+                scene = cast(Scene, data)
+                if (
+                    self.preview_scene is None
+                    or self.preview_scene["id"] != scene["id"]
+                ):
+                    self.dialogue_index = 0
+                elif self.dialogue_index >= len(scene["dialogue"]):
+                    self.dialogue_index = max(len(scene["dialogue"]) - 1, 0)
+                if self.preview_scene != scene:
+                    self.preview_scene = scene
             elif self.current_file_path.startswith("assets/game_data/characters"):
-                char_data: CharacterData = cast(CharacterData, data)
-                self.preview_characters[char_data["id"]] = char_data
-                self._load_all_characters_for_preview()
+                self._merge_preview_character(cast(CharacterData, data))
         except json.JSONDecodeError as e:
             logging.exception(f"Invalid JSON: {e}")
             self.editor_error = f"Invalid JSON: {e}"
@@ -100,27 +206,51 @@ class EditorState(rx.State):
 
     @rx.event(background=True)
     async def save_current_file(self):
-        if not self.current_file_path:
+        async with self:
+            path = self.current_file_path
+            content = self._current_file_content
+            etag = self.editor_etag
+        if not path:
             yield rx.toast("No file selected to save.", duration=3000)
             return
-        async with self:
-            try:
-                json.loads(self.current_file_content)
-                self.editor_error = ""
-            except json.JSONDecodeError as e:
-                logging.exception(f"Invalid JSON: {e}")
-                self.editor_error = f"Invalid JSON: {e}"
-                yield rx.toast("Cannot save: Invalid JSON.", duration=3000)
-                return
+        # The write, fsync and conflict check run without holding the state
+        # lock, so editing carries on while the file is saved.
+        error = ""
         try:
-            with open(self.current_file_path, "w") as f:
-                f.write(self.current_file_content)
-            yield rx.toast(
-                f"Saved {os.path.basename(self.current_file_path)}", duration=3000
+            etag = await asyncio.to_thread(content_cache.save, path, content, etag)
+        except json.JSONDecodeError as e:
+            logging.exception(f"Invalid JSON: {e}")
+            error = f"Invalid JSON: {e}"
+            toast = "Cannot save: Invalid JSON."
+        except ContentConflictError as e:
+            logging.warning(str(e))
+            error = (
+                f"{os.path.basename(path)} was changed by someone else. "
+                "Reload it before saving."
             )
+            toast = "Cannot save: file changed on disk."
         except Exception as e:
             logging.exception(f"Error saving file: {e}")
-            yield rx.toast(f"Error saving file: {e}", duration=3000)
+            toast = f"Error saving file: {e}"
+        else:
+            toast = None
+        async with self:
+            if self.current_file_path == path:
+                if toast is None:
+                    self.editor_etag = etag
+                if toast is None or error:
+                    self.editor_error = error
+        if toast is not None:
+            yield rx.toast(toast, duration=3000)
+            return
+        try:
+            await asyncio.to_thread(index_file, content_index, path)
+        except Exception as e:
+            logging.exception(f"Error indexing {path}: {e}")
+        if path.startswith("assets/game_data/scenes"):
+            async with self:
+                self._analyze_story()
+        yield rx.toast(f"Saved {os.path.basename(path)}", duration=3000)
 
     @rx.event
     def next_preview_dialogue(self):
@@ -165,4 +295,4 @@ class EditorState(rx.State):
             char_id = self.current_preview_dialogue["character"]
             if char_id in self.preview_characters:
                 return self.preview_characters[char_id]["color"]
-        return "#9CA3AF"
\ No newline at end of file
+        return "#9CA3AF"
@@ -1,9 +1,25 @@
 import reflex as rx
 import json
-from typing import Any, cast, TypedDict, Union, Literal
+from typing import Any, Callable, cast, TypedDict, Union, Literal
 import asyncio
+import copy
 import logging
 import os
+from app.engine.catalog import static_content
+from app.engine.partitions import content_streamer
+from app.engine.rewards import RewardSummary, next_level_threshold
+from app.engine.search import matches_query, parse_query
+from app.engine.stats import (
+    DerivedStatConfig,
+    DerivedStatEngine,
+    load_derived_stats_config,
+)
+from app.engine.story import (
+    StoryEngine,
+    StorySession,
+    current_line,
+    shows_choices,
+)
 
 try:
     from assets.game_data.init_game_data import create_game_data
@@ -15,6 +31,15 @@ except ImportError as e:
         )
 
 
+def _load_session_scene(scene_id: str) -> dict | None:
+    # Scene vars are changed in place through Reflex's proxies, so each
+    # session gets its own copy rather than the cached document.
+    return copy.deepcopy(content_streamer.scene(scene_id))
+
+
+story_engine = StoryEngine(load_scene=_load_session_scene)
+
+
 class CharacterSprite(TypedDict):
     id: str
     position: str
@@ -32,6 +57,8 @@ class SaveSlot(TypedDict):
     timestamp: str
     game_vars: dict[str, Union[str, int, bool, float]]
     history: list[str]
+    inventory: list["InventorySlot | None"]
+    equipped: dict[str, str]
     thumbnail: str
 
 
@@ -94,8 +121,8 @@ class GameState(rx.State):
     game_mode: Literal["novel", "map", "info", "context"] = "novel"
     current_scene_id: str = "scene_001"
     current_scene: Scene | None = None
-    characters: dict[str, CharacterData] = {}
-    stats_config: list[StatConfig] = []
+    content_urls: dict[str, str] = {}
+    current_chapter: str = ""
     player_stats: PlayerStats | None = None
     dialogue_index: int = 0
     history: list[str] = []
@@ -106,6 +133,8 @@ class GameState(rx.State):
     is_auto_playing: bool = False
     menu_open: bool = False
     history_open: bool = False
+    history_query: str = ""
+    history_results: list[DialogueLine] = []
     settings_open: bool = False
     stats_open: bool = False
     load_menu_open: bool = False
@@ -114,8 +143,15 @@ class GameState(rx.State):
     info_tab: str = "World Map"
     text_speed: float = 1.0
     auto_play_speed: float = 2.0
-    items: dict[str, Item] = {}
     inventory: list[InventorySlot | None] = []
+    equipped: dict[str, str] = {}
+    derived_stats_config: list[DerivedStatConfig] = []
+    derived_stats: dict[str, int] = {}
+    effective_stats: dict[str, int] = {}
+    _stat_engine: DerivedStatEngine | None = None
+    # Whether the client has finished revealing the current line. Auto-play
+    # and skip wait for it, so the reveal runs entirely in the browser.
+    _line_revealed: bool = True
     save_slots: str = rx.LocalStorage(json.dumps([None] * 15), name="save_slots")
 
     @rx.var
@@ -131,62 +167,16 @@ class GameState(rx.State):
         async with self:
             self.is_loading = True
             create_game_data()
-            self._load_characters()
-            self._load_stats_config()
+            static_content.refresh()
+            self.content_urls = static_content.urls()
             self._load_player_stats()
-            self._load_all_items()
             self._initialize_inventory()
-        scene_data = await self._load_scene(self.current_scene_id)
-        async with self:
-            if scene_data:
-                self.current_scene = scene_data
-                self.history.append(self.current_scene_id)
-                if self.current_scene["dialogue"]:
-                    self.dialogue_history.append(self.current_dialogue)
+            self._load_derived_stats()
+            self._run_story(story_engine.start)
         await asyncio.sleep(0.1)
         async with self:
             self.is_loading = False
 
-    def _load_characters(self):
-        char_dir = "assets/game_data/characters"
-        if not os.path.exists(char_dir):
-            logging.warning(f"Character directory not found: {char_dir}")
-            return
-        character_files = [
-            "character_elara.json",
-            "character_kain.json",
-            "character_narrator.json",
-        ]
-        for char_file in character_files:
-            file_path = os.path.join(char_dir, char_file)
-            if not os.path.exists(file_path):
-                logging.warning(f"Character file not found: {file_path}")
-                continue
-            try:
-                with open(file_path, "r") as f:
-                    char_data: CharacterData = json.load(f)
-                    self.characters[char_data["id"]] = char_data
-            except Exception as e:
-                logging.exception(f"Error loading character file {char_file}: {e}")
-
-    def _load_all_items(self):
-        items_dir = "assets/game_data/items"
-        if not os.path.exists(items_dir):
-            logging.warning(f"Items directory not found: {items_dir}")
-            return
-        for item_type_dir in os.listdir(items_dir):
-            dir_path = os.path.join(items_dir, item_type_dir)
-            if os.path.isdir(dir_path):
-                for filename in os.listdir(dir_path):
-                    if filename.endswith(".json"):
-                        file_path = os.path.join(dir_path, filename)
-                        try:
-                            with open(file_path, "r") as f:
-                                item_data: Item = json.load(f)
-                                self.items[item_data["id"]] = item_data
-                        except Exception as e:
-                            logging.exception(f"Error loading item {filename}: {e}")
-
     def _initialize_inventory(self):
         initial_items = [
             {"item_id": "health_potion", "quantity": 5},
@@ -199,16 +189,105 @@ class GameState(rx.State):
             if i < len(self.inventory):
                 self.inventory[i] = item
 
-    def _load_stats_config(self, config_name: str = "fantasy"):
-        config_path = f"assets/game_data/stats/{config_name}_stats.json"
-        if not os.path.exists(config_path):
-            logging.error(f"Stats config file not found: {config_path}")
-            return
+    def _add_item(self, item_id: str, quantity: int) -> int:
+        item = static_content.items.get(item_id)
+        if item is None:
+            logging.warning(f"Cannot add unknown item: {item_id}")
+            return quantity
+        max_stack = item["max_stack"] if item["stackable"] else 1
+        if item["stackable"]:
+            for slot in self.inventory:
+                if quantity <= 0:
+                    break
+                if slot and slot["item_id"] == item_id and slot["quantity"] < max_stack:
+                    added = min(quantity, max_stack - slot["quantity"])
+                    slot["quantity"] += added
+                    quantity -= added
+        for i, slot in enumerate(self.inventory):
+            if quantity <= 0:
+                break
+            if slot is None:
+                added = min(quantity, max_stack)
+                self.inventory[i] = {"item_id": item_id, "quantity": added}
+                quantity -= added
+        return quantity
+
+    def _item_counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for slot in self.inventory:
+            if slot:
+                counts[slot["item_id"]] = (
+                    counts.get(slot["item_id"], 0) + slot["quantity"]
+                )
+        return counts
+
+    def _remove_item(self, item_id: str, quantity: int) -> int:
+        for i in reversed(range(len(self.inventory))):
+            if quantity <= 0:
+                break
+            slot = self.inventory[i]
+            if slot and slot["item_id"] == item_id:
+                removed = min(quantity, slot["quantity"])
+                quantity -= removed
+                if removed == slot["quantity"]:
+                    self.inventory[i] = None
+                else:
+                    slot["quantity"] -= removed
+        return quantity
+
+    def _grant_xp(self, amount: int) -> int:
+        if not self.player_stats or amount <= 0:
+            return 0
+        levels_gained = 0
+        self.player_stats["xp"] += amount
+        while self.player_stats["xp"] >= self.player_stats["xp_to_next_level"] > 0:
+            self.player_stats["xp"] -= self.player_stats["xp_to_next_level"]
+            self.player_stats["level"] += 1
+            self.player_stats["xp_to_next_level"] = next_level_threshold(
+                self.player_stats["xp_to_next_level"]
+            )
+            levels_gained += 1
+        return levels_gained
+
+    def _grant_rewards(self, summary: RewardSummary) -> tuple[int, dict[str, int]]:
+        levels_gained = self._grant_xp(summary["xp"])
+        overflow = {}
+        for item_id, quantity in summary["items"].items():
+            left = self._add_item(item_id, quantity)
+            if left:
+                overflow[item_id] = left
+        return levels_gained, overflow
+
+    def _load_derived_stats(self, config_name: str = "fantasy"):
+        self.derived_stats_config = load_derived_stats_config(
+            f"assets/game_data/stats/{config_name}_derived_stats.json"
+        )
         try:
-            with open(config_path, "r") as f:
-                self.stats_config = json.load(f)
-        except Exception as e:
-            logging.exception(f"Error loading stats config {config_path}: {e}")
+            engine = DerivedStatEngine(self.derived_stats_config)
+        except ValueError as e:
+            logging.exception(f"Invalid derived stats config {config_name}: {e}")
+            return
+        if self.player_stats:
+            engine.set_base_stats(dict(self.player_stats["stats"]))
+        for slot, item_id in self.equipped.items():
+            if item_id in static_content.items:
+                engine.equip(slot, static_content.items[item_id])
+        self._stat_engine = engine
+        self.derived_stats = engine.recompute_all()
+        self.effective_stats = engine.effective_stats()
+
+    def _sync_derived_stats(self, changed: dict[str, int]):
+        for stat_id, value in changed.items():
+            self.derived_stats[stat_id] = value
+        if self._stat_engine:
+            self.effective_stats = self._stat_engine.effective_stats()
+
+    def _set_base_stat(self, stat: str, value: int):
+        if not self.player_stats:
+            return
+        self.player_stats["stats"][stat] = value
+        if self._stat_engine:
+            self._sync_derived_stats(self._stat_engine.set_base_stat(stat, value))
 
     def _load_player_stats(self):
         player_stats_path = "assets/game_data/player/character.json"
@@ -221,109 +300,91 @@ class GameState(rx.State):
         except Exception as e:
             logging.exception(f"Error loading player stats: {e}")
 
-    async def _load_scene(self, scene_id: str) -> Scene | None:
-        if scene_id == "action_menu":
-            async with self:
-                self.game_mode = "context"
-            return self.current_scene
-        scene_path = f"assets/game_data/scenes/{scene_id}.json"
-        if not os.path.exists(scene_path):
-            logging.error(f"Scene file not found: {scene_path}")
-            return None
-        try:
-            with open(scene_path, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            logging.exception(f"Error loading scene file {scene_id}.json: {e}")
-            return None
+    def _run_story(self, step: Callable[[StorySession], Any]) -> Any:
+        scene = self.current_scene
+        session = StorySession(
+            scene_id=self.current_scene_id,
+            scene=scene,
+            dialogue_index=self.dialogue_index,
+            history=self.history,
+            dialogue_history=self.dialogue_history,
+            game_vars=self.game_vars,
+            mode=self.game_mode,
+        )
+        result = step(session)
+        if session.scene is not scene or session.dialogue_index != self.dialogue_index:
+            self._line_revealed = False
+        if session.scene is not scene:
+            self.current_scene = cast(Scene, session.scene)
+            chapter = content_streamer.partition_of(session.scene_id)
+            content_streamer.focus(self.router.session.client_token, chapter)
+            if (chapter or "") != self.current_chapter:
+                self.current_chapter = chapter or ""
+        if session.scene_id != self.current_scene_id:
+            self.current_scene_id = session.scene_id
+        if session.dialogue_index != self.dialogue_index:
+            self.dialogue_index = session.dialogue_index
+        if session.mode != self.game_mode:
+            self.game_mode = session.mode
+        return result
 
     @rx.event
     def next_dialogue(self):
-        if not self.current_scene:
-            return
-        if self.dialogue_index < len(self.current_scene["dialogue"]) - 1:
-            self.dialogue_index += 1
-            if self.current_dialogue:
-                self.dialogue_history.append(self.current_dialogue)
-        else:
-            if self.is_skipping or self.is_auto_playing:
-                self.is_skipping = False
-                self.is_auto_playing = False
-            next_scene_id = self.current_scene.get("nextScene")
-            if next_scene_id and (not self.current_scene.get("choices")):
-                return GameState.change_scene(next_scene_id)
+        if self._run_story(story_engine.next_dialogue):
+            self.is_skipping = False
+            self.is_auto_playing = False
 
     @rx.event
     def prev_dialogue(self):
-        if self.dialogue_index > 0:
-            self.dialogue_index -= 1
-        elif len(self.history) > 1:
-            self.history.pop()
-            prev_scene_id = self.history[-1]
-            return GameState.change_scene(prev_scene_id, at_end=True)
+        self._run_story(story_engine.prev_dialogue)
 
-    @rx.event(background=True)
-    async def make_choice(self, choice_data_str: str):
-        async with self:
-            self.is_skipping = False
-            self.is_auto_playing = False
+    @rx.event
+    def make_choice(self, choice_data_str: str):
+        self.is_skipping = False
+        self.is_auto_playing = False
         choice: Choice = json.loads(choice_data_str)
-        next_scene_id = choice["nextScene"]
-        async with self:
-            if "set_vars" in choice:
-                for key, value in choice["set_vars"].items():
-                    self.game_vars[key] = value
-        yield GameState.change_scene(next_scene_id)
+        self._run_story(lambda session: story_engine.make_choice(session, choice))
 
-    @rx.event(background=True)
-    async def change_scene(self, scene_id: str, at_end: bool = False):
-        async with self:
-            self.is_loading = True
-        scene_data = await self._load_scene(scene_id)
-        async with self:
-            if scene_data:
-                self.current_scene = scene_data
-                self.current_scene_id = scene_id
-                self.dialogue_index = 0
-                if self.current_scene["dialogue"]:
-                    self.dialogue_history.append(self.current_dialogue)
-                if at_end:
-                    self.dialogue_index = len(self.current_scene["dialogue"]) - 1
-                if not at_end:
-                    self.history.append(scene_id)
-            self.is_loading = False
+    @rx.event
+    def change_scene(self, scene_id: str, at_end: bool = False):
+        self._run_story(
+            lambda session: story_engine.change_scene(session, scene_id, at_end)
+        )
+        self.is_loading = False
 
     @rx.var
     def current_dialogue(self) -> DialogueLine | None:
-        if self.current_scene and self.dialogue_index < len(
-            self.current_scene["dialogue"]
-        ):
-            return self.current_scene["dialogue"][self.dialogue_index]
-        return None
+        return cast(
+            DialogueLine | None, current_line(self.current_scene, self.dialogue_index)
+        )
+
+    @rx.var
+    def speaking_character(self) -> str:
+        """Id of the character speaking the current line, so sprites compare
+        against one value that only changes when the speaker does."""
+        if self.current_dialogue:
+            return self.current_dialogue["character"]
+        return ""
 
     @rx.var
     def current_character_name(self) -> str:
         if self.current_dialogue:
             char_id = self.current_dialogue["character"]
-            if char_id in self.characters:
-                return self.characters[char_id]["name"]
+            if char_id in static_content.characters:
+                return static_content.characters[char_id]["name"]
         return ""
 
     @rx.var
     def current_character_color(self) -> str:
         if self.current_dialogue:
             char_id = self.current_dialogue["character"]
-            if char_id in self.characters:
-                return self.characters[char_id]["color"]
+            if char_id in static_content.characters:
+                return static_content.characters[char_id]["color"]
         return "#FFFFFF"
 
     @rx.var
     def show_choices(self) -> bool:
-        if self.current_scene:
-            return self.dialogue_index == len(
-                self.current_scene["dialogue"]
-            ) - 1 and bool(self.current_scene.get("choices"))
-        return False
+        return shows_choices(self.current_scene, self.dialogue_index)
 
     @rx.event
     def toggle_menu(self):
@@ -352,6 +413,21 @@ class GameState(rx.State):
         self.history_open = not self.history_open
         self.settings_open = False
 
+    @rx.event
+    def search_history(self, query: str):
+        self.history_query = query
+        if not query.strip():
+            self.history_results = []
+            return
+        # Only this session's history is searched, so every matching line is
+        # kept however large the game's content is.
+        clauses = parse_query(query)
+        self.history_results = [
+            line
+            for line in self.dialogue_history
+            if matches_query(clauses, line["text"])
+        ]
+
     @rx.event
     def toggle_settings(self):
         self.settings_open = not self.settings_open
@@ -362,6 +438,24 @@ class GameState(rx.State):
         self.inventory_open = not self.inventory_open
         self.menu_open = False
 
+    @rx.var
+    def equipped_item_ids(self) -> list[str]:
+        return list(self.equipped.values())
+
+    @rx.event
+    def toggle_equip(self, item_id: str):
+        item = static_content.items.get(item_id)
+        if item is None or item["item_type"] != "Equipment":
+            return
+        slot = str(item["properties"].get("slot", item["item_type"]))
+        if self.equipped.get(slot) == item_id:
+            del self.equipped[slot]
+            changed = self._stat_engine.unequip(slot) if self._stat_engine else {}
+        else:
+            self.equipped[slot] = item_id
+            changed = self._stat_engine.equip(slot, item) if self._stat_engine else {}
+        self._sync_derived_stats(changed)
+
     @rx.event
     def set_inventory_tab(self, tab: str):
         self.inventory_tab = tab
@@ -379,19 +473,31 @@ class GameState(rx.State):
     def change_auto_speed(self, speed: float):
         self.auto_play_speed = speed
 
+    @rx.event
+    def finish_line(self, clicked: bool = False):
+        """Sent by the client once the current line is fully shown, either
+        because the reveal finished or the player clicked to complete it."""
+        if self._line_revealed:
+            return
+        self._line_revealed = True
+        if self.is_auto_playing or self.is_skipping:
+            return GameState.auto_advance
+
     @rx.event
     def toggle_skip(self):
         self.is_skipping = not self.is_skipping
         if self.is_skipping:
             self.is_auto_playing = False
-            return GameState.auto_advance
+            if self._line_revealed:
+                return GameState.auto_advance
 
     @rx.event
     def toggle_auto_play(self):
         self.is_auto_playing = not self.is_auto_playing
         if self.is_auto_playing:
             self.is_skipping = False
-            return GameState.auto_advance
+            if self._line_revealed:
+                return GameState.auto_advance
 
     @rx.event(background=True)
     async def auto_advance(self):
@@ -404,8 +510,8 @@ class GameState(rx.State):
                 return
             delay = 0.1 if state.is_skipping else state.auto_play_speed
         await asyncio.sleep(delay)
+        # The next line's finish_line continues the chain.
         yield GameState.next_dialogue
-        yield GameState.auto_advance
 
     @rx.event
     def handle_key_down(self, key: str):
@@ -425,6 +531,8 @@ class GameState(rx.State):
             "timestamp": timestamp,
             "game_vars": self.game_vars,
             "history": self.history,
+            "inventory": self.inventory,
+            "equipped": self.equipped,
             "thumbnail": thumbnail,
         }
         new_slots = self.save_slots_data
@@ -446,7 +554,12 @@ class GameState(rx.State):
         async with self:
             self.game_vars = save_data["game_vars"]
             self.history = save_data["history"]
+            # Saves made before equipment keep the current inventory.
+            if "inventory" in save_data:
+                self.inventory = save_data["inventory"]
+                self.equipped = save_data.get("equipped", {})
+                self._load_derived_stats()
             self.load_menu_open = False
             self.is_loading = True
         yield rx.toast(f"Loading game from slot {slot_id + 1}...")
-        yield GameState.change_scene(save_data["scene_id"])
\ No newline at end of file
+        yield GameState.change_scene(save_data["scene_id"])
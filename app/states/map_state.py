@@ -2,7 +2,8 @@ import reflex as rx
 import json
 import os
 import logging
-from typing import TypedDict, Literal
+from typing import TypedDict, Literal, cast
+from app.engine.partitions import content_streamer
 from app.states.game_state import GameState
 
 try:
@@ -45,7 +46,7 @@ MapMode = Literal["world", "region"]
 
 class MapState(rx.State):
     world_map_data: list[MajorLocation] = []
-    regional_maps: dict[str, RegionalMap] = {}
+    current_regional_map: RegionalMap | None = None
     map_mode: MapMode = "world"
     current_major_location_id: str | None = None
     current_minor_location_id: str | None = None
@@ -61,43 +62,29 @@ class MapState(rx.State):
         except Exception as e:
             logging.exception(f"Error loading world map: {e}")
 
-    def _load_regional_maps(self):
-        regional_maps_dir = "assets/game_data/maps/regions"
-        if not os.path.exists(regional_maps_dir):
-            logging.error(f"Regional maps directory not found: {regional_maps_dir}")
-            return
-        for filename in os.listdir(regional_maps_dir):
-            if filename.endswith(".json"):
-                try:
-                    with open(os.path.join(regional_maps_dir, filename), "r") as f:
-                        map_data: RegionalMap = json.load(f)
-                        self.regional_maps[map_data["id"]] = map_data
-                except Exception as e:
-                    logging.exception(f"Error loading regional map {filename}: {e}")
-
     @rx.event
     async def on_load_map(self):
         create_game_data()
         self._load_world_map()
-        self._load_regional_maps()
 
     @rx.event
     def select_major_location(self, location_id: str):
         self.current_major_location_id = location_id
+        region_id = f"region_{location_id}"
+        self.current_regional_map = cast(
+            RegionalMap | None, content_streamer.region(region_id)
+        )
+        content_streamer.focus_region(self.router.session.client_token, region_id)
         self.map_mode = "region"
 
     @rx.event
     def back_to_world_map(self):
         self.map_mode = "world"
         self.current_major_location_id = None
+        self.current_regional_map = None
+        content_streamer.focus_region(self.router.session.client_token, None)
 
     @rx.event
     def select_minor_location(self, location_id: str):
         self.current_minor_location_id = location_id
         yield GameState.set_game_mode("context")
-
-    @rx.var
-    def current_regional_map(self) -> RegionalMap | None:
-        if self.current_major_location_id:
-            return self.regional_maps.get(f"region_{self.current_major_location_id}")
-        return None
\ No newline at end of file
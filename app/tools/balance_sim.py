@@ -0,0 +1,326 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from app.engine.rewards import LEVEL_XP_GROWTH
+
+ACTIONS_PATH = "assets/game_data/actions.json"
+REGIONS_DIR = "assets/game_data/maps/regions"
+PLAYER_PATH = "assets/game_data/player/character.json"
+PERCENTILES = [1, 5, 50, 95, 99]
+
+
+def load_actions(path: str = ACTIONS_PATH) -> dict[str, dict]:
+    with open(path, "r") as f:
+        return {action["id"]: action for action in json.load(f)}
+
+
+def load_location_actions(
+    location_id: str, regions_dir: str = REGIONS_DIR
+) -> list[str]:
+    for filename in sorted(os.listdir(regions_dir)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(regions_dir, filename), "r") as f:
+            region = json.load(f)
+        for loc in region.get("locations", []):
+            if loc["id"] == location_id:
+                return loc.get("available_actions", [])
+    raise SystemExit(f"Location not found: {location_id}")
+
+
+def level_thresholds(
+    xp_to_next_level: int, growth: float, max_level: int
+) -> np.ndarray:
+    steps = [xp_to_next_level]
+    for _ in range(max_level - 2):
+        steps.append(int(steps[-1] * growth))
+    return np.cumsum(steps)
+
+
+class ActionTables:
+    def __init__(self, actions: list[dict], weights: list[float]):
+        self.ids = [a["id"] for a in actions]
+        self.weights = np.asarray(weights, dtype=np.float64) / sum(weights)
+        self.time_cost = np.array([a["time_cost"] for a in actions], dtype=np.int32)
+        xp = [a.get("rewards", {}).get("xp", [0, 0]) for a in actions]
+        self.xp_lo = np.array([lo for lo, _ in xp], dtype=np.int64)
+        self.xp_hi = np.array([hi for _, hi in xp], dtype=np.int64)
+        loot = [a.get("rewards", {}).get("loot", []) for a in actions]
+        self.item_ids = sorted({e["item_id"] for entries in loot for e in entries})
+        width = max([len(entries) for entries in loot] + [1])
+        shape = (len(actions), width)
+        self.chance = np.zeros(shape, dtype=np.float32)
+        self.qty_lo = np.zeros(shape, dtype=np.int64)
+        self.qty_span = np.ones(shape, dtype=np.int64)
+        self.item_idx = np.full(shape, -1, dtype=np.int64)
+        for a, entries in enumerate(loot):
+            for j, e in enumerate(entries):
+                self.chance[a, j] = e["chance"]
+                self.qty_lo[a, j] = e["min"]
+                self.qty_span[a, j] = e["max"] - e["min"] + 1
+                self.item_idx[a, j] = self.item_ids.index(e["item_id"])
+
+    def expected_per_hour(self) -> dict[str, dict]:
+        report = {}
+        for a, action_id in enumerate(self.ids):
+            hours = max(int(self.time_cost[a]), 1)
+            mean_qty = self.chance[a] * (self.qty_lo[a] + (self.qty_span[a] - 1) / 2)
+            items = {}
+            for j, k in enumerate(self.item_idx[a]):
+                if k >= 0:
+                    item_id = self.item_ids[k]
+                    items[item_id] = (
+                        items.get(item_id, 0.0) + float(mean_qty[j]) / hours
+                    )
+            report[action_id] = {
+                "time_cost": int(self.time_cost[a]),
+                "xp_per_hour": float(self.xp_lo[a] + self.xp_hi[a]) / 2 / hours,
+                "items_per_hour": items,
+            }
+        return report
+
+
+def simulate_chunk(
+    rng: np.random.Generator,
+    tables: ActionTables,
+    hours: int,
+    runs: int,
+    checkpoints: np.ndarray,
+) -> dict[str, np.ndarray]:
+    steps = int(hours // tables.time_cost.min())
+    choice = rng.choice(len(tables.ids), size=(runs, steps), p=tables.weights)
+    elapsed = np.cumsum(tables.time_cost[choice], axis=1)
+    done = elapsed <= hours
+    xp = rng.integers(tables.xp_lo[choice], tables.xp_hi[choice] + 1)
+    xp = np.where(done, xp, 0)
+    items = np.zeros((runs, len(tables.item_ids)), dtype=np.int64)
+    for j in range(tables.chance.shape[1]):
+        hit = done & (
+            rng.random((runs, steps), dtype=np.float32) < tables.chance[choice, j]
+        )
+        qty = tables.qty_lo[choice, j] + (
+            rng.random((runs, steps), dtype=np.float32) * tables.qty_span[choice, j]
+        ).astype(np.int64)
+        qty = np.where(hit, qty, 0)
+        slot_item = tables.item_idx[choice, j]
+        for k in range(len(tables.item_ids)):
+            items[:, k] += np.where(slot_item == k, qty, 0).sum(axis=1)
+    xp_cum = np.concatenate(
+        [np.zeros((runs, 1), dtype=np.int64), np.cumsum(xp, axis=1)], axis=1
+    )
+    done_by = (elapsed[:, :, None] <= checkpoints[None, None, :]).sum(axis=1)
+    action_counts = np.stack(
+        [((choice == a) & done).sum(axis=1) for a in range(len(tables.ids))], axis=1
+    )
+    return {
+        "items": items,
+        "xp": xp_cum[:, -1],
+        "xp_curve": np.take_along_axis(xp_cum, done_by, axis=1),
+        "hours_used": np.where(done, elapsed, 0).max(axis=1),
+        "action_counts": action_counts,
+    }
+
+
+def simulate(
+    tables: ActionTables,
+    hours: int,
+    runs: int,
+    seed: int,
+    chunk_size: int = 100_000,
+    checkpoints: int = 12,
+) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    cp = np.unique(np.linspace(0, hours, checkpoints + 1).round().astype(np.int64))[1:]
+    chunks = []
+    remaining = runs
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        chunks.append(simulate_chunk(rng, tables, hours, n, cp))
+        remaining -= n
+    result = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+    result["checkpoints"] = cp
+    return result
+
+
+def distribution(values: np.ndarray) -> dict[str, float]:
+    pct = np.percentile(values, PERCENTILES)
+    summary = {"mean": float(values.mean()), "std": float(values.std())}
+    summary.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, pct)})
+    summary["max"] = float(values.max())
+    summary["zero_rate"] = float((values == 0).mean())
+    return summary
+
+
+def build_report(
+    tables: ActionTables,
+    result: dict[str, np.ndarray],
+    hours: int,
+    thresholds: np.ndarray,
+) -> dict:
+    levels = 1 + np.searchsorted(thresholds, result["xp_curve"], side="right")
+    return {
+        "hours": hours,
+        "runs": int(result["xp"].shape[0]),
+        "actions": {
+            action_id: {
+                "weight": float(tables.weights[a]),
+                "mean_per_session": float(result["action_counts"][:, a].mean()),
+            }
+            for a, action_id in enumerate(tables.ids)
+        },
+        "expected_per_hour": tables.expected_per_hour(),
+        "items": {
+            item_id: dict(
+                distribution(result["items"][:, k]),
+                per_hour=float(result["items"][:, k].mean()) / hours,
+            )
+            for k, item_id in enumerate(tables.item_ids)
+        },
+        "xp": distribution(result["xp"]),
+        "levels": {
+            str(level): float(count) / len(result["xp"])
+            for level, count in zip(*np.unique(levels[:, -1], return_counts=True))
+        },
+        "xp_curve": [
+            {
+                "hour": int(h),
+                "xp_mean": float(result["xp_curve"][:, i].mean()),
+                "xp_p5": float(np.percentile(result["xp_curve"][:, i], 5)),
+                "xp_p95": float(np.percentile(result["xp_curve"][:, i], 95)),
+                "level_mean": float(levels[:, i].mean()),
+                "next_threshold": int(
+                    thresholds[
+                        min(
+                            np.searchsorted(
+                                thresholds,
+                                result["xp_curve"][:, i].mean(),
+                                side="right",
+                            ),
+                            len(thresholds) - 1,
+                        )
+                    ]
+                ),
+            }
+            for i, h in enumerate(result["checkpoints"])
+        ],
+        "idle_hours": distribution(hours - result["hours_used"]),
+    }
+
+
+def print_report(report: dict, elapsed: float):
+    print(
+        f"Simulated {report['runs']:,} sessions of {report['hours']}h in {elapsed:.2f}s"
+    )
+    print("\nAction mix")
+    for action_id, info in report["actions"].items():
+        print(
+            f"  {action_id:<10} weight {info['weight']:.2f}  "
+            f"{info['mean_per_session']:.2f} per session"
+        )
+    print("\nExpected yield per hour of time_cost")
+    for action_id, info in report["expected_per_hour"].items():
+        items = ", ".join(f"{k} {v:.3f}" for k, v in info["items_per_hour"].items())
+        print(
+            f"  {action_id:<10} xp {info['xp_per_hour']:.2f}/h"
+            + (f"  items: {items}" if items else "")
+        )
+    print("\nItems per session")
+    header = "  ".join(
+        f"{name:>8}" for name in ["mean", "per_h", "p1", "p50", "p99", "max", "zero%"]
+    )
+    print(f"  {'item':<16}{header}")
+    for item_id, d in report["items"].items():
+        row = [
+            d["mean"],
+            d["per_hour"],
+            d["p1"],
+            d["p50"],
+            d["p99"],
+            d["max"],
+            d["zero_rate"] * 100,
+        ]
+        print(f"  {item_id:<16}" + "  ".join(f"{v:>8.2f}" for v in row))
+    xp = report["xp"]
+    print(
+        f"\nXP per session: mean {xp['mean']:.1f}  p1 {xp['p1']:.0f}  "
+        f"p50 {xp['p50']:.0f}  p99 {xp['p99']:.0f}  max {xp['max']:.0f}"
+    )
+    print(
+        "Final level distribution: "
+        + ", ".join(
+            f"L{level} {share * 100:.1f}%" for level, share in report["levels"].items()
+        )
+    )
+    print("\nXP curve")
+    print(f"  {'hour':>5} {'mean':>9} {'p5':>9} {'p95':>9} {'level':>7} {'next':>7}")
+    for point in report["xp_curve"]:
+        print(
+            f"  {point['hour']:>5} {point['xp_mean']:>9.1f} {point['xp_p5']:>9.0f} "
+            f"{point['xp_p95']:>9.0f} {point['level_mean']:>7.2f} {point['next_threshold']:>7}"
+        )
+
+
+def parse_action_weights(spec: str) -> dict[str, float]:
+    weights = {}
+    for part in spec.split(","):
+        action_id, _, weight = part.strip().partition(":")
+        weights[action_id] = float(weight) if weight else 1.0
+    return weights
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo balancing report for action rewards."
+    )
+    parser.add_argument("--location", default="whispering_glade")
+    parser.add_argument(
+        "--actions",
+        help="Comma separated action ids with optional weights, e.g. gather:3,train:1. "
+        "Defaults to the location's available actions.",
+    )
+    parser.add_argument("--hours", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--level-growth", type=float, default=LEVEL_XP_GROWTH)
+    parser.add_argument("--max-level", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    actions = load_actions()
+    if args.actions:
+        weights = parse_action_weights(args.actions)
+    else:
+        weights = {a: 1.0 for a in load_location_actions(args.location)}
+    missing = [a for a in weights if a not in actions]
+    if missing:
+        raise SystemExit(f"Unknown actions: {', '.join(missing)}")
+    selected = [a for a in weights if actions[a]["time_cost"] > 0]
+    if not selected:
+        raise SystemExit("No actions with a time_cost to simulate.")
+    tables = ActionTables(
+        [actions[a] for a in selected], [weights[a] for a in selected]
+    )
+    with open(PLAYER_PATH, "r") as f:
+        player = json.load(f)
+    thresholds = level_thresholds(
+        player["xp_to_next_level"], args.level_growth, args.max_level
+    )
+
+    start = time.perf_counter()
+    result = simulate(tables, args.hours, args.runs, args.seed, args.chunk_size)
+    report = build_report(tables, result, args.hours, thresholds)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        report["elapsed_seconds"] = elapsed
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Any, Awaitable, Callable
+
+from reflex.state import State
+
+from app.engine.content import content_cache
+from app.engine.partitions import content_streamer
+from app.states.action_state import ActionState
+from app.states.editor_state import EditorState
+from app.states.game_state import GameState
+from app.states.map_state import MapState
+
+DEFAULT_SIZES = [10, 100, 1000]
+SAVE_SLOTS = 15
+
+Case = Callable[[], Awaitable[Any] | Any]
+
+
+def synthetic_scene(scene_id: str, lines: int, targets: list[str]) -> dict:
+    return {
+        "id": scene_id,
+        "background": "/placeholder.svg",
+        "characters": [],
+        "dialogue": [
+            {"character": "narrator", "text": f"{scene_id} line {i} " + "lorem " * 12}
+            for i in range(lines)
+        ],
+        "choices": [
+            {"text": f"Go to {t}", "nextScene": t, "set_vars": {"last": t}}
+            for t in targets
+        ],
+        "nextScene": None,
+    }
+
+
+def synthetic_region(locations: int) -> dict:
+    return {
+        "id": "bench_region",
+        "name": "Bench Region",
+        "background_image": "/placeholder.svg",
+        "locations": [
+            {
+                "id": f"loc_{i}",
+                "name": f"Location {i}",
+                "description": "A place.",
+                "x": i % 100,
+                "y": i // 100,
+                "available_actions": ["gather", "rest"],
+            }
+            for i in range(locations)
+        ],
+    }
+
+
+def write_scenes(root: str, size: int) -> list[str]:
+    scenes_dir = os.path.join(root, "assets", "game_data", "scenes")
+    os.makedirs(scenes_dir, exist_ok=True)
+    ids = ["bench_a", "bench_b"]
+    for scene_id in ids:
+        scene = synthetic_scene(scene_id, size, [i for i in ids if i != scene_id])
+        with open(os.path.join(scenes_dir, f"{scene_id}.json"), "w") as f:
+            json.dump(scene, f)
+    return ids
+
+
+def check_scene_isolation(game: GameState, scene_id: str):
+    """Fail if editing a session's scene reaches the shared content cache."""
+    GameState.change_scene.fn(game, scene_id)
+    path = os.path.join("assets", "game_data", "scenes", f"{scene_id}.json")
+    cached = json.dumps(content_cache.load(path))
+    game.current_scene["dialogue"][0]["text"] = "changed by this session"
+    if json.dumps(content_cache.load(path)) != cached:
+        raise RuntimeError(f"Changing current_scene altered the cached {path}")
+
+
+async def build_cases(size: int) -> dict[str, Case]:
+    root = State(_reflex_internal_init=True)
+    game = await root.get_state(GameState)
+    editor = await root.get_state(EditorState)
+    actions = await root.get_state(ActionState)
+    map_state = await root.get_state(MapState)
+
+    check_scene_isolation(game, "bench_b")
+    scene = synthetic_scene("bench_a", size, ["bench_b"])
+    game.current_scene = scene
+    game.current_scene_id = "bench_a"
+    game.history = [f"scene_{i}" for i in range(size)]
+    game.dialogue_history = list(scene["dialogue"])
+    slot = {
+        "slot_id": 0,
+        "scene_id": "bench_a",
+        "timestamp": "2024-01-01 00:00:00",
+        "game_vars": {f"var_{i}": i for i in range(size)},
+        "history": game.history,
+        "thumbnail": "",
+    }
+    game.save_slots = json.dumps([dict(slot, slot_id=i) for i in range(SAVE_SLOTS)])
+    choice = json.dumps(scene["choices"][0])
+
+    map_state.current_regional_map = synthetic_region(size)
+    actions._current_location_id = f"loc_{size - 1}"
+
+    editor.current_file_path = "assets/game_data/scenes/bench_a.json"
+    drafts = [json.dumps(scene, indent=2), json.dumps(scene, indent=2) + "\n"]
+    await root._get_resolved_delta()
+    root._clean()
+
+    def trim_history():
+        # Keep every case running against the fixture's history sizes,
+        # however many calls calibration and earlier cases made.
+        del game.history[size:]
+        del game.dialogue_history[size:]
+
+    def next_dialogue():
+        if game.dialogue_index >= size - 1:
+            game.dialogue_index = 0
+            del game.dialogue_history[size:]
+        GameState.next_dialogue.fn(game)
+
+    async def next_dialogue_with_delta():
+        next_dialogue()
+        await root._get_resolved_delta()
+        root._clean()
+
+    def change_scene():
+        target = "bench_b" if game.current_scene_id == "bench_a" else "bench_a"
+        GameState.change_scene.fn(game, target)
+        trim_history()
+
+    def make_choice():
+        game.current_scene = scene
+        GameState.make_choice.fn(game, choice)
+        trim_history()
+
+    def save_game():
+        list(GameState.save_game.fn(game, 0, ""))
+
+    def update_preview():
+        drafts.reverse()
+        EditorState.update_preview.fn(editor, drafts[0])
+
+    computed = GameState.computed_vars
+    location_var = ActionState.computed_vars["current_location"]
+    return {
+        "GameState.next_dialogue": next_dialogue,
+        "GameState.next_dialogue+delta": next_dialogue_with_delta,
+        "GameState.change_scene": change_scene,
+        "GameState.make_choice": make_choice,
+        "GameState.save_game": save_game,
+        "GameState.save_slots_data": lambda: computed["save_slots_data"].fget(game),
+        "GameState.current_dialogue": lambda: computed["current_dialogue"].fget(game),
+        "GameState.show_choices": lambda: computed["show_choices"].fget(game),
+        "ActionState.current_location": lambda: location_var.fget(actions),
+        "EditorState.update_preview": update_preview,
+    }
+
+
+async def time_case(case: Case, rounds: int, min_round: float) -> dict:
+    async def call():
+        result = case()
+        if asyncio.iscoroutine(result):
+            await result
+
+    await call()
+    start = time.perf_counter()
+    await call()
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, int(min_round / single))
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            await call()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+async def run_benchmarks(
+    sizes: list[int], rounds: int, min_round: float, only: str | None
+) -> dict[str, dict]:
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                write_scenes(tmp, size)
+                for name, case in (await build_cases(size)).items():
+                    if only and only not in name:
+                        continue
+                    results[f"{name}[n={size}]"] = await time_case(
+                        case, rounds, min_round
+                    )
+            finally:
+                # Let prefetches started in this tempdir finish before it goes.
+                await content_streamer.drain()
+                os.chdir(cwd)
+                content_streamer.reload()
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[dict]:
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = result["median_us"] / before["median_us"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "case": name,
+                    "baseline_us": before["median_us"],
+                    "median_us": result["median_us"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def print_report(report: dict):
+    print(f"Commit {report['commit'] or 'unknown'}, Python {report['python']}")
+    print(f"  {'case':<44}{'median µs':>12}{'min µs':>12}")
+    for name, result in report["results"].items():
+        print(f"  {name:<44}{result['median_us']:>12.2f}{result['min_us']:>12.2f}")
+    for regression in report.get("regressions", []):
+        print(
+            f"REGRESSION {regression['case']}: {regression['baseline_us']:.2f}µs -> "
+            f"{regression['median_us']:.2f}µs ({regression['ratio']:.2f}x)"
+        )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks for state handlers and computed vars."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma separated content sizes (dialogue lines, history entries, "
+        "map locations).",
+    )
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-round", type=float, default=0.02)
+    parser.add_argument("--only", help="Only run cases whose name contains this.")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", help="Results JSON to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Fail when a case's median is this fraction slower than the baseline.",
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sizes": sizes,
+        "results": asyncio.run(
+            run_benchmarks(sizes, args.rounds, args.min_round, args.only)
+        ),
+    }
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+        report["threshold"] = args.threshold
+        report["regressions"] = compare(report["results"], baseline, args.threshold)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if report.get("regressions"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import json
+import os
+
+from reflex.config import get_config
+
+from app.components.head import SERVICE_WORKER_PATH
+from app.engine.catalog import static_content
+from app.engine.content import write_atomic
+from app.engine.partitions import content_streamer
+from app.engine.story_graph import load_scenes
+
+ASSETS_DIR = "assets"
+ASSET_MANIFEST_PATH = os.path.join(ASSETS_DIR, "asset-manifest.json")
+SKIP_DIRS = {"game_data", "__pycache__"}
+SKIP_FILES = {
+    os.path.basename(SERVICE_WORKER_PATH),
+    os.path.basename(ASSET_MANIFEST_PATH),
+    "__init__.py",
+}
+
+SERVICE_WORKER = """// Generated by app.tools.build_service_worker. Do not edit.
+const VERSION = %(version)s;
+const CACHE = `game-assets-${VERSION}`;
+const HASHES_KEY = "/__asset-hashes";
+const ASSET_HASHES = %(hashes)s;
+const PRECACHE = %(precache)s;
+// Images of each chapter and the chapters it leads to, cached once the page
+// reports that the player has reached it.
+const CHAPTERS = %(chapters)s;
+const CONTENT_PATH = "/_content/";
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(CACHE).then(async (cache) => {
+      await cache.put(HASHES_KEY, new Response(JSON.stringify(ASSET_HASHES)));
+      // One missing file must not keep the worker from installing.
+      await Promise.all(PRECACHE.map((url) => cache.add(url).catch(() => {})));
+    }).then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    const current = await caches.open(CACHE);
+    for (const name of await caches.keys()) {
+      if (name === CACHE || !name.startsWith("game-assets-")) continue;
+      // Carry over entries whose content hash did not change.
+      const old = await caches.open(name);
+      const stored = await old.match(HASHES_KEY);
+      const hashes = stored ? await stored.json() : {};
+      for (const request of await old.keys()) {
+        const path = new URL(request.url).pathname;
+        const keep = path.startsWith(CONTENT_PATH)
+          ? PRECACHE.includes(request.url)
+          : hashes[path] && hashes[path] === ASSET_HASHES[path];
+        if (keep && !(await current.match(request))) {
+          await current.put(request, await old.match(request));
+        }
+      }
+      await caches.delete(name);
+    }
+    await self.clients.claim();
+  })());
+});
+
+async function cacheFirst(request) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+  const response = await fetch(request);
+  if (response.ok) await cache.put(request, response.clone());
+  return response;
+}
+
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(event.request);
+  const refresh = fetch(event.request).then(async (response) => {
+    if (response.ok) await cache.put(event.request, response.clone());
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(refresh.catch(() => {}));
+    return cached;
+  }
+  return refresh;
+}
+
+self.addEventListener("message", (event) => {
+  const urls = event.data?.type === "precache-chapter" && CHAPTERS[event.data.chapter];
+  if (!urls) return;
+  event.waitUntil(
+    caches.open(CACHE).then((cache) =>
+      Promise.all(
+        urls.map(async (url) => {
+          if (!(await cache.match(url))) await cache.add(url).catch(() => {});
+        })
+      )
+    )
+  );
+});
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  if (request.method !== "GET") return;
+  const url = new URL(request.url);
+  if (url.pathname.startsWith(CONTENT_PATH)) {
+    // Content bundles are named by hash and never change.
+    event.respondWith(cacheFirst(request));
+  } else if (
+    url.origin === self.location.origin &&
+    (url.pathname in ASSET_HASHES || request.destination === "image")
+  ) {
+    event.respondWith(staleWhileRevalidate(event));
+  }
+});
+"""
+
+
+def asset_hashes(root: str = ASSETS_DIR) -> dict[str, str]:
+    """URL path of every file served from assets/, mapped to its content hash."""
+    hashes = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            if filename in SKIP_FILES:
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:16]
+            hashes["/" + os.path.relpath(path, root).replace(os.sep, "/")] = digest
+    return hashes
+
+
+def chapter_images(scenes: dict[str, dict], scene_ids: list[str]) -> list[str]:
+    images = []
+    for scene_id in scene_ids:
+        scene = scenes[scene_id]
+        images.append(scene.get("background"))
+        for sprite in scene.get("characters") or []:
+            character = static_content.characters.get(sprite.get("id"), {})
+            images.append((character.get("sprites") or {}).get(sprite.get("sprite")))
+    return list(dict.fromkeys(i for i in images if i))
+
+
+def build_service_worker(backend_url: str = "") -> dict:
+    """Write sw.js with the opening chapter from the partition manifest
+    precached and every other chapter's images listed for later."""
+    static_content.refresh()
+    content_streamer.reload()
+    manifest = content_streamer.manifest
+    scenes = load_scenes()
+    hashes = asset_hashes()
+    chapter_urls = {
+        pid: [
+            url for url in chapter_images(scenes, partition["scenes"]) if url in hashes
+        ]
+        for pid, partition in manifest["partitions"].items()
+        if "scenes" in partition
+    }
+    chapters = {
+        pid: list(
+            dict.fromkeys(
+                url
+                for target in [pid, *manifest["partitions"][pid]["next"]]
+                for url in chapter_urls.get(target, [])
+            )
+        )
+        for pid in chapter_urls
+    }
+    opening = content_streamer.partition_of(manifest["start"])
+    images = [
+        url for url in ["/placeholder.svg", *chapters.get(opening, [])] if url in hashes
+    ]
+    content = [backend_url.rstrip("/") + url for url in static_content.urls().values()]
+    precache = list(dict.fromkeys([*images, *content]))
+    version = hashlib.sha256(
+        json.dumps([hashes, precache, chapters], sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    write_atomic(
+        SERVICE_WORKER_PATH,
+        SERVICE_WORKER
+        % {
+            "version": json.dumps(version),
+            "hashes": json.dumps(hashes, sort_keys=True),
+            "precache": json.dumps(precache),
+            "chapters": json.dumps(chapters, sort_keys=True),
+        },
+    )
+    manifest = {
+        "version": version,
+        "assets": hashes,
+        "opening_chapter": opening,
+        "chapters": {pid: len(urls) for pid, urls in chapters.items()},
+        "precache": precache,
+    }
+    write_atomic(ASSET_MANIFEST_PATH, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Generate assets/sw.js from the asset manifest. Run before "
+        "building the frontend and again whenever assets or content change."
+    )
+    parser.add_argument(
+        "--backend-url",
+        default=None,
+        help="Origin the static content bundles are served from. Defaults to "
+        "the configured api_url.",
+    )
+    args = parser.parse_args(argv)
+
+    backend_url = args.backend_url
+    if backend_url is None:
+        backend_url = get_config().api_url
+    manifest = build_service_worker(backend_url)
+    print(
+        f"{SERVICE_WORKER_PATH} version {manifest['version']}: "
+        f"{len(manifest['assets'])} assets, {len(manifest['chapters'])} "
+        f"chapters, {len(manifest['precache'])} precached for "
+        f"{manifest['opening_chapter']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+from app.app import EDITOR_ENV
+
+APP_IMPORT = "import app.app"
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+JS_IMPORT = re.compile(r'^import .* from "([^"]+)"', re.MULTILINE)
+WEB_DIR = ".web"
+
+
+def import_times(code: str, editor: bool) -> dict[str, tuple[int, int, int]]:
+    """Self and cumulative microseconds and nesting depth of every module
+    imported by `code` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env={
+            **os.environ,
+            "CI": "1",
+            "PYTHONPATH": os.getcwd(),
+            EDITOR_ENV: "1" if editor else "0",
+        },
+        check=True,
+    )
+    times = {}
+    for match in IMPORT_TIME.finditer(proc.stderr):
+        self_us, cumulative_us, indent, module = match.groups()
+        times[module] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return times
+
+
+def _top_level(times: dict[str, tuple[int, int, int]]) -> dict[str, int]:
+    packages: dict[str, int] = {}
+    for module, (self_us, _, _) in times.items():
+        package = module.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return packages
+
+
+def server_report(limit: int) -> dict:
+    game = import_times(APP_IMPORT, editor=False)
+    with_editor = import_times(APP_IMPORT, editor=True)
+    deferred = {m: t for m, t in with_editor.items() if m not in game}
+    return {
+        "game_import_ms": game.get("app.app", (0, 0, 0))[1] / 1000,
+        "game_modules": len(game),
+        "deferred_ms": sum(t[0] for t in deferred.values()) / 1000,
+        "deferred_modules": len(deferred),
+        "deferred_packages": {
+            package: us / 1000
+            for package, us in sorted(
+                _top_level(deferred).items(), key=lambda p: -p[1]
+            )[:limit]
+        },
+        "slowest_packages": {
+            package: us / 1000
+            for package, us in sorted(_top_level(game).items(), key=lambda p: -p[1])[
+                :limit
+            ]
+        },
+    }
+
+
+def _package(library: str) -> str:
+    parts = library.split("/")
+    return "/".join(parts[:2]) if library.startswith("@") else parts[0]
+
+
+def _installed_kb(package: str) -> float | None:
+    path = os.path.join(WEB_DIR, "node_modules", package)
+    if not os.path.isdir(path):
+        return None
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total / 1024
+
+
+def route_libraries(page) -> set[str]:
+    from reflex.compiler.compiler import _compile_page
+
+    return {
+        _package(library)
+        for library in JS_IMPORT.findall(_compile_page(page()))
+        if not library.startswith(("$/", "/", "."))
+    }
+
+
+def client_report() -> dict:
+    from app.app import index
+    from app.editor import editor_page
+
+    game = route_libraries(index)
+    editor_libs = route_libraries(editor_page)
+    return {
+        "game_route": sorted(game),
+        "editor_only": {
+            package: _installed_kb(package) for package in sorted(editor_libs - game)
+        },
+    }
+
+
+def print_report(report: dict):
+    server = report["server"]
+    print(
+        f"Server: importing app.app with {EDITOR_ENV}=0 takes "
+        f"{server['game_import_ms']:.0f}ms ({server['game_modules']} modules)"
+    )
+    print(
+        f"  Only imported with {EDITOR_ENV}=1: {server['deferred_ms']:.0f}ms "
+        f"({server['deferred_modules']} modules). EditorState is then part of "
+        "every session, players included."
+    )
+    for package, ms in server["deferred_packages"].items():
+        print(f"    {package:<32}{ms:>8.1f}ms")
+    print("  Slowest packages on the game import path")
+    for package, ms in server["slowest_packages"].items():
+        print(f"    {package:<32}{ms:>8.1f}ms")
+    client = report["client"]
+    print(f"Client: game route imports {len(client['game_route'])} libraries")
+    print("  Only loaded with the /editor route chunk")
+    for package, kb in client["editor_only"].items():
+        size = f"{kb:,.0f}KB installed" if kb is not None else "not installed"
+        print(f"    {package:<32}{size:>20}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Import cost of the game with and without the editor."
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = {"server": server_report(args.limit), "client": client_report()}
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
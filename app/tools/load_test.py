@@ -0,0 +1,363 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.parse
+import uuid
+
+import psutil
+import socketio
+from reflex import constants
+from reflex.state import State
+
+from app.states.game_state import GameState
+
+ROOT_STATE = State.get_name()
+GAME_STATE = GameState.get_full_name()
+EVENT_NAMESPACE = str(constants.Endpoint.EVENT)
+VAR_SUFFIX = "_rx_state_"
+PERCENTILES = [50, 95, 99]
+
+# Relative frequency of each player action once the game has loaded.
+ACTION_WEIGHTS = {
+    "next_dialogue": 20,
+    "prev_dialogue": 2,
+    "toggle_history": 2,
+    "toggle_menu": 2,
+    "save_game": 1,
+}
+
+
+class SimulatedPlayer:
+    def __init__(self, backend_url: str, rng: random.Random, timeout: float):
+        self.backend_url = backend_url
+        self.rng = rng
+        self.timeout = timeout
+        self.token = str(uuid.uuid4())
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.state: dict[str, dict] = {}
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self._pending: list[dict] = []
+        self._done = asyncio.Event()
+        self.client.on("event", self._on_update, namespace=EVENT_NAMESPACE)
+        self.client.on("new_token", self._on_new_token, namespace=EVENT_NAMESPACE)
+
+    async def connect(self):
+        await self.client.connect(
+            f"{self.backend_url}?token={self.token}",
+            namespaces=[EVENT_NAMESPACE],
+            socketio_path=EVENT_NAMESPACE,
+            transports=["websocket"],
+        )
+
+    async def close(self):
+        await self.client.disconnect()
+
+    def game_var(self, name: str, default=None):
+        return self.state.get(GAME_STATE, {}).get(name + VAR_SUFFIX, default)
+
+    async def _on_new_token(self, token: str):
+        self.token = token
+
+    async def _on_update(self, update: dict):
+        for substate, delta in (update.get("delta") or {}).items():
+            self.state.setdefault(substate, {}).update(delta)
+        # Chained events are sent back by the browser, so the simulated
+        # client does the same before it considers the action finished.
+        self._pending.extend(
+            event
+            for event in update.get("events") or []
+            if "." in event.get("name", "")  # skip client-side events like toasts
+        )
+        if update.get("final") and not self._pending:
+            self._done.set()
+        elif update.get("final"):
+            await self._send(self._pending.pop(0))
+
+    async def _send(self, event: dict):
+        await self.client.emit(
+            str(constants.SocketEvent.EVENT),
+            {
+                "token": self.token,
+                "name": event["name"],
+                "router_data": {"pathname": "/", "query": {}, "asPath": "/"},
+                "payload": event.get("payload") or {},
+            },
+            namespace=EVENT_NAMESPACE,
+        )
+
+    async def request(self, label: str, name: str, payload: dict | None = None):
+        self._done.clear()
+        self._pending.clear()
+        start = time.perf_counter()
+        await self._send({"name": name, "payload": payload})
+        try:
+            await asyncio.wait_for(self._done.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            self.errors[label] = self.errors.get(label, 0) + 1
+            return
+        self.latencies.setdefault(label, []).append(time.perf_counter() - start)
+
+    async def load(self):
+        await self.request("hydrate", f"{ROOT_STATE}.{constants.CompileVars.HYDRATE}")
+        await self.request(
+            "on_load_internal", f"{ROOT_STATE}.{constants.CompileVars.ON_LOAD_INTERNAL}"
+        )
+        # The index page starts the game from on_mount rather than on_load.
+        await self.request("on_load", f"{GAME_STATE}.on_load")
+        deadline = time.perf_counter() + self.timeout
+        while self.game_var("is_loading", True) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+    async def step(self):
+        if self.game_var("game_mode") == "context":
+            # The story ran into the action menu; start over from the top.
+            await self.request(
+                "set_game_mode", f"{GAME_STATE}.set_game_mode", {"mode": "novel"}
+            )
+            await self.request(
+                "change_scene", f"{GAME_STATE}.change_scene", {"scene_id": "scene_001"}
+            )
+            return
+        if self.game_var("show_choices"):
+            choices = (self.game_var("current_scene") or {}).get("choices") or []
+            if choices:
+                choice = self.rng.choice(choices)
+                await self.request(
+                    "make_choice",
+                    f"{GAME_STATE}.make_choice",
+                    {"choice_data_str": json.dumps(choice)},
+                )
+                return
+        action = self.rng.choices(
+            list(ACTION_WEIGHTS), weights=list(ACTION_WEIGHTS.values())
+        )[0]
+        if action == "save_game":
+            await self.request(
+                action,
+                f"{GAME_STATE}.save_game",
+                {"slot_id": self.rng.randrange(15), "thumbnail": ""},
+            )
+        elif action.startswith("toggle_"):
+            # Open and close again so overlays don't pile up.
+            await self.request(action, f"{GAME_STATE}.{action}")
+            await self.request(action, f"{GAME_STATE}.{action}")
+        else:
+            await self.request(action, f"{GAME_STATE}.{action}")
+            # The browser reports once the new line has finished revealing.
+            await self.request(
+                "finish_line", f"{GAME_STATE}.finish_line", {"clicked": False}
+            )
+
+
+class ProcessSampler:
+    def __init__(self, pid: int | None, interval: float = 0.5):
+        self.process = psutil.Process(pid) if pid else None
+        self.interval = interval
+        self.cpu: list[float] = []
+        self.rss: list[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _processes(self) -> list[psutil.Process]:
+        return [self.process, *self.process.children(recursive=True)]
+
+    def _run(self):
+        for proc in self._processes():
+            proc.cpu_percent(None)
+        while not self._stop.wait(self.interval):
+            cpu, rss = 0.0, 0
+            for proc in self._processes():
+                try:
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                except psutil.NoSuchProcess:
+                    continue
+            self.cpu.append(cpu)
+            self.rss.append(rss)
+
+    def __enter__(self):
+        if self.process is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def summary(self) -> dict:
+        if not self.cpu:
+            return {}
+        return {
+            "cpu_percent_mean": statistics.fmean(self.cpu),
+            "cpu_percent_max": max(self.cpu),
+            "rss_mb_mean": statistics.fmean(self.rss) / 2**20,
+            "rss_mb_max": max(self.rss) / 2**20,
+        }
+
+
+def find_server_pid(port: int) -> int | None:
+    try:
+        connections = psutil.net_connections(kind="tcp")
+    except psutil.AccessDenied:
+        return None
+    for conn in connections:
+        if conn.status == psutil.CONN_LISTEN and conn.laddr.port == port and conn.pid:
+            return conn.pid
+    return None
+
+
+def latency_summary(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        **{f"p{p}_ms": pct(p) for p in PERCENTILES},
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def run_player(
+    backend_url: str, seed: int, duration: float, think: float, timeout: float
+) -> SimulatedPlayer:
+    rng = random.Random(seed)
+    player = SimulatedPlayer(backend_url, rng, timeout)
+    try:
+        await player.connect()
+        await player.load()
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            await player.step()
+            if think:
+                await asyncio.sleep(rng.uniform(0, 2 * think))
+    except Exception as e:
+        player.errors[type(e).__name__] = player.errors.get(type(e).__name__, 0) + 1
+    finally:
+        if player.client.connected:
+            await player.close()
+    return player
+
+
+async def run_stage(
+    backend_url: str,
+    clients: int,
+    duration: float,
+    think: float,
+    timeout: float,
+    seed: int,
+    ramp: float,
+    server_pid: int | None,
+) -> dict:
+    async def delayed(i: int) -> SimulatedPlayer:
+        await asyncio.sleep(ramp * i / max(clients, 1))
+        return await run_player(backend_url, seed + i, duration, think, timeout)
+
+    with ProcessSampler(server_pid) as sampler:
+        start = time.perf_counter()
+        players = await asyncio.gather(*(delayed(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    merged: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for player in players:
+        for label, samples in player.latencies.items():
+            merged.setdefault(label, []).extend(samples)
+        for label, count in player.errors.items():
+            errors[label] = errors.get(label, 0) + count
+    total = sum(len(samples) for samples in merged.values())
+    return {
+        "clients": clients,
+        "elapsed_seconds": elapsed,
+        "events": total,
+        "events_per_second": total / elapsed if elapsed else 0.0,
+        "latency": {label: latency_summary(s) for label, s in sorted(merged.items())},
+        "errors": errors,
+        "server": sampler.summary(),
+    }
+
+
+def print_stage(stage: dict):
+    server = stage["server"]
+    print(
+        f"\n{stage['clients']} clients: {stage['events']:,} events in "
+        f"{stage['elapsed_seconds']:.1f}s ({stage['events_per_second']:,.0f}/s)"
+        + (
+            f"  server cpu {server['cpu_percent_mean']:.0f}% (max "
+            f"{server['cpu_percent_max']:.0f}%)  rss {server['rss_mb_max']:.0f}MB"
+            if server
+            else ""
+        )
+    )
+    header = "  ".join(f"{n:>8}" for n in ["count", "mean", "p50", "p95", "p99", "max"])
+    print(f"  {'event':<16}{header}")
+    for label, d in stage["latency"].items():
+        row = [d["mean_ms"], d["p50_ms"], d["p95_ms"], d["p99_ms"], d["max_ms"]]
+        print(f"  {label:<16}{d['count']:>8}  " + "  ".join(f"{v:>8.1f}" for v in row))
+    if stage["errors"]:
+        print("  errors: " + ", ".join(f"{k} {v}" for k, v in stage["errors"].items()))
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Simulated concurrent players against a running backend."
+    )
+    parser.add_argument("--backend", default="http://localhost:8000")
+    parser.add_argument(
+        "--clients",
+        default="1,10,50",
+        help="Comma separated concurrency levels, run one after another.",
+    )
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--think", type=float, default=0.5, help="Mean seconds between actions."
+    )
+    parser.add_argument("--ramp", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--server-pid",
+        type=int,
+        help="Backend process to sample. Defaults to the process listening on "
+        "the backend port.",
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    server_pid = args.server_pid
+    if server_pid is None:
+        backend = urllib.parse.urlsplit(args.backend)
+        port = backend.port or (443 if backend.scheme == "https" else 80)
+        server_pid = find_server_pid(port)
+    levels = [int(n) for n in args.clients.split(",") if n.strip()]
+    stages = []
+    for clients in levels:
+        stage = asyncio.run(
+            run_stage(
+                args.backend,
+                clients,
+                args.duration,
+                args.think,
+                args.timeout,
+                args.seed,
+                args.ramp,
+                server_pid,
+            )
+        )
+        stages.append(stage)
+        if not args.json:
+            print_stage(stage)
+    if args.json:
+        print(json.dumps({"server_pid": server_pid, "stages": stages}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import json
+
+from app.engine.partitions import (
+    PARTITION_SIZE,
+    PARTITIONS_PATH,
+    REGIONS_DIR,
+    build_manifest,
+    write_manifest,
+)
+from app.engine.story import SCENES_DIR
+from app.engine.story_graph import START_SCENE
+
+
+def print_report(manifest: dict, limit: int):
+    partitions = manifest["partitions"]
+    chapters = {pid: p for pid, p in partitions.items() if "scenes" in p}
+    print(
+        f"Manifest {manifest['version']}: {len(chapters)} chapters, "
+        f"{len(partitions) - len(chapters)} regions, {len(manifest['scenes'])} "
+        f"scenes, {len(manifest['characters'])} characters, "
+        f"{len(manifest['items'])} items"
+    )
+    for pid, partition in list(chapters.items())[:limit]:
+        print(
+            f"  {pid:<20}{len(partition['scenes']):>6} scenes"
+            f"{len(partition['characters']):>6} characters"
+            f"  -> {', '.join(partition['next']) or '-'}"
+        )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Partition scenes into chapters and maps into regions so "
+        "the server only keeps content near active players loaded."
+    )
+    parser.add_argument("--scenes", default=SCENES_DIR)
+    parser.add_argument("--regions", default=REGIONS_DIR)
+    parser.add_argument("--start", default=START_SCENE)
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=PARTITION_SIZE,
+        help="Scenes per chapter for scenes without a chapter field.",
+    )
+    parser.add_argument("--output", default=PARTITIONS_PATH)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    manifest = build_manifest(args.scenes, args.regions, args.start, args.size)
+    write_manifest(manifest, args.output)
+    if args.json:
+        print(json.dumps(manifest, indent=2))
+    else:
+        print_report(manifest, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from app.engine.content import content_cache
+from app.engine.story import ACTION_MENU, SCENES_DIR, StoryEngine, StorySession
+
+START_SCENE = "scene_001"
+MAX_EXAMPLES = 5
+
+_scenes: dict[str, dict] = {}
+
+
+def load_scene_files(scenes_dir: str = SCENES_DIR) -> dict[str, dict]:
+    """Scenes keyed by file name, which is how the game resolves nextScene."""
+    return {
+        os.path.splitext(os.path.basename(path))[0]: scene
+        for path, scene in content_cache.load_dir(scenes_dir).items()
+    }
+
+
+def _init_worker(scenes: dict[str, dict]):
+    global _scenes
+    _scenes = scenes
+
+
+class FuzzResult:
+    def __init__(self):
+        self.runs = 0
+        self.steps = 0
+        self.scene_visits: dict[str, int] = {}
+        self.choice_picks: dict[str, int] = {}
+        self.endings: dict[str, int] = {}
+        self.issues: dict[str, dict[str, Any]] = {}
+
+    def issue(self, kind: str, **example):
+        entry = self.issues.setdefault(kind, {"count": 0, "examples": []})
+        entry["count"] += 1
+        if len(entry["examples"]) < MAX_EXAMPLES:
+            entry["examples"].append(example)
+
+    def merge(self, other: "FuzzResult"):
+        self.runs += other.runs
+        self.steps += other.steps
+        for target, source in (
+            (self.scene_visits, other.scene_visits),
+            (self.choice_picks, other.choice_picks),
+            (self.endings, other.endings),
+        ):
+            for key, count in source.items():
+                target[key] = target.get(key, 0) + count
+        for kind, entry in other.issues.items():
+            mine = self.issues.setdefault(kind, {"count": 0, "examples": []})
+            mine["count"] += entry["count"]
+            mine["examples"] = (mine["examples"] + entry["examples"])[:MAX_EXAMPLES]
+
+
+def check_static(scenes: dict[str, dict], result: FuzzResult):
+    for name, scene in scenes.items():
+        if scene.get("id") != name:
+            result.issue("scene_id_mismatch", scene=name, id=scene.get("id"))
+        for i, choice in enumerate(scene.get("choices") or []):
+            if not choice.get("nextScene"):
+                result.issue("choice_without_target", scene=name, choice=i)
+
+
+def _pick_choice(
+    scene_id: str, choices: list[dict], rng: random.Random, result: FuzzResult, guided
+) -> int:
+    if not guided:
+        return rng.randrange(len(choices))
+    counts = [
+        result.choice_picks.get(f"{scene_id}#{i}", 0) for i in range(len(choices))
+    ]
+    least = min(counts)
+    return rng.choice([i for i, count in enumerate(counts) if count == least])
+
+
+def fuzz_worker(
+    seed: int,
+    runs: int,
+    max_steps: int,
+    back_rate: float,
+    guided: bool,
+    start: str = START_SCENE,
+) -> FuzzResult:
+    result = FuzzResult()
+    rng = random.Random(seed)
+    current_run = 0
+
+    def load(scene_id: str) -> dict | None:
+        scene = _scenes.get(scene_id)
+        if scene is None:
+            result.issue("missing_scene", scene=scene_id, run=f"{seed}:{current_run}")
+        return scene
+
+    engine = StoryEngine(load_scene=load)
+    for current_run in range(runs):
+        session = StorySession(start)
+        if not engine.start(session):
+            result.runs += 1
+            continue
+        result.scene_visits[session.scene_id] = (
+            result.scene_visits.get(session.scene_id, 0) + 1
+        )
+        ending = "max_steps"
+        for _ in range(max_steps):
+            result.steps += 1
+            scene_id = session.scene_id
+            scene = session.scene
+            before_lines = len(session.dialogue_history)
+            if session.shows_choices:
+                choices = scene["choices"]
+                i = _pick_choice(scene_id, choices, rng, result, guided)
+                key = f"{scene_id}#{i}"
+                result.choice_picks[key] = result.choice_picks.get(key, 0) + 1
+                choice = choices[i]
+                if not engine.make_choice(session, choice):
+                    ending = "broken_choice"
+                    break
+                target = choice["nextScene"]
+                if session.scene_id != target:
+                    result.issue(
+                        "choice_not_followed",
+                        scene=scene_id,
+                        choice=i,
+                        expected=target,
+                        got=session.scene_id,
+                    )
+                if (session.mode == "context") != (target == ACTION_MENU):
+                    result.issue(
+                        "choice_wrong_mode", scene=scene_id, choice=i, mode=session.mode
+                    )
+                unset = {
+                    key: value
+                    for key, value in choice.get("set_vars", {}).items()
+                    if session.game_vars.get(key) != value
+                }
+                if unset:
+                    result.issue(
+                        "choice_vars_not_set", scene=scene_id, choice=i, vars=unset
+                    )
+            elif rng.random() < back_rate:
+                went_back = session.dialogue_index == 0 and len(session.history) > 1
+                target = session.history[-2] if went_back else None
+                engine.prev_dialogue(session)
+                if went_back:
+                    if session.scene_id != target:
+                        result.issue(
+                            "history_desync",
+                            scene=scene_id,
+                            expected=target,
+                            history=list(session.history),
+                        )
+                        ending = "history_desync"
+                        break
+                    if len(session.dialogue_history) != before_lines:
+                        result.issue(
+                            "back_appends_history_line",
+                            scene=scene_id,
+                            previous=target,
+                        )
+                    if session.dialogue_index != len(session.scene["dialogue"]) - 1:
+                        result.issue(
+                            "back_not_at_last_line",
+                            scene=scene_id,
+                            previous=target,
+                            dialogue_index=session.dialogue_index,
+                        )
+                continue
+            else:
+                at_end = engine.next_dialogue(session)
+                if at_end and session.scene is scene and session.mode != "context":
+                    if scene.get("nextScene") and not scene.get("choices"):
+                        ending = "broken_next_scene"
+                        break
+                    if not scene.get("choices"):
+                        ending = "dead_end"
+                        result.issue("dead_end", scene=scene_id)
+                        break
+            if session.mode == "context":
+                ending = ACTION_MENU
+                if ACTION_MENU in session.history:
+                    # Save slots and Back resolve history entries as scene files.
+                    result.issue("action_menu_in_history", scene=scene_id)
+                break
+            if session.scene_id != scene_id:
+                result.scene_visits[session.scene_id] = (
+                    result.scene_visits.get(session.scene_id, 0) + 1
+                )
+                if not session.scene.get("dialogue"):
+                    result.issue("empty_scene", scene=session.scene_id)
+            if session.history and session.history[-1] != session.scene_id:
+                result.issue(
+                    "history_desync",
+                    scene=session.scene_id,
+                    history=list(session.history[-3:]),
+                )
+        result.endings[ending] = result.endings.get(ending, 0) + 1
+        result.runs += 1
+    return result
+
+
+def run_fuzz(
+    scenes: dict[str, dict],
+    runs: int,
+    workers: int,
+    seed: int = 0,
+    max_steps: int = 500,
+    back_rate: float = 0.05,
+    guided: bool = False,
+    start: str = START_SCENE,
+) -> FuzzResult:
+    total = FuzzResult()
+    check_static(scenes, total)
+    per_worker = [
+        runs // workers + (1 if i < runs % workers else 0) for i in range(workers)
+    ]
+    jobs = [
+        (seed * 1_000_003 + i, count, max_steps, back_rate, guided, start)
+        for i, count in enumerate(per_worker)
+        if count
+    ]
+    if workers == 1:
+        _init_worker(scenes)
+        results = [fuzz_worker(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(scenes,)
+        ) as pool:
+            results = list(pool.map(fuzz_worker, *zip(*jobs)))
+    for result in results:
+        total.merge(result)
+    return total
+
+
+def build_report(scenes: dict[str, dict], result: FuzzResult, elapsed: float) -> dict:
+    choices = [
+        f"{name}#{i}"
+        for name, scene in scenes.items()
+        for i in range(len(scene.get("choices") or []))
+    ]
+    return {
+        "runs": result.runs,
+        "steps": result.steps,
+        "elapsed_seconds": elapsed,
+        "runs_per_second": result.runs / elapsed if elapsed else 0.0,
+        "scene_coverage": {
+            "covered": sum(1 for name in scenes if result.scene_visits.get(name)),
+            "total": len(scenes),
+            "uncovered": sorted(n for n in scenes if not result.scene_visits.get(n)),
+            "visits": dict(sorted(result.scene_visits.items())),
+        },
+        "choice_coverage": {
+            "covered": sum(1 for key in choices if result.choice_picks.get(key)),
+            "total": len(choices),
+            "uncovered": [key for key in choices if not result.choice_picks.get(key)],
+            "picks": {key: result.choice_picks.get(key, 0) for key in choices},
+        },
+        "endings": result.endings,
+        "issues": result.issues,
+    }
+
+
+def print_report(report: dict, limit: int):
+    print(
+        f"{report['runs']:,} runs, {report['steps']:,} steps in "
+        f"{report['elapsed_seconds']:.2f}s ({report['runs_per_second']:,.0f} runs/s)"
+    )
+    for label, key in (("Scenes", "scene_coverage"), ("Choices", "choice_coverage")):
+        coverage = report[key]
+        print(f"{label} covered: {coverage['covered']}/{coverage['total']}")
+        for entry in coverage["uncovered"][:limit]:
+            print(f"  never reached: {entry}")
+    print("\nEndings")
+    for ending, count in sorted(report["endings"].items(), key=lambda e: -e[1]):
+        print(f"  {ending:<20} {count:,}")
+    print(f"\nIssues ({len(report['issues'])})")
+    for kind, entry in sorted(report["issues"].items()):
+        print(f"  {kind}: {entry['count']:,}")
+        for example in entry["examples"][:limit]:
+            print(f"    {json.dumps(example)}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Random-walk fuzzer for scene, choice and history logic."
+    )
+    parser.add_argument("--scenes", default=SCENES_DIR)
+    parser.add_argument("--start", default=START_SCENE)
+    parser.add_argument("--runs", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=500)
+    parser.add_argument(
+        "--back-rate",
+        type=float,
+        default=0.05,
+        help="Chance of pressing Back instead of advancing on a dialogue line.",
+    )
+    parser.add_argument(
+        "--guided",
+        action="store_true",
+        help="Prefer the least-picked choice instead of a uniform random one.",
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    scenes = load_scene_files(args.scenes)
+    if args.start not in scenes:
+        raise SystemExit(f"Start scene {args.start} not found in {args.scenes}")
+    start = time.perf_counter()
+    result = run_fuzz(
+        scenes,
+        args.runs,
+        max(1, args.workers),
+        args.seed,
+        args.max_steps,
+        args.back_rate,
+        args.guided,
+        args.start,
+    )
+    report = build_report(scenes, result, time.perf_counter() - start)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.limit)
+
+
+if __name__ == "__main__":
+    main()
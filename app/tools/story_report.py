@@ -0,0 +1,53 @@
+import argparse
+import json
+
+from app.engine.story_graph import SCENES_DIR, START_SCENE, StoryGraph, load_scenes
+
+
+def print_report(report: dict, limit: int):
+    print(
+        f"{report['scene_count']:,} scenes, {report['edge_count']:,} links, "
+        f"analyzed in {report['elapsed_ms']:.1f}ms"
+    )
+    print(
+        f"Reachable from {report['start']}: {report['reachable_count']:,}"
+        f"  distinct paths: {report['path_count']}"
+        f"  longest path: {report['longest_path']} scenes"
+    )
+    sections = [
+        ("Unreachable scenes", report["unreachable"]),
+        ("Dead ends", report["dead_ends"]),
+        ("Exits to action_menu", report["exits"]),
+        (
+            "Broken links",
+            [f"{link['scene']} -> {link['target']}" for link in report["broken_links"]],
+        ),
+        ("Cycles", [" <-> ".join(cycle) for cycle in report["cycles"]]),
+    ]
+    for title, entries in sections:
+        print(f"\n{title} ({len(entries)})")
+        for entry in entries[:limit]:
+            print(f"  {entry}")
+        if len(entries) > limit:
+            print(f"  ... {len(entries) - limit} more")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Reachability, dead end, cycle and path count report for scenes."
+    )
+    parser.add_argument("--scenes", default=SCENES_DIR)
+    parser.add_argument("--start", default=START_SCENE)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = StoryGraph(load_scenes(args.scenes)).analyze(args.start)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.limit)
+
+
+if __name__ == "__main__":
+    main()
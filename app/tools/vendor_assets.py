@@ -0,0 +1,202 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import re
+import string
+import time
+import urllib.parse
+import urllib.request
+
+from app.components.head import HTML2CANVAS_CDN, MANIFEST_PATH, ROBOTO_CDN, VENDOR_DIR
+from app.engine.content import write_atomic
+
+GAME_DATA_DIR = "assets/game_data"
+FONT_CSS_URL = "https://fonts.googleapis.com/css2"
+FONT_FAMILY = "Roboto"
+FONT_WEIGHTS = (400, 500, 700)
+# Glyphs used by the UI itself rather than by game content.
+UI_GLYPHS = string.printable.strip() + " …—–‘’“”•×"
+# Google Fonts only serves woff2 to user agents it recognises.
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+FONT_FACE = re.compile(r"(/\*\s*([\w-]+)\s*\*/\s*)?@font-face\s*{([^}]*)}")
+FONT_WEIGHT = re.compile(r"font-weight:\s*(\d+)")
+FONT_SRC = re.compile(r"url\(([^)]+)\)")
+
+
+def fetch(url: str) -> tuple[bytes, float]:
+    """Body and wall time of a cold request, including DNS and TLS setup."""
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30) as response:
+        body = response.read()
+    return body, time.perf_counter() - start
+
+
+def integrity(body: bytes) -> str:
+    return "sha384-" + base64.b64encode(hashlib.sha384(body).digest()).decode()
+
+
+def content_glyphs(root: str = GAME_DATA_DIR) -> str:
+    glyphs = set(UI_GLYPHS)
+
+    def collect(value):
+        if isinstance(value, str):
+            glyphs.update(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(".json"):
+                with open(os.path.join(dirpath, filename), encoding="utf-8") as f:
+                    collect(json.load(f))
+    return "".join(sorted(c for c in glyphs if c.isprintable()))
+
+
+def _write_hashed(body: bytes, name: str, ext: str) -> dict:
+    filename = f"{name}.{hashlib.sha256(body).hexdigest()[:12]}{ext}"
+    write_atomic(os.path.join(VENDOR_DIR, filename), body)
+    return {
+        "file": filename,
+        "url": "/" + os.path.relpath(os.path.join(VENDOR_DIR, filename), "assets"),
+        "integrity": integrity(body),
+        "bytes": len(body),
+    }
+
+
+def vendor_fonts(glyphs: str) -> tuple[list[dict], dict]:
+    """Download Roboto subset to `glyphs` and rewrite its stylesheet to the
+    local copies."""
+    weights = ";".join(str(w) for w in FONT_WEIGHTS)
+    query = urllib.parse.urlencode(
+        {"family": f"{FONT_FAMILY}:wght@{weights}", "text": glyphs, "display": "swap"}
+    )
+    css = fetch(f"{FONT_CSS_URL}?{query}")[0].decode("utf-8")
+    fonts = []
+    for match in FONT_FACE.finditer(css):
+        block = match.group(3)
+        weight = FONT_WEIGHT.search(block).group(1)
+        src = FONT_SRC.search(block).group(1).strip("'\"")
+        font = _write_hashed(fetch(src)[0], f"roboto-{weight}", ".woff2")
+        font["weight"] = int(weight)
+        fonts.append(font)
+        css = css.replace(src, font["url"])
+    stylesheet = _write_hashed(css.encode("utf-8"), "roboto", ".css")
+    return fonts, stylesheet
+
+
+def vendor_scripts() -> list[dict]:
+    return [_write_hashed(fetch(HTML2CANVAS_CDN)[0], "html2canvas", ".min.js")]
+
+
+def measure_cdn() -> dict:
+    """What a browser fetches from the CDNs before the change: the full Roboto
+    stylesheet, its latin faces and html2canvas, each on a cold connection."""
+    css, css_seconds = fetch(ROBOTO_CDN)
+    font_bytes, font_seconds = 0, 0.0
+    for match in FONT_FACE.finditer(css.decode("utf-8")):
+        if match.group(2) != "latin":
+            continue
+        body, seconds = fetch(FONT_SRC.search(match.group(3)).group(1).strip("'\""))
+        font_bytes += len(body)
+        font_seconds = max(font_seconds, seconds)
+    script, script_seconds = fetch(HTML2CANVAS_CDN)
+    return {
+        "bytes": len(css) + font_bytes + len(script),
+        "origins": 3,
+        # The stylesheet and the synchronous script both block first paint.
+        # Fonts use display=swap so text paints with a fallback meanwhile.
+        "blocking_ms": max(css_seconds, script_seconds) * 1000,
+        "fonts_ready_ms": (css_seconds + font_seconds) * 1000,
+    }
+
+
+def measure_local(site: str | None, manifest: dict) -> dict:
+    files = [*manifest["fonts"], manifest["stylesheet"], *manifest["scripts"]]
+    report = {"bytes": sum(f["bytes"] for f in files), "origins": 0}
+    if site:
+        # The stylesheet is the only render-blocking file left; the script is
+        # deferred and the fonts are preloaded alongside it.
+        _, css_seconds = fetch(site.rstrip("/") + manifest["stylesheet"]["url"])
+        font_seconds = max(
+            fetch(site.rstrip("/") + font["url"])[1] for font in manifest["fonts"]
+        )
+        report["blocking_ms"] = css_seconds * 1000
+        report["fonts_ready_ms"] = max(css_seconds, font_seconds) * 1000
+    return report
+
+
+def remove_stale(manifest: dict):
+    keep = {
+        os.path.basename(MANIFEST_PATH),
+        manifest["stylesheet"]["file"],
+        *(f["file"] for f in manifest["fonts"]),
+        *(s["file"] for s in manifest["scripts"]),
+    }
+    for name in os.listdir(VENDOR_DIR):
+        if name not in keep:
+            os.unlink(os.path.join(VENDOR_DIR, name))
+
+
+def print_report(manifest: dict):
+    print(f"Roboto subset to {manifest['glyphs']} glyphs")
+    for entry in [*manifest["fonts"], manifest["stylesheet"], *manifest["scripts"]]:
+        print(f"  {entry['file']:<40}{entry['bytes'] / 1024:>8.1f}KB  {entry['url']}")
+    report = manifest["report"]
+    print(f"  {'':<16}{'bytes':>12}{'origins':>10}{'blocking':>12}{'fonts':>12}")
+    for label in ("before", "after"):
+        row = report[label]
+        blocking = row.get("blocking_ms")
+        fonts = row.get("fonts_ready_ms")
+        print(
+            f"  {label:<16}{row['bytes']:>12,}{row['origins']:>10}"
+            f"{f'{blocking:.0f}ms' if blocking is not None else 'n/a':>12}"
+            f"{f'{fonts:.0f}ms' if fonts is not None else 'n/a':>12}"
+        )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Vendor Roboto, subset to the game's glyphs, and html2canvas "
+        "into assets/vendor so pages load without third-party CDNs."
+    )
+    parser.add_argument(
+        "--site",
+        help="Running frontend URL, e.g. http://localhost:3000, to time the "
+        "vendored files for the after column.",
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    glyphs = content_glyphs()
+    fonts, stylesheet = vendor_fonts(glyphs)
+    manifest = {
+        "glyphs": len(glyphs),
+        "fonts": fonts,
+        "stylesheet": stylesheet,
+        "scripts": vendor_scripts(),
+    }
+    manifest["report"] = {
+        "before": measure_cdn(),
+        "after": measure_local(args.site, manifest),
+    }
+    write_atomic(MANIFEST_PATH, json.dumps(manifest, indent=2))
+    remove_stale(manifest)
+    if args.json:
+        print(json.dumps(manifest, indent=2))
+    else:
+        print_report(manifest)
+
+
+if __name__ == "__main__":
+    main()
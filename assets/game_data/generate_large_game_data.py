@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import random
+import shutil
+
+DEFAULT_OUTPUT = "build/game_data_large"
+SYLLABLES = (
+    "ka ri to mel an dor su vin el ra th or is wen gal mir ost ya bre lun".split()
+)
+WORDS = (
+    "the forest road king shadow light you must find ancient sword river "
+    "village night storm ally quest stone tower secret whisper fire silver "
+    "crown path mountain we are not alone beyond gate old promise"
+).split()
+ITEM_KINDS = {
+    "consumables": ("Consumable", True, 99),
+    "equipment": ("Equipment", False, 1),
+    "materials": ("Material", True, 99),
+    "key_items": ("Key Item", False, 1),
+}
+EQUIPMENT_SLOTS = ["main_hand", "off_hand", "head", "body", "feet", "accessory"]
+LOCATION_TYPES = ["Exploration", "Story", "Social", "Dungeon"]
+ACTIONS = ["explore", "gather", "rest", "travel", "train", "craft"]
+MAP_ICONS = ["trees", "mountain", "castle", "waves", "tent", "landmark"]
+
+
+def _name(rng: random.Random, parts: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def _sentence(rng: random.Random, low: int = 6, high: int = 16) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + rng.choice([".", "!", "?", "..."])
+
+
+def _write(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def generate_characters(rng: random.Random, count: int) -> list[dict]:
+    characters = [
+        {
+            "id": "narrator",
+            "name": "Narrator",
+            "color": "#9CA3AF",
+            "sprites": {"default": "/placeholder.svg"},
+        }
+    ]
+    for i in range(count):
+        characters.append(
+            {
+                "id": f"char_{i:04d}",
+                "name": _name(rng, rng.randint(2, 3)),
+                "color": f"#{rng.randrange(0x1000000):06X}",
+                "sprites": {
+                    mood: "/placeholder.svg" for mood in ("neutral", "happy", "sad")
+                },
+            }
+        )
+    return characters
+
+
+def generate_scenes(
+    rng: random.Random,
+    count: int,
+    branching: int,
+    character_ids: list[str],
+    lines: tuple[int, int],
+    window: int = 50,
+    linear_rate: float = 0.3,
+    exit_rate: float = 0.01,
+) -> list[dict]:
+    scenes = []
+    ids = [f"scene_{i:05d}" for i in range(count)]
+    for i, scene_id in enumerate(ids):
+        cast = rng.sample(character_ids, k=min(2, len(character_ids)))
+        dialogue = [
+            {
+                "character": rng.choice(["narrator", *cast]),
+                "text": _sentence(rng),
+            }
+            for _ in range(rng.randint(*lines))
+        ]
+        ahead = ids[i + 1 : i + 1 + window]
+        choices = []
+        next_scene = None
+        if not ahead or rng.random() < exit_rate:
+            next_scene = "action_menu"
+        elif rng.random() < linear_rate:
+            next_scene = ahead[0]
+        else:
+            for target in rng.sample(ahead, k=min(branching, len(ahead))):
+                choices.append(
+                    {
+                        "text": _sentence(rng, 3, 7),
+                        "nextScene": target,
+                        "set_vars": {f"flag_{rng.randrange(100)}": True},
+                    }
+                )
+        scenes.append(
+            {
+                "id": scene_id,
+                "background": "/placeholder.svg",
+                "characters": [
+                    {"id": char_id, "position": position, "sprite": "neutral"}
+                    for char_id, position in zip(cast, ("left", "right"))
+                ],
+                "dialogue": dialogue,
+                "choices": choices,
+                "nextScene": next_scene,
+            }
+        )
+    return scenes
+
+
+def generate_items(rng: random.Random, count: int) -> dict[str, dict]:
+    items = {}
+    kinds = list(ITEM_KINDS)
+    for i in range(count):
+        folder = kinds[i % len(kinds)]
+        item_type, stackable, max_stack = ITEM_KINDS[folder]
+        item_id = f"item_{i:05d}"
+        properties: dict = {}
+        effects: dict = {}
+        if folder == "equipment":
+            properties = {
+                "slot": rng.choice(EQUIPMENT_SLOTS),
+                rng.choice(["damage", "defense"]): rng.randint(1, 30),
+            }
+            effects = {"stat_boost": {rng.choice(["str", "agi", "int"]): 1}}
+        elif folder == "consumables":
+            effects = {rng.choice(["heal", "restore_mana"]): rng.randint(10, 100)}
+        elif folder == "key_items":
+            effects = {"unlocks": f"door_{i:05d}"}
+        items[f"{folder}/{item_id}.json"] = {
+            "id": item_id,
+            "name": f"{_name(rng, 2)} {item_type}",
+            "description": _sentence(rng, 6, 12),
+            "icon": "/placeholder.svg",
+            "item_type": item_type,
+            "stackable": stackable,
+            "max_stack": max_stack,
+            "properties": properties,
+            "effects": effects,
+        }
+    return items
+
+
+def generate_world(
+    rng: random.Random, regions: int, locations_per_region: int
+) -> tuple[list[dict], dict[str, dict]]:
+    world_map = []
+    regional_maps = {}
+    for i in range(regions):
+        major_id = f"region_{i:03d}"
+        name = f"{_name(rng, 2)} {rng.choice(['Vale', 'Peaks', 'Woods', 'Coast'])}"
+        world_map.append(
+            {
+                "id": major_id,
+                "name": name,
+                "description": _sentence(rng, 8, 14),
+                "icon": rng.choice(MAP_ICONS),
+                "x": rng.randint(5, 95),
+                "y": rng.randint(5, 95),
+                "unlock_condition": "true",
+            }
+        )
+        locations = []
+        for j in range(
+            rng.randint(max(1, locations_per_region // 2), locations_per_region)
+        ):
+            locations.append(
+                {
+                    "id": f"{major_id}_loc_{j:02d}",
+                    "name": _name(rng, 2),
+                    "type": rng.choice(LOCATION_TYPES),
+                    "description": _sentence(rng, 8, 14),
+                    "available_actions": sorted(
+                        {"travel", *rng.sample(ACTIONS, k=rng.randint(1, 3))}
+                    ),
+                    "unlock_condition": "true",
+                }
+            )
+        regional_maps[f"region_{major_id}"] = {
+            "id": f"region_{major_id}",
+            "name": name,
+            "major_location_id": major_id,
+            "background": "/placeholder.svg",
+            "locations": locations,
+        }
+    return world_map, regional_maps
+
+
+def generate_large_game_data(
+    output: str = DEFAULT_OUTPUT,
+    seed: int = 0,
+    scenes: int = 10_000,
+    branching: int = 3,
+    characters: int = 200,
+    items: int = 2_000,
+    regions: int = 100,
+    locations_per_region: int = 20,
+    min_lines: int = 3,
+    max_lines: int = 8,
+) -> dict:
+    """Write a large, seed-deterministic dataset with the same layout as
+    create_game_data, for loader, index and UI benchmarks."""
+    folders = [
+        os.path.join(output, f) for f in ("characters", "scenes", "items", "maps")
+    ]
+    if os.path.exists(os.path.join(output, "generated.json")):
+        for folder in folders:
+            shutil.rmtree(folder, ignore_errors=True)
+    elif any(os.path.isdir(folder) and os.listdir(folder) for folder in folders):
+        raise ValueError(f"{output} already holds content that was not generated")
+
+    # Separate streams so changing one count does not reshuffle the rest.
+    character_data = generate_characters(
+        random.Random(f"{seed}:characters"), characters
+    )
+    for data in character_data:
+        _write(os.path.join(output, "characters", f"character_{data['id']}.json"), data)
+    scene_data = generate_scenes(
+        random.Random(f"{seed}:scenes"),
+        scenes,
+        branching,
+        [c["id"] for c in character_data[1:]] or ["narrator"],
+        (min_lines, max_lines),
+    )
+    for data in scene_data:
+        _write(os.path.join(output, "scenes", f"{data['id']}.json"), data)
+    for path, data in generate_items(random.Random(f"{seed}:items"), items).items():
+        _write(os.path.join(output, "items", path), data)
+    world_map, regional_maps = generate_world(
+        random.Random(f"{seed}:world"), regions, locations_per_region
+    )
+    _write(os.path.join(output, "maps", "world_map.json"), world_map)
+    for key, data in regional_maps.items():
+        _write(os.path.join(output, "maps", "regions", f"{key}.json"), data)
+
+    manifest = {
+        "seed": seed,
+        "start_scene": scene_data[0]["id"] if scene_data else None,
+        "counts": {
+            "characters": len(character_data),
+            "scenes": len(scene_data),
+            "dialogue_lines": sum(len(s["dialogue"]) for s in scene_data),
+            "choices": sum(len(s["choices"]) for s in scene_data),
+            "items": items,
+            "regions": len(world_map),
+            "locations": sum(len(r["locations"]) for r in regional_maps.values()),
+        },
+        "params": {
+            "branching": branching,
+            "locations_per_region": locations_per_region,
+            "lines": [min_lines, max_lines],
+        },
+    }
+    _write(os.path.join(output, "generated.json"), manifest)
+    return manifest
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Generate a large deterministic dataset for scale testing."
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenes", type=int, default=10_000)
+    parser.add_argument("--branching", type=int, default=3)
+    parser.add_argument("--characters", type=int, default=200)
+    parser.add_argument("--items", type=int, default=2_000)
+    parser.add_argument("--regions", type=int, default=100)
+    parser.add_argument("--locations-per-region", type=int, default=20)
+    parser.add_argument("--min-lines", type=int, default=3)
+    parser.add_argument("--max-lines", type=int, default=8)
+    args = parser.parse_args(argv)
+    manifest = generate_large_game_data(
+        args.output,
+        args.seed,
+        args.scenes,
+        args.branching,
+        args.characters,
+        args.items,
+        args.regions,
+        args.locations_per_region,
+        args.min_lines,
+        args.max_lines,
+    )
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,19 @@ def create_game_data():
             "description": "Trigger random scenarios or events.",
             "icon": "/placeholder.svg",
             "time_cost": 2,
+            "rewards": {
+                "xp": [5, 15],
+                "loot": [
+                    {"item_id": "health_potion", "chance": 0.1, "min": 1, "max": 1},
+                    {"item_id": "iron_ore", "chance": 0.05, "min": 1, "max": 2},
+                ],
+            },
+            "preconditions": [],
+            "effects": [],
+            "messages": {
+                "success": "You explore the area and find something useful.",
+                "empty": "You explore the area and find nothing of interest.",
+            },
         },
         {
             "id": "gather",
@@ -34,6 +47,19 @@ def create_game_data():
             "description": "Collect resources with random rewards.",
             "icon": "/placeholder.svg",
             "time_cost": 3,
+            "rewards": {
+                "xp": [2, 6],
+                "loot": [
+                    {"item_id": "iron_ore", "chance": 0.6, "min": 1, "max": 3},
+                    {"item_id": "health_potion", "chance": 0.05, "min": 1, "max": 1},
+                ],
+            },
+            "preconditions": [],
+            "effects": [],
+            "messages": {
+                "success": "You gather some resources.",
+                "empty": "You search for resources but come back empty-handed.",
+            },
         },
         {
             "id": "travel",
@@ -41,6 +67,10 @@ def create_game_data():
             "description": "Return to the regional or world map.",
             "icon": "/placeholder.svg",
             "time_cost": 0,
+            "rewards": {"xp": [0, 0], "loot": []},
+            "preconditions": [],
+            "effects": [{"type": "set_game_mode", "mode": "map"}],
+            "messages": {},
         },
         {
             "id": "train",
@@ -48,6 +78,12 @@ def create_game_data():
             "description": "Increase stats through training.",
             "icon": "/placeholder.svg",
             "time_cost": 4,
+            "rewards": {"xp": [15, 30], "loot": []},
+            "preconditions": [],
+            "effects": [
+                {"type": "raise_stat", "stat": "str", "chance": 0.2, "amount": 1}
+            ],
+            "messages": {"success": "You spend some time training."},
         },
         {
             "id": "craft",
@@ -55,6 +91,15 @@ def create_game_data():
             "description": "Combine materials into new items.",
             "icon": "/placeholder.svg",
             "time_cost": 2,
+            "rewards": {"xp": [3, 8], "loot": []},
+            "preconditions": [
+                {"type": "has_item", "item_id": "iron_ore", "quantity": 5}
+            ],
+            "effects": [{"type": "consume_item", "item_id": "iron_ore", "quantity": 5}],
+            "messages": {
+                "success": "You work the iron ore at the forge.",
+                "failure": "You don't have the required materials to craft anything.",
+            },
         },
         {
             "id": "rest",
@@ -62,10 +107,60 @@ def create_game_data():
             "description": "Advance time and restore health/stamina.",
             "icon": "/placeholder.svg",
             "time_cost": 4,
+            "rewards": {"xp": [0, 0], "loot": []},
+            "preconditions": [],
+            "effects": [],
+            "messages": {"success": "You rest for {hours} hours."},
         },
     ]
     with open(os.path.join(base_path, "actions.json"), "w") as f:
         json.dump(actions_data, f, indent=2)
+    world_events_data = [
+        {
+            "id": "dawn",
+            "at": 6,
+            "every": 24,
+            "set_vars": {"time_of_day": "day"},
+            "message": "",
+        },
+        {
+            "id": "dusk",
+            "at": 18,
+            "every": 24,
+            "set_vars": {"time_of_day": "night"},
+            "message": "",
+        },
+        {
+            "id": "miners_camp_restock",
+            "at": 30,
+            "every": 72,
+            "set_vars": {"miners_camp_stock": "full"},
+            "message": "The Miner's Camp has restocked its wares.",
+        },
+        {
+            "id": "kain_to_crystal_cave",
+            "at": 9,
+            "every": 24,
+            "set_vars": {"kain_location": "crystal_cave"},
+            "message": "",
+        },
+        {
+            "id": "kain_to_miners_camp",
+            "at": 19,
+            "every": 24,
+            "set_vars": {"kain_location": "miners_camp"},
+            "message": "",
+        },
+        {
+            "id": "elara_quest_deadline",
+            "at": 120,
+            "every": 0,
+            "set_vars": {"elara_quest_expired": True},
+            "message": "The darkness in the north has grown beyond Elara's reach.",
+        },
+    ]
+    with open(os.path.join(base_path, "world_events.json"), "w") as f:
+        json.dump(world_events_data, f, indent=2)
     characters = {
         "narrator": {
             "id": "narrator",
@@ -382,6 +477,113 @@ def create_game_data():
     for key, data in stats_configs.items():
         with open(os.path.join(stats_path, f"{key}.json"), "w") as f:
             json.dump(data, f, indent=2)
+    derived_stats_configs = {
+        "fantasy_derived_stats": [
+            {
+                "id": "max_hp",
+                "name": "Max HP",
+                "icon": "heart",
+                "base": 50,
+                "scale": {"con": 5},
+                "item_property": "max_hp",
+            },
+            {
+                "id": "max_mana",
+                "name": "Max Mana",
+                "icon": "sparkles",
+                "base": 20,
+                "scale": {"int": 4, "wis": 2},
+                "item_property": "max_mana",
+            },
+            {
+                "id": "damage",
+                "name": "Damage",
+                "icon": "sword",
+                "base": 1,
+                "scale": {"str": 0.5},
+                "item_property": "damage",
+            },
+            {
+                "id": "defense",
+                "name": "Defense",
+                "icon": "shield",
+                "base": 0,
+                "scale": {"dex": 0.25, "con": 0.5},
+                "item_property": "defense",
+            },
+            {
+                "id": "carry_weight",
+                "name": "Carry Weight",
+                "icon": "weight",
+                "base": 20,
+                "scale": {"str": 3},
+                "item_property": "carry_weight",
+            },
+            {
+                "id": "stamina",
+                "name": "Stamina",
+                "icon": "zap",
+                "base": 10,
+                "scale": {"con": 2, "max_hp": 0.1},
+                "item_property": "stamina",
+            },
+        ],
+        "sci-fi_derived_stats": [
+            {
+                "id": "max_hp",
+                "name": "Hull Integrity",
+                "icon": "heart",
+                "base": 50,
+                "scale": {"end": 5},
+                "item_property": "max_hp",
+            },
+            {
+                "id": "damage",
+                "name": "Damage",
+                "icon": "zap",
+                "base": 1,
+                "scale": {"pwr": 0.5},
+                "item_property": "damage",
+            },
+            {
+                "id": "carry_weight",
+                "name": "Cargo Capacity",
+                "icon": "package",
+                "base": 20,
+                "scale": {"pwr": 2, "tec": 1},
+                "item_property": "carry_weight",
+            },
+        ],
+        "modern_derived_stats": [
+            {
+                "id": "max_hp",
+                "name": "Health",
+                "icon": "heart",
+                "base": 50,
+                "scale": {"vit": 5},
+                "item_property": "max_hp",
+            },
+            {
+                "id": "damage",
+                "name": "Damage",
+                "icon": "dumbbell",
+                "base": 1,
+                "scale": {"phy": 0.5},
+                "item_property": "damage",
+            },
+            {
+                "id": "carry_weight",
+                "name": "Carry Weight",
+                "icon": "backpack",
+                "base": 15,
+                "scale": {"phy": 2},
+                "item_property": "carry_weight",
+            },
+        ],
+    }
+    for key, data in derived_stats_configs.items():
+        with open(os.path.join(stats_path, f"{key}.json"), "w") as f:
+            json.dump(data, f, indent=2)
     player_data = {
         "level": 1,
         "xp": 0,
@@ -536,4 +738,4 @@ def create_game_data():
     }
     for key, data in regional_maps_data.items():
         with open(os.path.join(maps_path, "regions", f"{key}.json"), "w") as f:
-            json.dump(data, f, indent=2)
\ No newline at end of file
+            json.dump(data, f, indent=2)